@@ -1,5 +1,13 @@
 from .answers import main as answers_main
+from .answers import async_main as answers_async_main
+from .answers import async_dataframe as answers_async_dataframe
+from .answers import to_dataframe as answers_to_dataframe
+from .sync import sync as answers_sync
 
 __all__ = [
     "answers_main",
-]
\ No newline at end of file
+    "answers_async_main",
+    "answers_async_dataframe",
+    "answers_to_dataframe",
+    "answers_sync",
+]
@@ -4,135 +4,140 @@ import aiohttp
 import pandas as pd
 import time
 
-MAX_RETRIES = 5
-# Limita até 30 requisições simultâneas (boa prática de controle de concorrência)
-SEMAPHORE = asyncio.Semaphore(30)
+import http_client
+from metrics import registry as metrics
+import settings
+from flatten import ColumnBuffer
+from schemas import ANSWERS
 
-async def fetch_with_retry(
+PER_PAGE = http_client.PER_PAGE
+
+async def fetch_page(
     url: str,
     headers: dict,
     page: int,
     session: aiohttp.ClientSession,
-    params: dict = None
-) -> dict:
+    params: dict = None,
+    ttl: int = None
+) -> http_client.Response:
     """
-    Tenta buscar a página `page` no endpoint `url`, com retries exponenciais enquanto o status code não for 200.
-    Em caso de 429, respeita o Retry-After ou faz backoff exponencial.
+    Busca a página `page` no endpoint `url`. Os retries (429 com Retry-After,
+    5xx e erros de conexão) e o controle de concorrência ficam no limitador
+    por host do http_client; se mesmo assim a conexão falhar, retorna uma
+    resposta com status 0 (que a paginação conta como página faltando).
+    `ttl` sobrescreve o TTL do cache HTTP (0 ignora o cache).
     """
-    backoff_base = 2
     task_params = params.copy() if params else {}
     task_params["page"] = str(page)
 
-    for attempt in range(1, MAX_RETRIES + 1):
-        async with SEMAPHORE:
-            try:
-                async with session.get(url, headers=headers.copy(), params=task_params) as response:
-                    status = response.status
-                    print(f"Fetching page {page}, attempt {attempt}, status {status}...")
-                    if status == 200:
-                        return await response.json()
-
-                    # Define tempo de espera
-                    if status == 429:
-                        retry_after = int(response.headers.get("Retry-After", backoff_base ** attempt))
-                        print(f"[429] Page {page}, attempt {attempt} — retrying in {retry_after}s...")
-                    else:
-                        retry_after = backoff_base ** attempt
-                        print(f"[{status}] Page {page}, attempt {attempt} — retrying in {retry_after}s...")
-
-                    await asyncio.sleep(retry_after)
-            except Exception as e:
-                retry_after = backoff_base ** attempt
-                print(f"[Exception] Page {page}, attempt {attempt}: {e} — retrying in {retry_after}s...")
-                await asyncio.sleep(retry_after)
-
-    print(f"Failed to fetch page {page} after {MAX_RETRIES} attempts.")
-    return {}
-
-async def fetch_all(
-    url: str,
-    headers: dict,
-    pages: int,
-    session: aiohttp.ClientSession,
-    params: dict = None
-) -> list:
-    """
-    Dispara fetch_with_retry para todas as páginas de 1 a `pages`.
-    """
-    tasks = [fetch_with_retry(url, headers, page, session, params) for page in range(1, pages + 1)]
-    return await asyncio.gather(*tasks)
-
-async def get_pages(
-    base_url: str,
-    headers: dict,
-    session: aiohttp.ClientSession,
-    params: dict = None
-) -> int:
-    """
-    Busca no header 'total' o número total de itens e calcula quantas páginas existem.
-    """
     try:
-        async with session.get(f"{base_url}answers", headers=headers.copy(), params=params) as response:
-            total_items = int(response.headers.get('total', '0'))
-            return (total_items // 100) + (1 if total_items % 100 else 0)
+        response = await http_client.get_json(session, url, headers, task_params, ttl=ttl, schema=ANSWERS)
     except Exception as e:
-        print(f"[get_pages] Error: {e}")
-        return 0
+        print(f"[Exception] Page {page}: {e}")
+        return http_client.Response(0, url)
 
-async def async_main(survey_id: int) -> list:
-    """
-    Fluxo assíncrono para um único survey_id. Retorna lista de JSONs por página.
-    """
-    url = f"https://api.qulture.rocks/rest/companies/8378/surveys/{survey_id}/answers"
-    params = {
+    print(f"Fetching page {page}, status {response.status}...")
+    # 304: página inalterada em uma requisição condicional (ver sync)
+    if response.status not in (200, 304):
+        print(f"Failed to fetch page {page}: status {response.status}.")
+    return response
+
+def answers_url(survey_id: int) -> str:
+    return f"{settings.QR_API_URL}/companies/{settings.COMPANY_ID}/surveys/{survey_id}/answers"
+
+def answers_params() -> dict:
+    return {
         "include": "participant,reviewer",
-        "per_page": "100",
+        "per_page": str(PER_PAGE),
     }
-    headers = {
+
+def request_headers() -> dict:
+    return {
         "accept": "application/json",
         "Authorization": f"Bearer {os.getenv('QR_API_KEY')}",
         "user-agent": "Mozilla/5.0",
     }
 
-    async with aiohttp.ClientSession() as session:
-        pages = await get_pages(url.rsplit("/answers", 1)[0] + "/", headers, session, params)
-        if pages <= 0:
-            return []
-        data_pages = await fetch_all(url, headers, pages, session, params)
-    return data_pages
+async def async_main(survey_id: int) -> list:
+    """
+    Fluxo assíncrono para um único survey_id. Retorna lista de JSONs por página.
+    Levanta http_client.IncompletePages se alguma página faltar (as que
+    chegaram ficam no diário e a próxima chamada busca só as demais).
+    """
+    url = answers_url(survey_id)
+    params = answers_params()
+    headers = request_headers()
+    journal = http_client.open_journal(url, params, ANSWERS.name)
 
+    async def fetch(page):
+        return await fetch_page(url, headers, page, session, params)
 
-def main(survey_id: int) -> pd.DataFrame:
+    async with http_client.session() as session:
+        stream = http_client.paginate(fetch, http_client.header_total, journal=journal)
+        responses = await http_client.collect_pages(stream)
+    return [response.data for response in responses]
+
+
+async def async_dataframe(survey_id: int, incremental: bool = False) -> pd.DataFrame:
     """
-    Executa o fluxo assíncrono e retorna um DataFrame com todas as respostas.
+    Busca as respostas e já as achata página a página, conforme as páginas
+    chegam: o JSON de cada página é descartado logo depois de achatado, então
+    a memória não cresce com o número de páginas e o achatamento acontece
+    enquanto as outras páginas ainda estão em trânsito. Páginas que faltarem
+    são retomadas do diário na próxima chamada, como em async_main.
     """
-    start = time.time()
-    data = asyncio.run(async_main(survey_id))
+    if incremental:
+        from .sync import sync
+        return to_dataframe(await sync(survey_id))
 
-    answers = []
-    for page in data:
-        for answer in page.get("answers", []):
-            answers.append(answer)
+    url = answers_url(survey_id)
+    params = answers_params()
+    headers = request_headers()
+    journal = http_client.open_journal(url, params, ANSWERS.name)
+    buffer = ANSWERS.buffer()
+
+    async def fetch(page):
+        return await fetch_page(url, headers, page, session, params)
 
-    if not answers:
+    async with http_client.session() as session:
+        # O total vem do header da página 1, que já entra no DataFrame
+        async for page, response in http_client.paginate(fetch, http_client.header_total, journal=journal):
+            with metrics.timer(f"flatten:answers:{survey_id}", "flatten"):
+                buffer.extend(ANSWERS.records(response.data), key=page)
+
+    with metrics.timer(f"flatten:answers:{survey_id}", "flatten"):
+        return _buffer_to_dataframe(buffer)
+
+
+def _buffer_to_dataframe(buffer: ColumnBuffer) -> pd.DataFrame:
+    if not len(buffer):
         print("Nenhuma resposta encontrada.")
         return pd.DataFrame()
 
-    df = pd.DataFrame(answers)
-    cols = ['id', 'grading', 'question_id', 'comment', 'participant_id', 'participant']
-    df = df[cols]
-
-    # Extrai campos aninhados
-    df['survey_id'] = df['participant'].apply(lambda x: x.get('survey_id'))
-    df['survey_participation_id'] = df['participant'].apply(lambda x: x.get('survey_participation_id'))
-    df['reviewer'] = df['participant'].apply(lambda x: x.get('reviewer'))
-    df['reviewee_id'] = df['participant'].apply(lambda x: x.get('reviewee_id'))
-    df['relationship'] = df['participant'].apply(lambda x: x.get('relationship'))
-    df['reviewer_id'] = df['reviewer'].apply(lambda x: x.get('id') if x else None)
-    df['user'] = df['reviewer'].apply(lambda x: x.get('user') if x else None)
-    df['reviewer_name'] = df['user'].apply(lambda x: x.get('name') if x else None)
-    df = df.drop(columns=['participant', 'reviewer', 'user'])
+    df = buffer.frame()
     print(df.dtypes)
+    return df
+
+
+def to_dataframe(data: list) -> pd.DataFrame:
+    """
+    Converte as páginas retornadas por async_main em um DataFrame de respostas.
+    """
+    # Extrai os campos (inclusive os aninhados) em uma única passada
+    buffer = ANSWERS.buffer()
+    for page in data:
+        buffer.extend(ANSWERS.records(page))
+    return _buffer_to_dataframe(buffer)
+
+
+def main(survey_id: int, incremental: bool = False) -> pd.DataFrame:
+    """
+    Executa o fluxo assíncrono e retorna um DataFrame com todas as respostas.
+    Com `incremental=True`, só busca o que mudou desde a última sincronização
+    (ver answers.sync); o DataFrame retornado é o mesmo de uma busca completa.
+    """
+    start = time.time()
+    df = asyncio.run(async_dataframe(survey_id, incremental))
 
     print(f"Tempo total: {time.time() - start:.2f} segundos")
     return df
@@ -0,0 +1,114 @@
+import json
+import os
+
+import http_client
+from schemas import ANSWERS
+from .answers import (
+    PER_PAGE,
+    answers_params,
+    answers_url,
+    fetch_page,
+    request_headers,
+)
+
+# Onde ficam as respostas já sincronizadas, um arquivo por survey
+STORE_DIR = os.getenv("QR_ANSWERS_STORE", os.path.join(".cache", "answers"))
+
+
+def _store_path(survey_id: int) -> str:
+    return os.path.join(STORE_DIR, f"{survey_id}.json")
+
+
+def load_store(survey_id: int):
+    """
+    Retorna {"total": int, "pages": [[resposta, ...], ...], "validators":
+    [{"etag": ..., "last-modified": ...}, ...]} ou None.
+    """
+    try:
+        with open(_store_path(survey_id), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_store(survey_id: int, store: dict):
+    os.makedirs(STORE_DIR, exist_ok=True)
+    path = _store_path(survey_id)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(store, f)
+    os.replace(f"{path}.tmp", path)
+
+
+# Headers de validação guardados por página
+VALIDATORS = ("etag", "last-modified")
+
+
+def _validators(headers: dict) -> dict:
+    return {name: headers[name] for name in VALIDATORS if headers.get(name)}
+
+
+def _conditional(headers: dict, validators: dict) -> dict:
+    headers = dict(headers)
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last-modified"):
+        headers["If-Modified-Since"] = validators["last-modified"]
+    return headers
+
+
+async def sync(survey_id: int, full: bool = False) -> list:
+    """
+    Sincroniza as respostas do survey e retorna a lista de JSONs por página,
+    no mesmo formato (e com o mesmo conteúdo) de answers.async_main.
+
+    A API não expõe data de alteração das respostas, então o marcador de
+    mudança é o da própria resposta HTTP: o histórico guarda, com cada
+    página, o ETag/Last-Modified dela, e cada sincronização revalida todas as
+    páginas com If-None-Match/If-Modified-Since. Um 304 mantém a página
+    guardada (sem corpo nem achatamento); um 200 a substitui. Assim respostas
+    novas, editadas ou removidas (mesmo com o total igual) aparecem como em
+    uma busca completa. Páginas sem validador (histórico antigo, ou se a API
+    não os enviar) são baixadas inteiras. `full=True` ignora o histórico.
+
+    O total vem dos headers da página 1 (ver http_client.paginate); se um 304
+    dela não trouxer o total, ela é baixada de novo sem condição.
+
+    Se alguma página falhar, levanta http_client.IncompletePages sem
+    atualizar o histórico. Não há diário: toda página é revalidada, inclusive
+    as que chegaram numa sincronização interrompida.
+    """
+    url = answers_url(survey_id)
+    params = answers_params()
+    headers = request_headers()
+    store = None if full else load_store(survey_id)
+    stored = store["pages"] if store is not None else []
+    validators = store.get("validators", []) if store is not None else []
+
+    async def fetch(page):
+        index = page - 1
+        known = validators[index] if index < len(validators) and index < len(stored) else {}
+        response = await fetch_page(url, _conditional(headers, known), page, session, params, ttl=0)
+        if response.status == 304 and known:
+            if page == 1 and "total" not in response.headers:
+                return await fetch_page(url, headers, page, session, params, ttl=0)
+            # Página inalterada: a guardada, com os validadores (e o total) do 304
+            return http_client.Response(200, url, {**known, **response.headers}, {"answers": stored[index]},
+                                        from_cache=True)
+        return response
+
+    results = {}
+    async with http_client.session() as session:
+        stream = http_client.paginate(fetch, http_client.header_total, per_page=PER_PAGE)
+        async for page, response in stream:
+            if page == 1:
+                total = http_client.header_total(response)
+            results[page] = (ANSWERS.records(response.data), _validators(response.headers))
+
+    ordered = [results[page] for page in sorted(results)]
+    store = {
+        "total": total,
+        "pages": [records for records, _ in ordered],
+        "validators": [page_validators for _, page_validators in ordered],
+    }
+    save_store(survey_id, store)
+    return [{"answers": page} for page in store["pages"]]
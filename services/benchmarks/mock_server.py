@@ -0,0 +1,275 @@
+"""
+Servidor local que imita as APIs usadas pelo relatório (Qulture REST, login
+e GraphQL do app e Factorial), para medir o pipeline sem acessar produção.
+
+Os dados são sintéticos e gerados página a página a partir do índice de
+cada registro, então 1M de respostas não ocupam memória no servidor.
+
+Uso (a partir de services/):
+    python -m benchmarks.mock_server --answers 100000 --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import json
+import random
+
+from aiohttp import web
+
+COMPANY_ID = "8378"
+SURVEY_ID = 1
+PER_PAGE = 100
+
+
+class MockData:
+    """
+    Volume dos dados sintéticos. Cada resposta é de um avaliado (contrato)
+    para uma pergunta; contratos e colaboradores do Factorial compartilham
+    o e-mail, como no merge real.
+    """
+    def __init__(self, answers: int = 1000, questions: int = 20, employees: int = 500, surveys: int = 50):
+        self.answers = answers
+        self.questions = questions
+        self.employees = employees
+        self.surveys = surveys
+
+    def survey(self, survey_id: int) -> dict:
+        return {
+            "id": survey_id,
+            "name": f"Avaliação de desempenho {survey_id}",
+            "stage": "finished",
+            "settings": {
+                "answer_period": {"start_at": "2025-01-01T00:00:00-03:00", "end_at": "2025-01-31T23:59:59-03:00"},
+                "grades_amount": 5,
+            },
+            "participants_count": self.employees,
+            "draft": False,
+        }
+
+    def topic(self, index: int) -> dict:
+        first = index * 5
+        return {
+            "id": 500 + index,
+            "name": f"Competência {index}",
+            "questions": [
+                {"id": 1000 + q, "name": f"Pergunta {q}"}
+                for q in range(first, min(first + 5, self.questions))
+            ],
+        }
+
+    def topics_count(self) -> int:
+        return -(-self.questions // 5)
+
+    def answer(self, index: int, survey_id: int) -> dict:
+        reviewee = index // self.questions % self.employees
+        reviewer = (reviewee + 1 + index % 7) % self.employees
+        return {
+            "id": index + 1,
+            "grading": index % 5 + 1,
+            "question_id": 1000 + index % self.questions,
+            "comment": f"Comentário {index}" if index % 3 == 0 else None,
+            "participant_id": index // self.questions + 1,
+            "participant": {
+                "survey_id": survey_id,
+                "survey_participation_id": reviewee + 1,
+                "reviewee_id": reviewee + 1,
+                "relationship": ("self", "leader", "peer", "led")[index % 4],
+                "reviewer": {"id": reviewer + 1, "user": {"name": f"Pessoa {reviewer}"}},
+            },
+        }
+
+    def contract(self, index: int) -> dict:
+        supervisor = index // 10
+        return {
+            "id": str(index + 1),
+            "name": f"Pessoa {index}",
+            "email": f"pessoa{index}@example.com",
+            "image": {"url": f"https://example.com/{index}.png"},
+            "supervisor": None if index == 0 else {
+                "id": str(supervisor + 1),
+                "name": f"Pessoa {supervisor}",
+                "email": f"pessoa{supervisor}@example.com",
+                "image": {"url": f"https://example.com/{supervisor}.png"},
+            },
+        }
+
+    def employee(self, index: int) -> dict:
+        return {
+            "id": 10000 + index,
+            "full_name": f"Pessoa {index}",
+            "email": f"pessoa{index}@example.com",
+            "manager_id": None if index == 0 else 10000 + index // 10,
+        }
+
+    def custom_field_value(self, index: int, field_id: int) -> dict:
+        return {
+            "id": field_id * 100000 + index,
+            "field_id": field_id,
+            "value": f"pessoa{index // 50}@example.com",
+            "valuable_id": 10000 + index,
+        }
+
+
+def _page_range(request, total: int, per_page: int = PER_PAGE) -> range:
+    page = int(request.query.get("page", 1))
+    per_page = int(request.query.get("per_page", per_page))
+    start = (page - 1) * per_page
+    return range(start, min(start + per_page, total))
+
+
+def _rest(request, key: str, total: int, make) -> web.Response:
+    # Qulture REST: total no header, como na API real
+    records = [make(index) for index in _page_range(request, total)]
+    return web.json_response({key: records}, headers={"total": str(total)})
+
+
+def _factorial(request, total: int, make) -> web.Response:
+    records = [make(index) for index in _page_range(request, total)]
+    return web.json_response({"data": records, "meta": {"total": total}})
+
+
+LOGIN_FORM = """<html><body><form action="/users/sign_in" method="post">
+<input type="hidden" name="utf8" value="&#x2713;">
+<input type="hidden" name="authenticity_token" value="mock-authenticity-token">
+<input type="submit" name="commit" value="Entrar">
+</form></body></html>"""
+
+LOGIN_PATHS = ("/", "/users/sign_in")
+
+HOME = """<html><head><meta name="csrf-token" content="mock-csrf-token"></head><body></body></html>"""
+
+
+def create_app(data: MockData, latency: float = 0.0, error_rate: float = 0.0,
+               retry_after: float = 0.1, seed: int = 0) -> web.Application:
+    """
+    Monta a aplicação. Cada requisição espera `latency` segundos e, com
+    probabilidade `error_rate`, responde 429 com Retry-After `retry_after`.
+    GET /__stats retorna a contagem de requisições atendidas.
+    """
+    stats = {"requests": 0, "throttled": 0}
+    rng = random.Random(seed)
+
+    @web.middleware
+    async def emulate(request, handler):
+        if request.path == "/__stats":
+            return await handler(request)
+        stats["requests"] += 1
+        if latency:
+            await asyncio.sleep(latency)
+        # O login usa requests sem novas tentativas, então só as APIs recebem 429
+        if error_rate and request.path not in LOGIN_PATHS and rng.random() < error_rate:
+            stats["throttled"] += 1
+            return web.json_response({"error": "Too Many Requests"}, status=429,
+                                     headers={"Retry-After": str(retry_after)})
+        return await handler(request)
+
+    async def surveys(request):
+        return _rest(request, "surveys", data.surveys, lambda index: data.survey(index + 1))
+
+    async def survey(request):
+        survey_id = int(request.match_info["survey_id"])
+        if not 1 <= survey_id <= data.surveys:
+            return web.json_response({"error": "Not Found"}, status=404)
+        return web.json_response({"survey": data.survey(survey_id)})
+
+    async def topics(request):
+        return _rest(request, "topics", data.topics_count(), data.topic)
+
+    async def answers(request):
+        survey_id = int(request.match_info["survey_id"])
+        return _rest(request, "answers", data.answers, lambda index: data.answer(index, survey_id))
+
+    async def sign_in_form(request):
+        return web.Response(text=LOGIN_FORM, content_type="text/html")
+
+    async def sign_in(request):
+        form = await request.post()
+        response = web.json_response({"user": {"email": form.get("user[email]")}})
+        response.set_cookie("_qulture_session", "mock-session")
+        return response
+
+    async def home(request):
+        return web.Response(text=HOME, content_type="text/html")
+
+    async def graphql(request):
+        variables = (await request.json()).get("variables", {})
+        page = int(variables.get("page", 1))
+        per = int(variables.get("per", PER_PAGE))
+        start = (page - 1) * per
+        nodes = [data.contract(index) for index in range(start, min(start + per, data.employees))]
+        return web.json_response({"data": {"contracts": {
+            "nodes": nodes,
+            "pageInfo": {"totalCount": data.employees},
+        }}})
+
+    async def employees(request):
+        return _factorial(request, data.employees, data.employee)
+
+    async def custom_field_values(request):
+        field_id = int(request.query.get("field_id", 0))
+        return _factorial(request, data.employees, lambda index: data.custom_field_value(index, field_id))
+
+    async def get_stats(request):
+        return web.json_response(stats)
+
+    rest = f"/rest/companies/{COMPANY_ID}"
+    app = web.Application(middlewares=[emulate])
+    app.router.add_get(f"{rest}/surveys", surveys)
+    app.router.add_get(rest + "/surveys/{survey_id}", survey)
+    app.router.add_get(rest + "/surveys/{survey_id}/topics", topics)
+    app.router.add_get(rest + "/surveys/{survey_id}/answers", answers)
+    app.router.add_get("/users/sign_in", sign_in_form)
+    app.router.add_post("/users/sign_in", sign_in)
+    app.router.add_get("/", home)
+    app.router.add_post(f"/{COMPANY_ID}/graphql", graphql)
+    app.router.add_get("/factorial/employees/employees", employees)
+    app.router.add_get("/factorial/custom_fields/values", custom_field_values)
+    app.router.add_get("/__stats", get_stats)
+    return app
+
+
+async def serve(app: web.Application, host: str = "127.0.0.1", port: int = 0):
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    # Com port=0 o sistema escolhe a porta; ela é impressa para quem iniciou o servidor
+    port = runner.addresses[0][1]
+    print(json.dumps({"port": port}), flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+def urls(port: int, host: str = "127.0.0.1") -> dict:
+    """
+    Variáveis de ambiente (settings) que apontam o pipeline para o servidor.
+    """
+    base = f"http://{host}:{port}"
+    return {
+        "QR_API_URL": f"{base}/rest",
+        "QR_APP_URL": base,
+        "FACTORIAL_API_URL": f"{base}/factorial",
+        "QR_COMPANY_ID": COMPANY_ID,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor mock das APIs Qulture/Factorial")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--answers", type=int, default=1000)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--employees", type=int, default=500)
+    parser.add_argument("--surveys", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0, help="segundos por requisição")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fração de respostas 429")
+    parser.add_argument("--retry-after", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    data = MockData(args.answers, args.questions, args.employees, args.surveys)
+    app = create_app(data, args.latency, args.error_rate, args.retry_after, args.seed)
+    asyncio.run(serve(app, port=args.port))
@@ -0,0 +1,191 @@
+"""
+Benchmark de ponta a ponta do relatório contra o servidor mock.
+
+Sobe o mock_server em outro processo, aponta o pipeline para ele (via
+settings) e roda o mesmo grafo de etapas do main, medindo o tempo de cada
+etapa, requisições por segundo, memória de pico e o tempo de escrita do
+relatório. Cache HTTP, store de respostas e catálogo ficam em um diretório
+temporário, então cada execução parte do zero.
+
+Uso (a partir de services/):
+    python -m benchmarks.run --answers 100000 --latency 0.05 --error-rate 0.01 --format parquet
+    python -m benchmarks.run --answers 1000000 --json > resultado.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SERVICES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(args) -> tuple:
+    """
+    Inicia o mock_server e retorna (processo, porta).
+    """
+    command = [
+        sys.executable, "-m", "benchmarks.mock_server",
+        "--answers", str(args.answers),
+        "--questions", str(args.questions),
+        "--employees", str(args.employees),
+        "--surveys", str(max(args.surveys, 50)),
+        "--latency", str(args.latency),
+        "--error-rate", str(args.error_rate),
+        "--retry-after", str(args.retry_after),
+        "--seed", str(args.seed),
+    ]
+    process = subprocess.Popen(command, cwd=SERVICES_DIR, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line:
+        process.kill()
+        raise RuntimeError("O servidor mock não iniciou")
+    return process, json.loads(line)["port"]
+
+
+def server_stats(port: int) -> dict:
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/__stats") as response:
+        return json.load(response)
+
+
+def peak_memory_mb() -> float:
+    """
+    Memória residente de pico do processo (None onde não há `resource`).
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss vem em KB no Linux e em bytes no macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def configure_env(port: int, workdir: str):
+    from benchmarks.mock_server import urls
+
+    os.environ.update(urls(port))
+    os.environ.update({
+        "QR_HTTP_CACHE": "0",
+        "QR_CACHE_DIR": os.path.join(workdir, "http"),
+        "QR_ANSWERS_STORE": os.path.join(workdir, "answers"),
+        "QR_SURVEYS_CATALOG": os.path.join(workdir, "surveys", "catalog.json"),
+        "QR_SESSION_CACHE": os.path.join(workdir, "auth", "session.json"),
+        "QR_JOURNAL_DIR": os.path.join(workdir, "journal"),
+        "QR_API_KEY": "mock",
+        "FACTORIAL_API_KEY": "mock",
+        "LOGIN": "benchmark@example.com",
+        "PASSWORD": "mock",
+    })
+
+
+def run(args) -> dict:
+    process, port = start_server(args)
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            # settings e os módulos de fonte leem o ambiente na importação
+            configure_env(port, workdir)
+            import main
+
+            survey_ids = list(range(1, args.surveys + 1))
+            report_path = os.path.join(workdir, "merge-{survey_id}")
+            pipeline = main.build_pipeline(survey_ids, combined=args.combined, report_path=report_path,
+                                           output_format=args.format)
+
+            if args.tracemalloc:
+                tracemalloc.start()
+            start = time.perf_counter()
+            results = asyncio.run(main.run_pipeline(pipeline))
+            elapsed = time.perf_counter() - start
+            traced_peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024) if args.tracemalloc else None
+            tracemalloc.stop()
+
+            stats = server_stats(port)
+            from metrics import registry as metrics
+            endpoints = metrics.endpoints()
+    finally:
+        process.terminate()
+        process.wait()
+
+    stages = {
+        name: {"start": start, "end": end, "seconds": end - start}
+        for name, (start, end) in sorted(pipeline.timings.items(), key=lambda item: item[1][0])
+    }
+    writes = [timing["seconds"] for name, timing in stages.items() if name == "write" or name.startswith("write:")]
+    return {
+        "answers": args.answers,
+        "surveys": args.surveys,
+        "latency": args.latency,
+        "error_rate": args.error_rate,
+        "format": args.format,
+        "rows": sum(len(results[f"report:{survey_id}"]) for survey_id in survey_ids),
+        "seconds": elapsed,
+        "requests": stats["requests"],
+        "throttled": stats["throttled"],
+        "requests_per_second": stats["requests"] / elapsed,
+        "peak_memory_mb": peak_memory_mb(),
+        "traced_peak_mb": traced_peak,
+        "write_seconds": sum(writes),
+        "stages": stages,
+        "endpoints": endpoints,
+    }
+
+
+def print_result(result: dict):
+    print(f"Respostas: {result['answers']} | surveys: {result['surveys']} | linhas no relatório: {result['rows']}")
+    print(f"Latência: {result['latency']}s | taxa de 429: {result['error_rate']} | formato: {result['format']}")
+    print()
+    print(f"{'Etapa':<32}{'início':>10}{'fim':>10}{'duração':>10}")
+    for name, timing in result["stages"].items():
+        print(f"{name:<32}{timing['start']:>10.3f}{timing['end']:>10.3f}{timing['seconds']:>10.3f}")
+    print()
+    print(f"Tempo total: {result['seconds']:.2f}s")
+    print(f"Requisições: {result['requests']} ({result['throttled']} com 429), {result['requests_per_second']:.1f} req/s")
+    print(f"Escrita do relatório: {result['write_seconds']:.2f}s")
+    if result["peak_memory_mb"] is not None:
+        print(f"Memória de pico (RSS): {result['peak_memory_mb']:.1f} MB")
+    if result["traced_peak_mb"] is not None:
+        print(f"Memória de pico (tracemalloc): {result['traced_peak_mb']:.1f} MB")
+    print()
+    print(f"{'Endpoint':<48}{'req':>8}{'retries':>8}{'latência':>10}{'espera':>10}{'MB':>8}")
+    for total in result["endpoints"]:
+        average = total["seconds"] / total["requests"] if total["requests"] else 0.0
+        print(f"{total['endpoint']:<48}{total['requests']:>8}{total['retries']:>8}{average:>10.3f}"
+              f"{total['wait']:>10.2f}{total['bytes'] / 1e6:>8.1f}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do relatório contra o servidor mock")
+    parser.add_argument("--answers", type=int, default=1000, help="respostas por survey (1k a 1M)")
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--employees", type=int, default=500)
+    parser.add_argument("--surveys", type=int, default=1, help="surveys no mesmo run (como em main.batch)")
+    parser.add_argument("--combined", action="store_true", help="um único relatório para todos os surveys")
+    parser.add_argument("--latency", type=float, default=0.0, help="segundos por requisição")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fração de respostas 429")
+    parser.add_argument("--retry-after", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", default="xlsx", help="xlsx, csv ou parquet")
+    parser.add_argument("--tracemalloc", action="store_true", help="mede também as alocações Python (mais lento)")
+    parser.add_argument("--json", action="store_true", help="imprime o resultado em JSON")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    # Com --json, as mensagens do pipeline vão para o stderr para não misturar com o resultado
+    with contextlib.redirect_stdout(sys.stderr if args.json else sys.stdout):
+        result = run(args)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_result(result)
@@ -0,0 +1,237 @@
+"""
+Linha de comando do relatório.
+
+Cada subcomando importa só o que usa (pandas, aiohttp, requests, openpyxl
+e as credenciais são carregados dentro do próprio comando), então comandos
+rápidos como `health` começam em milissegundos.
+
+Uso (a partir de services/):
+    python cli.py report 102617
+    python cli.py report 102617 102618 --combined --format parquet
+    python cli.py answers 102617 --incremental
+    python cli.py participants
+    python cli.py serve --port 8765
+    python cli.py health
+"""
+import argparse
+import os
+import sys
+import time
+
+# Variáveis exigidas por cada fonte
+CREDENTIALS = {
+    "qulture": ["QR_API_KEY"],
+    "app": ["LOGIN", "PASSWORD"],
+    "factorial": ["FACTORIAL_API_KEY"],
+}
+
+
+def load_env():
+    """
+    Carrega o .env, se o python-dotenv estiver instalado.
+    """
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv()
+
+
+def missing_credentials(*sources) -> list:
+    return [name for source in sources for name in CREDENTIALS[source] if not os.getenv(name)]
+
+
+def require(*sources):
+    missing = missing_credentials(*sources)
+    if missing:
+        sys.exit(f"Variáveis de ambiente ausentes: {', '.join(missing)}")
+
+
+def save(df, path, output_format):
+    import writers
+
+    if df.empty:
+        print("DataFrame vazio.")
+        return
+    path = writers.write(df, path, output_format)
+    print(f"{len(df)} linhas salvas em {path}")
+
+
+# Subcomandos
+
+def cmd_report(args):
+    require("qulture", "app", "factorial")
+    if args.metrics_dir:
+        # Lido por main na importação
+        os.environ["QR_METRICS_DIR"] = args.metrics_dir
+    import main
+
+    output = args.output or ("merge" if len(args.survey_ids) == 1 and not args.combined else "merge-{survey_id}")
+    start = time.time()
+    reports = main.batch(args.survey_ids, args.incremental, args.combined, output,
+                         args.format, args.debug_dumps, not args.no_summary)
+    for survey_id, df in reports.items():
+        print(f"Survey {survey_id}: {len(df)} linhas")
+    print(f"Execution time: {time.time() - start:.2f} seconds")
+
+
+def cmd_answers(args):
+    require("qulture")
+    from answers import answers_main
+
+    save(answers_main(args.survey_id, args.incremental), args.output or f"answers-{args.survey_id}", args.format)
+
+
+def cmd_sync(args):
+    require("qulture")
+    import asyncio
+    from answers import answers_sync
+
+    pages = asyncio.run(answers_sync(args.survey_id, args.full))
+    print(f"{sum(len(page.get('answers', [])) for page in pages)} respostas sincronizadas")
+
+
+def cmd_topics(args):
+    require("qulture")
+    from topics import topics_main
+
+    save(topics_main(args.survey_id), args.output or f"topics-{args.survey_id}", args.format)
+
+
+def cmd_surveys(args):
+    require("qulture")
+    import asyncio
+    from surveys import surveys_refresh_catalog
+
+    catalog = asyncio.run(surveys_refresh_catalog(args.refresh))
+    for survey in catalog["surveys"].values():
+        print(f"{survey['id']}\t{survey.get('name')}")
+
+
+def cmd_participants(args):
+    require("app")
+    from participants import participants_main
+
+    save(participants_main(), args.output or "participants", args.format)
+
+
+def cmd_employees(args):
+    require("factorial")
+    import asyncio
+    from factorial.factorial_employees import main as employees_main
+
+    save(asyncio.run(employees_main()), args.output or "factorial_employees", args.format)
+
+
+def cmd_custom_fields(args):
+    require("factorial")
+    import asyncio
+    from factorial.factorial_customfields import FIELDS, custom_fields
+
+    unknown = [name for name in args.fields if name not in FIELDS]
+    if unknown:
+        sys.exit(f"Custom fields desconhecidos: {', '.join(unknown)} (disponíveis: {', '.join(FIELDS)})")
+    fields = {name: FIELDS[name] for name in args.fields or FIELDS}
+    save(asyncio.run(custom_fields(fields)), args.output or "custom-fields", args.format)
+
+
+def cmd_serve(args):
+    require("qulture", "app", "factorial")
+    from service import serve
+
+    serve(args.host, args.port)
+
+
+def cmd_health(args):
+    """
+    Checagem para o cron: credenciais presentes (e, com --imports, que as
+    dependências pesadas importam). Sai com código 1 se algo faltar.
+    """
+    problems = [f"variável ausente: {name}" for name in missing_credentials(*CREDENTIALS)]
+    if args.imports:
+        import importlib
+        for module in ("pandas", "aiohttp", "requests", "openpyxl"):
+            try:
+                importlib.import_module(module)
+            except ImportError as e:
+                problems.append(f"dependência ausente: {e.name}")
+    for problem in problems:
+        print(problem)
+    if problems:
+        sys.exit(1)
+    print("ok")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Relatório de avaliação de desempenho (Qulture + Factorial)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def output_args(command, output_help="arquivo de saída (a extensão segue o formato)"):
+        command.add_argument("--output", "-o", help=output_help)
+        command.add_argument("--format", "-f", default=os.getenv("QR_OUTPUT_FORMAT", "xlsx"),
+                             choices=["xlsx", "csv", "parquet"])
+
+    report = commands.add_parser("report", help="gera o relatório completo de um ou mais surveys")
+    report.add_argument("survey_ids", type=int, nargs="+")
+    report.add_argument("--incremental", action="store_true", help="respostas pela sincronização incremental")
+    report.add_argument("--combined", action="store_true", help="um único arquivo para todos os surveys")
+    report.add_argument("--debug-dumps", action="store_true", help="escreve também os arquivos intermediários")
+    report.add_argument("--no-summary", action="store_true", help="não gera as tabelas de resumo das notas")
+    report.add_argument("--metrics-dir", help="exporta metrics.json e metrics.prom neste diretório")
+    output_args(report, "caminho do relatório; pode conter {survey_id}")
+    report.set_defaults(func=cmd_report)
+
+    answers = commands.add_parser("answers", help="busca as respostas de um survey")
+    answers.add_argument("survey_id", type=int)
+    answers.add_argument("--incremental", action="store_true")
+    output_args(answers)
+    answers.set_defaults(func=cmd_answers)
+
+    sync = commands.add_parser("sync", help="sincroniza o store local de respostas de um survey")
+    sync.add_argument("survey_id", type=int)
+    sync.add_argument("--full", action="store_true", help="baixa tudo de novo")
+    sync.set_defaults(func=cmd_sync)
+
+    topics = commands.add_parser("topics", help="busca as perguntas de um survey")
+    topics.add_argument("survey_id", type=int)
+    output_args(topics)
+    topics.set_defaults(func=cmd_topics)
+
+    surveys = commands.add_parser("surveys", help="lista o catálogo de surveys")
+    surveys.add_argument("--refresh", action="store_true", help="atualiza o catálogo mesmo dentro do TTL")
+    surveys.set_defaults(func=cmd_surveys)
+
+    participants = commands.add_parser("participants", help="busca os contratos (participantes) do app")
+    output_args(participants)
+    participants.set_defaults(func=cmd_participants)
+
+    employees = commands.add_parser("employees", help="busca os colaboradores do Factorial")
+    output_args(employees)
+    employees.set_defaults(func=cmd_employees)
+
+    custom_fields = commands.add_parser("custom-fields", help="busca custom fields do Factorial (todos, por padrão)")
+    custom_fields.add_argument("fields", nargs="*", help="nomes dos campos (ex.: tlSr coord head)")
+    output_args(custom_fields)
+    custom_fields.set_defaults(func=cmd_custom_fields)
+
+    serve = commands.add_parser("serve", help="serviço HTTP local com os dados de referência em memória")
+    serve.add_argument("--host", default=os.getenv("QR_SERVICE_HOST", "127.0.0.1"))
+    serve.add_argument("--port", type=int, default=int(os.getenv("QR_SERVICE_PORT", "8765")))
+    serve.set_defaults(func=cmd_serve)
+
+    health = commands.add_parser("health", help="checagem rápida de configuração, para o cron")
+    health.add_argument("--imports", action="store_true", help="verifica também as dependências")
+    health.set_defaults(func=cmd_health)
+
+    args = parser.parse_args(argv)
+    if (args.command == "report" and args.output and not args.combined
+            and len(set(args.survey_ids)) > 1 and "{survey_id}" not in args.output):
+        # Cada survey escreveria por cima do relatório do anterior
+        report.error("--output precisa conter {survey_id} com mais de um survey (ou use --combined)")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    load_env()
+    args.func(args)
@@ -0,0 +1,35 @@
+import pandas as pd
+
+import http_client
+
+
+async def fetch_page(session, url, headers, page, schema=None):
+    response = await http_client.get_json(session, url, headers, params={'page': page}, schema=schema)
+    response.raise_for_status()
+    return response
+
+async def get_data_async(url, headers, schema=None):
+    """
+    Busca todas as páginas de `url`. Com um schema, cada página é
+    decodificada só nos campos declarados e o DataFrame sai com as colunas
+    do schema; sem ele, com todos os campos. Páginas que faltarem são
+    retomadas do diário na próxima busca (ver http_client.paginate).
+    """
+    journal = http_client.open_journal(url, variant=schema.name if schema is not None else None)
+
+    async def fetch(page):
+        return await fetch_page(session, url, headers, page, schema)
+
+    async with http_client.session() as session:
+        # Registros de cada página; o envelope JSON é descartado assim que a página chega.
+        # O total (meta.total) vem da página 1, e as demais são buscadas em paralelo.
+        records = {}
+        async for page, response in http_client.paginate(fetch, http_client.meta_total, journal=journal):
+            records[page] = response.data['data']
+
+        # Processar e consolidar os dados, na ordem das páginas
+        data = [item for page in sorted(records) for item in records[page]]
+
+    if schema is not None:
+        return schema.buffer().extend(data).frame()
+    return pd.DataFrame(data)
@@ -1,98 +1,85 @@
 import pandas as pd
 import asyncio
-import aiohttp
 import os
 
-headers = {
-    "accept": "application/json",
-    "x-api-key": f"{os.environ['FACTORIAL_API_KEY']}"
+import http_client
+import settings
+from schemas import CUSTOM_FIELD_VALUES
+from .client import get_data_async
+
+def request_headers():
+    # A chave é lida só na hora da busca: importar o módulo não exige credenciais
+    return {
+        "accept": "application/json",
+        "x-api-key": f"{os.environ['FACTORIAL_API_KEY']}"
+    }
+
+URL = f"{settings.FACTORIAL_API_URL}/custom_fields/values"
+
+# Custom fields usados nos relatórios: {nome: field_id}
+FIELDS = {
+    "effective_date": 3127483,
+    "contract_type": 2420955,
+    "head": 3077197,
+    "position": 3041996,
+    "area": 4220531,
+    "tlSr": 6334755,
+    "coord": 6334757,
 }
 
-async def fetch_page(session, url, headers, page):
-    async with session.get(url, headers=headers, params={'page': page}) as response:
-        response.raise_for_status()
-        return await response.json()
 
-async def get_data_async(url, headers):
-    async with aiohttp.ClientSession() as session:
-        # Obter informações iniciais para calcular o total de páginas
-        first_response = await fetch_page(session, url, headers, 1)
-        total_items = first_response['meta']['total']
-        total_pages = (total_items // 100) + 1
+async def field_values(field_id):
+    """
+    Todos os valores de um custom field (uma linha por valor).
+    """
+    return await get_data_async(f"{URL}?field_id={field_id}", request_headers(), CUSTOM_FIELD_VALUES)
 
 
-        # Adicionar a primeira página aos resultados
-        results = [first_response]
+def _values_by_employee(df):
+    if df.empty:
+        return pd.Series(dtype=object)
+    # Se houver mais de um valor por colaborador, fica o último
+    df = df.drop_duplicates('valuable_id', keep='last')
+    return df.set_index('valuable_id')['value']
 
-        # Criar tarefas para as demais páginas
-        tasks = [
-            fetch_page(session, url, headers, page)
-            for page in range(2, total_pages + 1)
-        ]
 
-        # Executar as requisições em paralelo
-        results.extend(await asyncio.gather(*tasks))
+async def custom_fields(fields: dict):
+    """
+    Busca vários custom fields de uma vez, com todas as páginas de todos os
+    campos em paralelo na mesma sessão.
 
-        # Processar e consolidar os dados
-        data = [item for result in results for item in result['data']]
+    `fields` mapeia o nome da coluna ao field_id. Retorna uma tabela larga
+    com a coluna valuable_id (id do colaborador) e uma coluna por campo.
+    """
+    async with http_client.session():
+        results = await asyncio.gather(*(field_values(field_id) for field_id in fields.values()))
 
-    return pd.DataFrame(data)
+    columns = [_values_by_employee(df).rename(name) for name, df in zip(fields, results)]
+    wide = pd.concat(columns, axis=1)
+    wide.index.name = 'valuable_id'
+    return wide.reset_index()
 
 
 async def effective_date():
-    url = "https://api.factorialhr.com/api/2024-10-01/resources/custom_fields/values?field_id=3127483"
-
-    employees = await get_data_async(url, headers)
-
-    return employees
-
+    return await field_values(FIELDS["effective_date"])
 
 async def contract_type():
-    url = "https://api.factorialhr.com/api/2024-10-01/resources/custom_fields/values?field_id=2420955"
-
-    employees = await get_data_async(url, headers)
-
-    return employees
+    return await field_values(FIELDS["contract_type"])
 
 async def head():
-
-    url = "https://api.factorialhr.com/api/2024-10-01/resources/custom_fields/values?field_id=3077197"
-
-    employees = await get_data_async(url, headers)
-
-    return employees
+    return await field_values(FIELDS["head"])
 
 async def position():
-
-    url = "https://api.factorialhr.com/api/2024-10-01/resources/custom_fields/values?field_id=3041996"
-
-    employees = await get_data_async(url, headers)
-
-    return employees
+    return await field_values(FIELDS["position"])
 
 async def area():
-
-    url = "https://api.factorialhr.com/api/2024-10-01/resources/custom_fields/values?field_id=4220531"
-
-    employees = await get_data_async(url, headers)
-
-    return employees
+    return await field_values(FIELDS["area"])
 
 async def tlSr():
-
-    url = "https://api.factorialhr.com/api/2024-10-01/resources/custom_fields/values?field_id=6334755"
-
-    employees = await get_data_async(url, headers)
-
-    return employees
+    return await field_values(FIELDS["tlSr"])
 
 async def coord():
-
-    url = "https://api.factorialhr.com/api/2024-10-01/resources/custom_fields/values?field_id=6334757"
-
-    employees = await get_data_async(url, headers)
-
-    return employees
+    return await field_values(FIELDS["coord"])
 
 if __name__ == "__main__":
     df = asyncio.run(contract_type())
@@ -1,49 +1,24 @@
-import pandas as pd
 import asyncio
-import aiohttp
 import os
 
-async def fetch_page(session, url, headers, page):
-    async with session.get(url, headers=headers, params={'page': page}) as response:
-        response.raise_for_status()
-        return await response.json()
-
-async def get_data_async(url, headers):
-    async with aiohttp.ClientSession() as session:
-        # Obter informações iniciais para calcular o total de páginas
-        first_response = await fetch_page(session, url, headers, 1)
-        total_items = first_response['meta']['total']
-        total_pages = (total_items // 100) + 1
-
-
-        # Adicionar a primeira página aos resultados
-        results = [first_response]
-
-        # Criar tarefas para as demais páginas
-        tasks = [
-            fetch_page(session, url, headers, page)
-            for page in range(2, total_pages + 1)
-        ]
-
-        # Executar as requisições em paralelo
-        results.extend(await asyncio.gather(*tasks))
-
-        # Processar e consolidar os dados
-        data = [item for result in results for item in result['data']]
-
-    return pd.DataFrame(data)
+import settings
+from schemas import EMPLOYEES
+from .client import get_data_async
+from .hierarchy import direct_manager
 
 async def main():
-    url = "https://api.factorialhr.com/api/2024-10-01/resources/employees/employees?only_active=false&only_managers=false"
+    url = f"{settings.FACTORIAL_API_URL}/employees/employees?only_active=false&only_managers=false"
     headers = {
         "accept": "application/json",
         "x-api-key": f"{os.environ['FACTORIAL_API_KEY']}"
     }
 
     # Obter dados da API
-    employees = await get_data_async(url, headers)
+    employees = await get_data_async(url, headers, EMPLOYEES)
 
-    employees['team_leader'] = pd.merge(employees, employees, left_on="manager_id", right_on="id", how="left")["email_y"]
+    # E-mail do gestor direto (sem self-merge); a Hierarchy completa só é
+    # montada com QR_LEADERS_FROM=hierarchy (ver leaders_table)
+    employees['team_leader'] = direct_manager(employees['id'], employees['manager_id'], employees['email'])
 
     return employees
 
@@ -0,0 +1,215 @@
+import numpy as np
+import pandas as pd
+
+# Profundidade a partir da qual a hierarquia é conferida atrás de ciclos nos
+# manager_id (cadeias legítimas mais longas continuam funcionando)
+MAX_DEPTH = 64
+
+
+def _first_positions(ids) -> pd.Series:
+    """
+    {id: posição da primeira linha com esse id}. Ids duplicados ficam só
+    com a primeira linha, com um aviso.
+    """
+    ids = pd.to_numeric(pd.Series(ids).reset_index(drop=True), errors="coerce")
+    duplicated = ids.duplicated(keep="first") & ids.notna()
+    if duplicated.any():
+        print(f"[hierarchy] Ids duplicados, usando a primeira linha de cada: {ids[duplicated].unique().tolist()[:10]}")
+    positions = pd.Series(np.arange(len(ids)), index=ids.values)
+    return positions[~(duplicated | ids.isna()).values]
+
+
+def _parents(positions: pd.Series, manager_ids) -> np.ndarray:
+    managers = pd.to_numeric(pd.Series(manager_ids).reset_index(drop=True), errors="coerce")
+    parent = positions.reindex(managers.values).fillna(-1).to_numpy(dtype=np.int64)
+    parent[parent == np.arange(len(parent))] = -1
+    return parent
+
+
+def direct_manager(ids, manager_ids, values) -> pd.Series:
+    """
+    Para cada linha, o valor de `values` do gestor direto (ausente se o
+    manager_id não existir entre os ids). Uma consulta simples, sem montar
+    a Hierarchy: nunca falha por ciclos nem por ids duplicados.
+    """
+    parent = _parents(_first_positions(ids), manager_ids)
+    values = pd.Series(values)
+    picked = values.reset_index(drop=True).take(np.maximum(parent, 0)).reset_index(drop=True)
+    picked = picked.where(parent >= 0)
+    picked.index = values.index
+    return picked
+
+
+def _break_cycles(parent: np.ndarray, ids: pd.Series):
+    """
+    Corta um ponteiro de cada ciclo (quem fecha o ciclo vira raiz), com um
+    aviso. Altera `parent` no lugar.
+    """
+    state = np.zeros(len(parent), dtype=np.int8)  # 0 não visto, 1 no caminho atual, 2 resolvido
+    for start in range(len(parent)):
+        path = []
+        node = start
+        while node >= 0 and state[node] == 0:
+            state[node] = 1
+            path.append(node)
+            node = parent[node]
+        if node >= 0 and state[node] == 1:
+            cycle = path[path.index(node):]
+            print(f"[hierarchy] Ciclo nos manager_id {ids.take(cycle).tolist()[:10]}: {ids[node]} vira raiz")
+            parent[node] = -1
+        state[path] = 2
+
+
+class Hierarchy:
+    """
+    Índice da hierarquia a partir dos ponteiros id -> manager_id, montado em
+    passadas vetorizadas (uma por nível, não por colaborador).
+
+    Guarda, para cada linha do frame de origem, a posição de todos os seus
+    gestores (`up[k]` é o gestor k níveis acima; -1 se não houver), a
+    profundidade (0 para quem não tem gestor) e a ordem em pré-ordem da
+    árvore, em que os liderados de cada pessoa formam um intervalo contínuo.
+    Assim "gestor no nível N", "está abaixo de X" e "todos abaixo de X" são
+    só indexações de arrays.
+
+    Um manager_id que não existe entre os ids (ou igual ao próprio id) é
+    tratado como ausente: a pessoa vira raiz. Dados ruins não impedem a
+    montagem: de ids duplicados vale a primeira linha, e em um ciclo
+    (A -> B -> A) o ponteiro de quem fecha o ciclo é cortado, com um aviso.
+    """
+
+    def __init__(self, ids, manager_ids):
+        ids = pd.Series(ids)
+        self.row_index = ids.index
+        self.ids = ids.reset_index(drop=True)
+        self._positions = _first_positions(self.ids)
+        parent = _parents(self._positions, manager_ids)
+        n = len(parent)
+
+        # up[k, i]: posição do gestor k níveis acima de i
+        levels = self._levels(parent)
+        if levels is None:
+            _break_cycles(parent, self.ids)
+            # Sem ciclos, nenhuma cadeia passa de n níveis
+            levels = self._levels(parent, n)
+        self.parent = parent
+        self.up = np.vstack(levels)
+        self.depth = (self.up[1:] >= 0).sum(axis=0)
+
+        # down[l, i]: posição do ancestral de i no nível l a partir do topo (0 = raiz)
+        top = len(levels) - 1
+        steps = self.depth[None, :] - np.arange(top + 1)[:, None]
+        self.down = np.where(steps >= 0, self.up[np.clip(steps, 0, top), np.arange(n)[None, :]], -1)
+
+        # Pré-ordem: ordenar pelo caminho desde a raiz põe cada pessoa antes
+        # dos seus liderados (o -1 depois do fim do caminho vem primeiro)
+        self.order = np.lexsort(self.down[::-1]) if n else np.arange(0)
+        self.start = np.empty(n, dtype=np.int64)
+        self.start[self.order] = np.arange(n)
+        # Tamanho da subárvore: cada pessoa conta 1 para cada um dos seus gestores
+        self.size = np.ones(n, dtype=np.int64)
+        for ancestors in self.up[1:]:
+            np.add.at(self.size, ancestors[ancestors >= 0], 1)
+
+    @staticmethod
+    def _levels(parent: np.ndarray, max_depth: int = MAX_DEPTH):
+        """
+        [posições, gestores, gestores dos gestores, ...] até a raiz de todas
+        as cadeias; None se alguma passar de `max_depth` níveis.
+        """
+        levels = [np.arange(len(parent))]
+        current = parent
+        while (current >= 0).any():
+            if len(levels) > max_depth:
+                return None
+            levels.append(current)
+            current = np.where(current >= 0, parent[np.maximum(current, 0)], -1)
+        return levels
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, id_column: str = "id", manager_column: str = "manager_id") -> "Hierarchy":
+        return cls(df[id_column], df[manager_column])
+
+    def _position(self, employee_id) -> int:
+        position = self._positions.get(int(employee_id))
+        if position is None:
+            raise KeyError(employee_id)
+        return int(position)
+
+    def _take(self, values, positions: np.ndarray) -> pd.Series:
+        """
+        `values` (coluna do frame de origem) nas `positions`, com ausente
+        onde a posição é -1; indexado como o frame de origem.
+        """
+        values = pd.Series(values).reset_index(drop=True)
+        picked = values.take(np.maximum(positions, 0)).reset_index(drop=True)
+        picked = picked.where(positions >= 0)
+        picked.index = self.row_index
+        return picked
+
+    def manager(self, values) -> pd.Series:
+        """
+        Para cada linha, o valor de `values` do gestor direto (ex.: o e-mail
+        do líder imediato).
+        """
+        return self._take(values, self.parent)
+
+    def ancestor(self, values, levels_up: int) -> pd.Series:
+        """
+        Para cada linha, o valor de `values` do gestor `levels_up` níveis acima.
+        """
+        positions = self.up[levels_up] if levels_up < len(self.up) else np.full(len(self.parent), -1)
+        return self._take(values, positions)
+
+    def leader_at(self, level: int, values) -> pd.Series:
+        """
+        Para cada linha, o valor de `values` de quem está no nível `level` da
+        sua cadeia, contado do topo (0 = raiz). Quem está exatamente nesse
+        nível recebe o próprio valor; quem está acima dele fica ausente.
+        """
+        positions = self.down[level] if level < len(self.down) else np.full(len(self.parent), -1)
+        return self._take(values, positions)
+
+    def depths(self) -> pd.Series:
+        return pd.Series(self.depth, index=self.row_index)
+
+    def chain(self, employee_id) -> list:
+        """
+        Ids da cadeia de gestão de `employee_id`, do topo até ele.
+        """
+        position = self._position(employee_id)
+        path = self.down[:self.depth[position] + 1, position]
+        return self.ids.take(path).tolist()
+
+    def reports(self, employee_id, direct: bool = False) -> list:
+        """
+        Ids de todos abaixo de `employee_id` (só os diretos, com `direct=True`).
+        """
+        position = self._position(employee_id)
+        if direct:
+            return self.ids[self.parent == position].tolist()
+        members = self.order[self.start[position] + 1:self.start[position] + self.size[position]]
+        return self.ids.take(members).tolist()
+
+    def is_under(self, employee_id) -> pd.Series:
+        """
+        Para cada linha, se ela está abaixo de `employee_id` na hierarquia.
+        """
+        position = self._position(employee_id)
+        first = self.start[position]
+        inside = (self.start > first) & (self.start < first + self.size[position])
+        return pd.Series(inside, index=self.row_index)
+
+
+def leaders_table(employees: pd.DataFrame, levels: dict) -> pd.DataFrame:
+    """
+    Tabela larga de líderes tirada só da hierarquia, no mesmo formato de
+    custom_fields (valuable_id + uma coluna por líder), sem buscar custom
+    fields. `levels` mapeia cada coluna a (nível a partir do topo, coluna de
+    employees com o valor), ex.: {'heads_value': (1, 'email')}.
+    """
+    hierarchy = Hierarchy.from_frame(employees)
+    table = pd.DataFrame({'valuable_id': employees['id']})
+    for column, (level, source) in levels.items():
+        table[column] = hierarchy.leader_at(level, employees[source])
+    return table.reset_index(drop=True)
@@ -0,0 +1,7 @@
+from .flatten import flatten, explode, ColumnBuffer
+
+__all__ = [
+    "flatten",
+    "explode",
+    "ColumnBuffer",
+]
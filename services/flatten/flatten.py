@@ -0,0 +1,107 @@
+import pandas as pd
+
+_MISSING = object()
+
+
+def _compile(fields: dict) -> list:
+    """
+    Converte {coluna: "a.b.c"} em [(coluna, ("a", "b", "c")), ...].
+    """
+    return [(column, tuple(path.split("."))) for column, path in fields.items()]
+
+
+def _walk(record, path: tuple, default):
+    value = record
+    for key in path:
+        if not isinstance(value, dict):
+            return default
+        value = value.get(key, _MISSING)
+        if value is _MISSING:
+            return default
+    return value
+
+
+class ColumnBuffer:
+    """
+    Acumula registros JSON já achatados em listas por coluna, para montar o
+    DataFrame só no fim sem guardar os JSONs originais.
+
+    Os registros podem chegar em blocos fora de ordem (ex.: páginas que
+    terminam em ordem diferente): cada bloco recebe uma chave e frame()
+    junta os blocos em ordem crescente de chave.
+
+    Com `items`, gera uma linha por elemento da lista nesse caminho de cada
+    registro; `fields` é lido de cada elemento e `parent_fields` do registro
+    que contém a lista (as colunas saem nessa ordem).
+
+    `dtypes` mapeia colunas a conversores (lista de valores -> Series, ex.:
+    schemas.dtypes.ids): cada coluna é convertida assim que é montada, sem
+    passar por uma coluna object do tamanho do DataFrame inteiro.
+    """
+
+    def __init__(self, fields: dict, items: str = None, parent_fields: dict = None, default=None,
+                 dtypes: dict = None):
+        self.paths = _compile(fields)
+        self.item_path = tuple(items.split(".")) if items else None
+        self.parent_paths = _compile(parent_fields or {})
+        self.default = default
+        self.dtypes = dtypes or {}
+        self.columns = [column for column, _ in self.paths + self.parent_paths]
+        self._chunks = {}
+
+    def extend(self, records, key=0) -> "ColumnBuffer":
+        chunk = self._chunks.setdefault(key, {column: [] for column in self.columns})
+        if self.item_path is None:
+            for record in records:
+                for column, path in self.paths:
+                    chunk[column].append(_walk(record, path, self.default))
+            return self
+
+        for record in records:
+            children = _walk(record, self.item_path, None) or []
+            if not children:
+                continue
+            parent_values = [(column, _walk(record, path, self.default)) for column, path in self.parent_paths]
+            for child in children:
+                for column, path in self.paths:
+                    chunk[column].append(_walk(child, path, self.default))
+                for column, value in parent_values:
+                    chunk[column].append(value)
+        return self
+
+    def __len__(self) -> int:
+        first = self.columns[0] if self.columns else None
+        return sum(len(chunk[first]) for chunk in self._chunks.values()) if first else 0
+
+    def frame(self) -> pd.DataFrame:
+        keys = sorted(self._chunks)
+        columns = {}
+        for column in self.columns:
+            values = [value for key in keys for value in self._chunks[key][column]]
+            convert = self.dtypes.get(column)
+            columns[column] = convert(values) if convert else values
+        return pd.DataFrame(columns)
+
+
+def flatten(records, fields: dict, default=None) -> pd.DataFrame:
+    """
+    Achata uma lista (ou qualquer iterável) de registros JSON aninhados em
+    colunas, em uma única passada.
+
+    `fields` mapeia o nome de cada coluna ao caminho do campo, com os níveis
+    separados por ponto (ex.: {"reviewer_name": "participant.reviewer.user.name"}).
+    Quando algum nível do caminho não existe ou não é um dict, a coluna recebe
+    `default`; um valor None presente no último nível é mantido.
+    """
+    return ColumnBuffer(fields, default=default).extend(records).frame()
+
+
+def explode(records, items: str, fields: dict, parent_fields: dict = None, default=None) -> pd.DataFrame:
+    """
+    Como flatten, mas gera uma linha por elemento da lista em `items` de cada
+    registro (ex.: uma linha por pergunta de cada tópico).
+
+    `fields` é lido de cada elemento da lista e `parent_fields` do registro
+    que contém a lista; as colunas saem nessa ordem.
+    """
+    return ColumnBuffer(fields, items, parent_fields, default).extend(records).frame()
@@ -0,0 +1,39 @@
+from .http_client import session, get_json, request_json, Response, HTTPError, IncompletePages
+from .cache import ResponseCache
+from .limiter import HostLimiter, limiter_for, limiters
+from .journal import PageJournal, open_journal
+from .pagination import (
+    PER_PAGE,
+    stream_pages,
+    fetch_pages,
+    paginate,
+    collect_pages,
+    page_count,
+    header_total,
+    meta_total,
+    graphql_total,
+)
+
+__all__ = [
+    "session",
+    "get_json",
+    "request_json",
+    "Response",
+    "HTTPError",
+    "IncompletePages",
+    "ResponseCache",
+    "HostLimiter",
+    "limiter_for",
+    "limiters",
+    "PageJournal",
+    "open_journal",
+    "PER_PAGE",
+    "stream_pages",
+    "fetch_pages",
+    "paginate",
+    "collect_pages",
+    "page_count",
+    "header_total",
+    "meta_total",
+    "graphql_total",
+]
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import time
+
+# Diretório e tamanho máximo do cache em disco (pode ser alterado por variável de ambiente)
+CACHE_DIR = os.getenv("QR_CACHE_DIR", os.path.join(".cache", "http"))
+MAX_BYTES = int(os.getenv("QR_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+# Ao estourar MAX_BYTES, remove as entradas mais antigas até voltar a esta fração
+EVICT_TO = 0.9
+
+# TTL (s) por endpoint: o primeiro trecho de URL que casar define o TTL.
+# Depois do TTL a entrada não é descartada: é revalidada com ETag/Last-Modified.
+TTLS = [
+    ("/answers", 5 * 60),
+    ("/topics", 60 * 60),
+    ("/surveys", 60 * 60),
+    ("/custom_fields/values", 60 * 60),
+    ("/employees/employees", 60 * 60),
+]
+DEFAULT_TTL = 0
+
+
+def ttl_for(url: str) -> int:
+    for fragment, ttl in TTLS:
+        if fragment in url:
+            return ttl
+    return DEFAULT_TTL
+
+
+class ResponseCache:
+    """
+    Cache em disco de respostas JSON, uma entrada (arquivo .json) por URL+params.
+
+    Cada entrada guarda o corpo já decodificado, os headers da resposta, o
+    momento em que foi gravada e os validadores (ETag/Last-Modified) usados
+    para revalidação condicional.
+    """
+
+    def __init__(self, directory: str = CACHE_DIR, max_bytes: int = MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # Tamanho de cada arquivo, carregado na primeira escrita
+        self._sizes = None
+
+    @staticmethod
+    def key(url: str, params: dict = None, variant: str = None) -> str:
+        """
+        Chave da entrada; `variant` separa formatos diferentes da mesma URL
+        (ex.: o schema usado na decodificação).
+        """
+        params = sorted((str(k), str(v)) for k, v in (params or {}).items())
+        raw = json.dumps([url, params, variant])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str):
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, entry: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+        sizes = self._load_sizes()
+        sizes[key] = os.path.getsize(path)
+        if sum(sizes.values()) > self.max_bytes:
+            self.evict()
+
+    def touch(self, key: str, entry: dict):
+        """
+        Marca a entrada como recém-validada (resposta 304).
+        """
+        entry["stored_at"] = time.time()
+        self.put(key, entry)
+
+    def is_fresh(self, entry: dict, ttl: int) -> bool:
+        return time.time() - entry.get("stored_at", 0) < ttl
+
+    def evict(self):
+        """
+        Remove as entradas menos recentemente gravadas até o cache ocupar no
+        máximo EVICT_TO * max_bytes.
+        """
+        sizes = self._load_sizes()
+        by_age = sorted(sizes, key=lambda key: self._mtime(key))
+        total = sum(sizes.values())
+        for key in by_age:
+            if total <= self.max_bytes * EVICT_TO:
+                break
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            total -= sizes.pop(key)
+
+    def _mtime(self, key: str) -> float:
+        try:
+            return os.path.getmtime(self._path(key))
+        except OSError:
+            return 0.0
+
+    def _load_sizes(self) -> dict:
+        if self._sizes is None:
+            self._sizes = {}
+            if os.path.isdir(self.directory):
+                for name in os.listdir(self.directory):
+                    if name.endswith(".json"):
+                        self._sizes[name[:-len(".json")]] = os.path.getsize(os.path.join(self.directory, name))
+        return self._sizes
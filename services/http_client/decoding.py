@@ -0,0 +1,68 @@
+import functools
+import json
+import typing
+
+# Backends opcionais: msgspec decodifica direto no formato declarado (pulando
+# os campos não usados); orjson é um parser genérico mais rápido que o json.
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Exceções de um corpo que não é JSON válido, em qualquer backend
+# (json e orjson levantam subclasses de ValueError)
+DECODE_ERRORS = (ValueError, msgspec.DecodeError) if msgspec is not None else (ValueError,)
+
+
+def loads(body: bytes):
+    """
+    Decodifica JSON com o backend mais rápido disponível.
+    """
+    if orjson is not None:
+        return orjson.loads(body)
+    if msgspec is not None:
+        return msgspec.json.decode(body)
+    return json.loads(body)
+
+
+def _to_type(node, name: str):
+    """
+    Converte a árvore de Schema.spec() em tipos que o msgspec entende:
+    TypedDicts (campos opcionais e anuláveis) e listas.
+    """
+    if isinstance(node, list):
+        return typing.List[_to_type(node[0], name)]
+    if isinstance(node, dict):
+        fields = {
+            key: typing.Optional[_to_type(child, f"{name}_{key}")]
+            for key, child in node.items()
+        }
+        return typing.TypedDict(name, fields, total=False)
+    return node
+
+
+@functools.lru_cache(maxsize=None)
+def _decoder(schema):
+    return msgspec.json.Decoder(_to_type(schema.spec(), f"{schema.name}_page"))
+
+
+def decode(body: bytes, schema=None):
+    """
+    Decodifica o corpo de uma resposta.
+
+    Com um schema (ver o pacote schemas) e o msgspec instalado, decodifica só
+    os campos declarados, já validando os tipos, e o resultado são dicts
+    enxutos. Se a resposta não bater com o schema, ou sem msgspec, faz a
+    decodificação genérica (orjson ou json da stdlib).
+    """
+    if schema is not None and msgspec is not None:
+        try:
+            return _decoder(schema).decode(body)
+        except msgspec.ValidationError:
+            pass
+    return loads(body)
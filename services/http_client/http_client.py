@@ -0,0 +1,242 @@
+import asyncio
+import contextlib
+import os
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+import aiohttp
+
+from .cache import ResponseCache, ttl_for
+from .limiter import limiter_for
+from .decoding import decode
+from metrics import registry as metrics
+
+# Limites do pool de conexões compartilhado por todos os fetchers. A
+# concorrência efetiva por host é ajustada pelo limitador (limiter.py);
+# LIMIT_PER_HOST é só o teto de conexões abertas.
+LIMIT = 100
+LIMIT_PER_HOST = 64
+# Tempo (s) que o resultado de uma resolução DNS fica em cache
+DNS_CACHE_TTL = 300
+# Tempo (s) que uma conexão ociosa fica aberta esperando reuso (keep-alive)
+KEEPALIVE_TIMEOUT = 60
+TIMEOUT = aiohttp.ClientTimeout(total=300, connect=30)
+
+# Tentativas por requisição em 429/5xx/erros de conexão e base do backoff exponencial (s)
+MAX_RETRIES = 5
+BACKOFF_BASE = 2
+
+# Cache de respostas em disco (QR_HTTP_CACHE=0 desliga)
+CACHE_ENABLED = os.getenv("QR_HTTP_CACHE", "1") != "0"
+_cache = ResponseCache()
+
+# Uma sessão por event loop: [sessão, número de escopos abertos]
+_sessions = {}
+
+
+def _new_session() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=LIMIT,
+        limit_per_host=LIMIT_PER_HOST,
+        use_dns_cache=True,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=TIMEOUT)
+
+
+@contextlib.asynccontextmanager
+async def session():
+    """
+    Retorna a sessão HTTP compartilhada do event loop atual.
+
+    Escopos aninhados reutilizam a mesma sessão (e o mesmo pool de conexões);
+    ela só é fechada quando o escopo mais externo termina. Assim, quando o
+    main.py abre um escopo para a execução inteira, todos os fetchers
+    (Qulture e Factorial) reaproveitam as conexões já abertas.
+    """
+    loop = asyncio.get_running_loop()
+    entry = _sessions.get(loop)
+    if entry is None or entry[0].closed:
+        entry = _sessions[loop] = [_new_session(), 0]
+    entry[1] += 1
+    try:
+        yield entry[0]
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0:
+            del _sessions[loop]
+            await entry[0].close()
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, url: str):
+        super().__init__(f"HTTP {status} ao buscar {url}")
+        self.status = status
+        self.url = url
+
+
+class IncompletePages(Exception):
+    """
+    Uma busca paginada terminou com páginas faltando. `missing` lista
+    exatamente quais; as que chegaram ficam no diário (ver journal.py) e a
+    próxima busca retoma só essas.
+    """
+    def __init__(self, url: str, missing: list, pages: int = None):
+        of = f" de {pages}" if pages is not None else ""
+        super().__init__(f"{len(missing)}{of} página(s) não baixada(s) de {url}: {missing}")
+        self.url = url
+        self.missing = missing
+        self.pages = pages
+
+
+@dataclass
+class Response:
+    """
+    Resposta já decodificada. `headers` tem os nomes em minúsculas.
+    """
+    status: int
+    url: str
+    headers: dict = field(default_factory=dict)
+    data: object = None
+    from_cache: bool = False
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise HTTPError(self.status, self.url)
+
+
+def _retry_after(headers: dict, attempt: int) -> float:
+    try:
+        return float(headers["retry-after"])
+    except (KeyError, ValueError):
+        return BACKOFF_BASE ** attempt
+
+
+async def request_json(
+    session: aiohttp.ClientSession,
+    method: str,
+    url: str,
+    headers: dict = None,
+    params: dict = None,
+    json: dict = None,
+    cookies: dict = None,
+    retries: int = MAX_RETRIES,
+    schema=None,
+) -> Response:
+    """
+    Envia a requisição passando pelo limitador adaptativo do host.
+
+    429 pausa o host inteiro pelo Retry-After (ou backoff exponencial); 5xx e
+    erros de conexão esperam o backoff só nesta requisição. Em ambos os casos
+    o slot é devolvido antes de esperar e a requisição é repetida até
+    `retries` vezes. Na última tentativa, a resposta com erro é retornada (ou
+    a exceção de conexão é propagada). Só respostas 200 têm o corpo
+    decodificado, com o `schema` declarado quando houver (ver decoding.decode).
+
+    Cada chamada é registrada em metrics (status final, latência da última
+    tentativa, bytes, tentativas e espera total no limitador).
+    """
+    loop = asyncio.get_running_loop()
+    limiter = limiter_for(urlsplit(url).hostname)
+    wait = 0.0
+    for attempt in range(1, retries + 1):
+        wait += await limiter.acquire()
+        started = loop.time()
+        try:
+            async with session.request(method, url, headers=headers, params=params, json=json, cookies=cookies) as response:
+                # Headers com nomes em minúsculas, para consulta independente de caixa
+                response_headers = {name.lower(): value for name, value in response.headers.items()}
+                status = response.status
+                if status == 200:
+                    body = await response.read()
+                    size = len(body)
+                else:
+                    body = None
+                    size = response.content_length or 0
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            limiter.release(None, loop.time() - started)
+            if attempt == retries:
+                metrics.record_request(method, url, 0, loop.time() - started, 0, attempt, wait)
+                raise
+            backoff = BACKOFF_BASE ** attempt
+            print(f"[Exception] {url}, attempt {attempt}: {e!r} — retrying in {backoff}s...")
+            await asyncio.sleep(backoff)
+            continue
+        except BaseException:
+            # Cancelada (ex.: stream_pages ou Pipeline.run cancelando as
+            # demais) ou erro inesperado: devolve o slot sem ajustar o limite
+            limiter.discard()
+            raise
+
+        latency = loop.time() - started
+        if status == 429:
+            retry_after = _retry_after(response_headers, attempt)
+            limiter.release(status, latency, retry_after)
+        else:
+            retry_after = BACKOFF_BASE ** attempt
+            limiter.release(status, latency)
+
+        if (status != 429 and status < 500) or attempt == retries:
+            metrics.record_request(method, url, status, latency, size, attempt, wait)
+            # Decodificado só depois de devolver o slot: um corpo que não é
+            # JSON (ex.: redirect para o login) levanta sem prender o limitador
+            data = decode(body, schema) if body is not None else None
+            return Response(status, url, response_headers, data)
+
+        print(f"[{status}] {url}, attempt {attempt} — retrying in {retry_after}s...")
+        if status != 429:
+            await asyncio.sleep(retry_after)
+
+
+async def get_json(
+    session: aiohttp.ClientSession,
+    url: str,
+    headers: dict = None,
+    params: dict = None,
+    ttl: int = None,
+    schema=None,
+) -> Response:
+    """
+    GET com cache em disco e revalidação condicional.
+
+    Enquanto a entrada estiver dentro do TTL do endpoint, a resposta vem do
+    disco sem nenhuma requisição. Depois disso, a requisição é enviada com
+    If-None-Match/If-Modified-Since; um 304 renova a entrada e devolve o
+    corpo guardado. Respostas que não sejam 200 nunca são guardadas. O corpo
+    é decodificado (e guardado) já no formato do `schema`, quando houver.
+    """
+    ttl = ttl_for(url) if ttl is None else ttl
+    use_cache = CACHE_ENABLED and ttl > 0
+    request_headers = dict(headers or {})
+    key = entry = None
+
+    if use_cache:
+        key = _cache.key(url, params, schema.name if schema is not None else None)
+        entry = _cache.get(key)
+        if entry is not None:
+            if _cache.is_fresh(entry, ttl):
+                metrics.record_request("GET", url, 200, 0.0, cached=True, attempts=0)
+                return Response(200, url, entry["headers"], entry["data"], from_cache=True)
+            if entry.get("etag"):
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+
+    response = await request_json(session, "GET", url, headers=request_headers, params=params, schema=schema)
+    if response.status == 304 and entry is not None:
+        # A chamada com 304 já foi registrada por request_json
+        _cache.touch(key, entry)
+        return Response(200, url, entry["headers"], entry["data"], from_cache=True)
+
+    if use_cache and response.status == 200:
+        _cache.put(key, {
+            "url": url,
+            "params": params,
+            "stored_at": time.time(),
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "headers": response.headers,
+            "data": response.data,
+        })
+    return response
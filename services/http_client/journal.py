@@ -0,0 +1,154 @@
+import json
+import os
+import shutil
+import time
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+from .cache import ResponseCache
+from .http_client import Response
+
+# Diretório dos diários de paginação e idade máxima (s) de um diário para
+# ser retomado (QR_JOURNAL=0 desliga)
+JOURNAL_DIR = os.getenv("QR_JOURNAL_DIR", os.path.join(".cache", "journal"))
+MAX_AGE = int(os.getenv("QR_JOURNAL_MAX_AGE", str(6 * 60 * 60)))
+ENABLED = os.getenv("QR_JOURNAL", "1") != "0"
+
+
+def _try_lock(fd: int) -> bool:
+    """
+    Trava exclusiva, sem esperar, no arquivo `fd` (vale entre processos e
+    entre descritores do mesmo processo).
+    """
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+class PageJournal:
+    """
+    Diário em disco de uma busca paginada: cada página que chega com status
+    200 é gravada em um arquivo próprio, na hora. Se a busca falhar ou for
+    interrompida, a próxima só busca as páginas que não estão no diário (ver
+    pagination.fetch_pages); quando todas chegam, o diário é apagado.
+
+    O diário vale para um total de itens: se o total mudar (itens novos ou
+    removidos deslocam as páginas) ou se ele tiver mais de `max_age`
+    segundos, é descartado e a busca recomeça do zero.
+
+    Cada busca trava o diário (arquivo <diretório>.lock) de start até close.
+    Uma segunda busca da mesma URL ao mesmo tempo (outro relatório do
+    serviço ou outro processo) segue sem diário: não lê, não grava e não
+    apaga as páginas da primeira.
+    """
+
+    def __init__(self, url: str, params: dict = None, variant: str = None,
+                 directory: str = JOURNAL_DIR, max_age: int = MAX_AGE):
+        self.url = url
+        # Mesma chave do cache HTTP; `params` sem a página
+        self.directory = os.path.join(directory, ResponseCache.key(url, params, variant))
+        self.max_age = max_age
+        self.active = False
+        self._lock = None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.json")
+
+    def _read(self, name: str):
+        try:
+            with open(self._path(name), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, name: str, value):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(name)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(value, f)
+        os.replace(f"{path}.tmp", path)
+
+    def start(self, total: int) -> set:
+        """
+        Abre o diário para uma busca de `total` itens e retorna as páginas
+        já gravadas (vazio se não havia diário, se ele não serve mais ou se
+        outra busca o está usando).
+        """
+        if not self._acquire():
+            print(f"[journal] {self.url}: diário em uso por outra busca, seguindo sem ele")
+            return set()
+        meta = self._read("meta")
+        if meta is not None and meta["total"] == total and time.time() - meta["started_at"] < self.max_age:
+            pages = self.pages()
+            if pages:
+                print(f"[journal] Retomando {self.url}: {len(pages)} página(s) já baixada(s)")
+            return pages
+        self.clear()
+        self._write("meta", {"url": self.url, "total": total, "started_at": time.time()})
+        return set()
+
+    def _acquire(self) -> bool:
+        if self._lock is not None:
+            return True
+        os.makedirs(os.path.dirname(self.directory), exist_ok=True)
+        fd = os.open(f"{self.directory}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        if not _try_lock(fd):
+            os.close(fd)
+            return False
+        self._lock = fd
+        self.active = True
+        return True
+
+    def close(self):
+        """
+        Libera o diário para outras buscas (as páginas gravadas ficam).
+        """
+        if self._lock is not None:
+            os.close(self._lock)
+            self._lock = None
+        self.active = False
+
+    def pages(self) -> set:
+        if not self.active:
+            return set()
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return set()
+        return {int(name[:-len(".json")]) for name in names if name.endswith(".json") and name[:-len(".json")].isdigit()}
+
+    def get(self, page: int):
+        """
+        A página gravada, como um http_client.Response (None se não houver
+        ou se o arquivo estiver corrompido).
+        """
+        entry = self._read(str(page)) if self.active else None
+        if entry is None:
+            return None
+        return Response(200, self.url, entry["headers"], entry["data"], from_cache=True)
+
+    def put(self, page: int, response: Response):
+        if self.active:
+            self._write(str(page), {"headers": response.headers, "data": response.data})
+
+    def clear(self):
+        if self.active:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def open_journal(url: str, params: dict = None, variant: str = None):
+    """
+    O diário da busca de `url` com `params` (sem a página), ou None com
+    QR_JOURNAL=0. `variant` separa formatos da mesma URL (o nome do schema).
+    """
+    return PageJournal(url, params, variant) if ENABLED else None
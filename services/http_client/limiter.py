@@ -0,0 +1,169 @@
+import asyncio
+import collections
+import os
+import weakref
+
+# Concorrência inicial, mínima e máxima por host
+INITIAL_CONCURRENCY = int(os.getenv("QR_HOST_CONCURRENCY", "8"))
+MIN_CONCURRENCY = 1
+MAX_CONCURRENCY = int(os.getenv("QR_HOST_MAX_CONCURRENCY", "64"))
+# Respostas mais lentas que isto (s) não aumentam a concorrência
+SLOW_RESPONSE = 2.0
+# Limite opcional de requisições por segundo por host (0 = sem limite)
+RATE = float(os.getenv("QR_HOST_RATE", "0"))
+
+
+class HostLimiter:
+    """
+    Limitador adaptativo de um host: token bucket opcional + concorrência AIMD.
+
+    A concorrência começa em INITIAL_CONCURRENCY e cresce aditivamente
+    (~+1 a cada `limite` respostas rápidas) enquanto a API responde bem. Um
+    429 ou 5xx corta o limite pela metade e, com Retry-After, pausa o host
+    inteiro: nenhuma requisição nova sai até o fim da pausa. Quem espera a
+    pausa não ocupa slot, pois o slot é devolvido antes de esperar.
+
+    O corte acontece uma vez por janela de congestionamento: erros de
+    requisições enviadas antes do último corte (a rajada que o causou) não
+    cortam de novo.
+    """
+
+    def __init__(self, initial: int = INITIAL_CONCURRENCY, minimum: int = MIN_CONCURRENCY,
+                 maximum: int = MAX_CONCURRENCY, rate: float = RATE):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.rate = rate
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        # Momento (loop.time) do último corte do limite
+        self._cut_at = float("-inf")
+        self._tokens = float(max(1, initial))
+        self._refilled_at = None
+        self._waiters = collections.deque()
+        # Tarefas que ocupam slots (uma requisição devolve o slot na mesma tarefa)
+        self._holders = collections.Counter()
+
+    async def acquire(self) -> float:
+        """
+        Espera por um slot (e por um token, se houver RATE). Retorna o tempo
+        (s) gasto esperando.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        while True:
+            delay = self.blocked_until - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            if self.in_flight < int(self.limit):
+                delay = self._take_token(loop.time())
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+                self.in_flight += 1
+                self._holders[asyncio.current_task()] += 1
+                return loop.time() - started
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                elif waiter.done():
+                    # Foi acordado e cancelado em seguida: passa a vez adiante
+                    self._wake()
+                raise
+
+    def release(self, status: int = None, latency: float = 0.0, retry_after: float = None):
+        """
+        Devolve o slot e ajusta o limite conforme o resultado da requisição.
+        `status` None indica erro de conexão/timeout.
+        """
+        self.in_flight -= 1
+        self._forget()
+        if status == 429 or status is None or status >= 500:
+            now = asyncio.get_running_loop().time()
+            # Enviada depois do último corte (`latency` é o tempo desde o envio)
+            if now - latency >= self._cut_at:
+                self.limit = max(self.minimum, self.limit / 2)
+                self._cut_at = now
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+        elif latency < SLOW_RESPONSE:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        self._wake()
+
+    def discard(self):
+        """
+        Devolve o slot de uma requisição que não terminou (cancelada ou com
+        erro inesperado), sem ajustar o limite.
+        """
+        self.in_flight -= 1
+        self._forget()
+        self._wake()
+
+    def _forget(self):
+        task = asyncio.current_task()
+        if self._holders[task] > 1:
+            self._holders[task] -= 1
+        else:
+            self._holders.pop(task, None)
+
+    def stats(self) -> dict:
+        """
+        Estado atual, para o /health do serviço. `stuck` conta slots presos
+        por tarefas que já terminaram sem devolvê-los; com `in_flight` no
+        limite e todos os slots presos, nenhuma requisição sai mais.
+        """
+        stuck = sum(count for task, count in self._holders.items() if task is None or task.done())
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "stuck": stuck,
+            "stalled": self.in_flight >= int(self.limit) and stuck >= self.in_flight,
+        }
+
+    def _take_token(self, now: float) -> float:
+        """
+        Consome um token do bucket; retorna quanto falta esperar se não houver.
+        """
+        if not self.rate:
+            return 0.0
+        if self._refilled_at is not None:
+            burst = max(1.0, self.rate)
+            self._tokens = min(burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def _wake(self):
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+
+# Limitadores por event loop e por host
+_limiters = weakref.WeakKeyDictionary()
+
+
+def limiters() -> dict:
+    """
+    Limitadores do event loop atual, {host: HostLimiter}.
+    """
+    return dict(_limiters.get(asyncio.get_running_loop(), {}))
+
+
+def limiter_for(host: str) -> HostLimiter:
+    loop = asyncio.get_running_loop()
+    limiters = _limiters.setdefault(loop, {})
+    if host not in limiters:
+        limiters[host] = HostLimiter()
+    return limiters[host]
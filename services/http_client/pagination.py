@@ -0,0 +1,202 @@
+import asyncio
+
+import aiohttp
+
+from .http_client import HTTPError, IncompletePages
+
+# Páginas buscadas ao mesmo tempo por paginação (o limitador do host ainda
+# pode reduzir isso) e páginas prontas aguardando o consumidor
+WORKERS = 16
+BUFFER = 8
+# Itens por página pedidos a todas as APIs
+PER_PAGE = 100
+# Erros que fazem uma página contar como faltando (depois dos retries do
+# http_client), sem interromper as demais; outros erros são propagados
+PAGE_ERRORS = (HTTPError, aiohttp.ClientError, asyncio.TimeoutError)
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+async def stream_pages(fetch_page, pages, workers: int = WORKERS, buffer: int = BUFFER):
+    """
+    Busca as páginas `pages` (iterável de números) com `fetch_page(page)` e
+    gera (page, dados) à medida que cada uma termina, fora de ordem.
+
+    Uma fila de trabalho alimenta no máximo `workers` buscas simultâneas e as
+    páginas prontas passam por uma fila limitada a `buffer` itens: se o
+    consumidor (ex.: o achatamento) estiver mais lento, os workers param de
+    buscar, então a memória de pico não cresce com o número de páginas.
+    Se uma página falhar, a exceção é propagada ao consumidor e as demais
+    buscas são canceladas.
+    """
+    todo = asyncio.Queue()
+    for page in pages:
+        todo.put_nowait(page)
+    total = todo.qsize()
+    done = asyncio.Queue(maxsize=buffer)
+
+    async def worker():
+        while True:
+            try:
+                page = todo.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                data = await fetch_page(page)
+            except Exception as e:
+                await done.put((page, _Failure(e)))
+                return
+            await done.put((page, data))
+
+    tasks = [asyncio.ensure_future(worker()) for _ in range(min(workers, total))]
+    try:
+        for _ in range(total):
+            page, data = await done.get()
+            if isinstance(data, _Failure):
+                raise data.error
+            yield page, data
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def page_count(total: int, per_page: int = PER_PAGE) -> int:
+    """
+    Número de páginas para `total` itens (0 itens = 0 páginas; múltiplos
+    exatos de `per_page` não geram uma página vazia a mais).
+    """
+    return -(-total // per_page)
+
+
+# Extratores do total de itens a partir da primeira página (um http_client.Response)
+
+def header_total(response) -> int:
+    """
+    API REST da Qulture: header 'total'.
+    """
+    return int(response.headers.get("total", "0"))
+
+
+def meta_total(response) -> int:
+    """
+    API do Factorial: campo meta.total do corpo.
+    """
+    return int(response.data["meta"]["total"])
+
+
+def graphql_total(*path: str):
+    """
+    GraphQL da Qulture: pageInfo.totalCount da conexão em data.<path>.
+    """
+    def total(response) -> int:
+        connection = response.data["data"]
+        for key in path:
+            connection = connection[key]
+        return int(connection["pageInfo"]["totalCount"])
+    return total
+
+
+async def _attempt(fetch_page, page: int):
+    """
+    fetch_page(page), ou None se a página falhar (status diferente de 200 ou
+    um dos PAGE_ERRORS).
+    """
+    try:
+        response = await fetch_page(page)
+    except PAGE_ERRORS as e:
+        print(f"[pagination] Página {page} falhou: {e!r}")
+        return None
+    return response if response.status == 200 else None
+
+
+async def fetch_pages(fetch_page, pages, journal=None, workers: int = WORKERS, buffer: int = BUFFER):
+    """
+    Busca as páginas `pages` com stream_pages e gera (page, response) só das
+    que chegaram com status 200. Uma página que falha não interrompe as
+    demais: no fim, IncompletePages é levantada com exatamente as que
+    faltaram.
+
+    Com um `journal` (PageJournal já aberto com start), as páginas gravadas
+    nele são lidas do disco em vez de buscadas, cada página nova é gravada
+    assim que chega e o diário é apagado quando não falta nenhuma. No fim,
+    com ou sem falha, o diário é liberado (journal.close).
+    """
+    try:
+        pages = list(pages)
+        done = journal.pages() if journal is not None else set()
+        url = journal.url if journal is not None else None
+        todo = []
+        for page in pages:
+            response = journal.get(page) if page in done else None
+            if response is None:
+                todo.append(page)
+                continue
+            yield page, response
+
+        missing = []
+        async for page, response in stream_pages(lambda page: _attempt(fetch_page, page), todo, workers, buffer):
+            if response is None:
+                missing.append(page)
+                continue
+            url = url or response.url
+            if journal is not None:
+                journal.put(page, response)
+            yield page, response
+
+        if missing:
+            raise IncompletePages(url, sorted(missing), len(pages))
+        if journal is not None:
+            journal.clear()
+    finally:
+        if journal is not None:
+            journal.close()
+
+
+async def paginate(fetch_page, total_of, per_page: int = PER_PAGE, workers: int = WORKERS,
+                   buffer: int = BUFFER, journal=None):
+    """
+    Paginador único para todos os estilos de paginação.
+
+    Busca a página 1 com `fetch_page(page)` (que retorna um
+    http_client.Response), lê o total de itens dela com `total_of` (header
+    'total', meta.total ou pageInfo do GraphQL) e busca as páginas restantes
+    em paralelo com fetch_pages. A página 1 é aproveitada como dado, então
+    não há requisição extra só para contar. Gera (page, response) à medida
+    que as páginas chegam e levanta IncompletePages se alguma faltar.
+
+    Com um `journal` (ver journal.open_journal), uma busca anterior do mesmo
+    total que falhou no meio é retomada: só as páginas que faltaram são
+    buscadas. A página 1 é sempre buscada de novo, para conferir o total.
+    """
+    first = await _attempt(fetch_page, 1)
+    if first is None:
+        raise IncompletePages(journal.url if journal is not None else None, [1])
+    total = total_of(first)
+    pages = page_count(total, per_page)
+    try:
+        if journal is not None:
+            journal.start(total)
+            journal.put(1, first)
+        yield 1, first
+        async for item in fetch_pages(fetch_page, range(2, pages + 1), journal, workers, buffer):
+            yield item
+    except IncompletePages as e:
+        # Com o total de páginas da busca, incluindo a 1
+        raise IncompletePages(e.url, e.missing, pages) from None
+    finally:
+        if journal is not None:
+            journal.close()
+
+
+async def collect_pages(stream) -> list:
+    """
+    Consome um stream de (page, dados) (de paginate ou stream_pages) e
+    retorna os dados na ordem das páginas.
+    """
+    results = {}
+    async for page, data in stream:
+        results[page] = data
+    return [results[page] for page in sorted(results)]
@@ -1,96 +1,219 @@
-from surveys import surveys_main
-from topics import topics_main
-from answers import answers_main
-from participants import participants_main
-from factorial.factorial_customfields import head, tlSr, coord
+from surveys import surveys_async_lookup, surveys_to_dataframe
+from topics import topics_async_dataframe
+from answers import answers_async_dataframe
+from participants import participants_async_main, participants_to_dataframe
+from factorial.factorial_customfields import FIELDS, custom_fields
 from factorial.factorial_employees import main as employees_main
-
+from factorial.hierarchy import leaders_table
+from pipeline import Pipeline
+from report import merge_employees, merge_report, summary_tables
+import http_client
+from writers import executor as write_pool
+from metrics import registry as metrics
+
+import os
 import time
 import asyncio
+import functools
 import pandas as pd
 
+# Formato do relatório final (xlsx, csv ou parquet)
+OUTPUT_FORMAT = os.getenv("QR_OUTPUT_FORMAT", "xlsx")
+# Arquivos intermediários (custom-fields, merge-employees) só para depuração
+DEBUG_DUMPS = os.getenv("QR_DEBUG_DUMPS", "0") == "1"
+# Tabelas de resumo das notas junto com o relatório (QR_SUMMARY=0 desliga)
+SUMMARY = os.getenv("QR_SUMMARY", "1") != "0"
+# Diretório para metrics.json e metrics.prom ao fim de cada execução (vazio desliga)
+METRICS_DIR = os.getenv("QR_METRICS_DIR", "")
+
 def rename_cols(prefix, df):
     return df.rename(columns={col: prefix + col for col in df.columns})
 
-def main(survey_id):
-    surveys = surveys_main(survey_id)
-    topics = topics_main(survey_id)
-    answers = answers_main(survey_id)
-    participants = participants_main()
-    heads = asyncio.run(head())
-    teamleader = asyncio.run(tlSr())
-    coordenador = asyncio.run(coord())
-    employees = asyncio.run(employees_main())
 
+# Tratamento de cada fonte (adiciona o prefixo em cada df)
 
-    # Adiciona o prefixo em cada df
-
-    surveys = rename_cols("surveys_", surveys)
-    topics = rename_cols("topics_", topics)
-    answers = rename_cols("answers_", answers)
-    participants = rename_cols("participants_", participants)
-    employees = rename_cols('employees_', employees)
-    
+def prepare_surveys(data, survey_id):
+    return rename_cols("surveys_", surveys_to_dataframe(data, survey_id))
 
-    # Altera o tipo de dado da coluna id pra fazer o merge
+def prepare_topics(topics):
+    return rename_cols("topics_", topics)
 
-    participants['participants_id'] = participants['participants_id'].astype('int64')
+def prepare_answers(answers):
+    return rename_cols("answers_", answers)
 
+def prepare_participants(data):
+    # O id já vem inteiro (Int32/Int64) do schema dos contratos
+    return rename_cols("participants_", participants_to_dataframe(data))
 
-    # Tratamento dos custom fields
-
+def prepare_employees(employees):
+    employees = rename_cols('employees_', employees)
     employees_cols_to_keep = ['employees_id', 'employees_full_name', 'employees_email', 'employees_manager_id', 'employees_team_leader']
-    employees = employees[employees_cols_to_keep]
-
-    heads_cols_to_keep = ['value', 'valuable_id']
-    heads = heads[heads_cols_to_keep]
-    heads = rename_cols("heads_", heads)
-    heads.to_excel('heads.xlsx', index=False)
-
-    teamLeader_cols_to_keep = ['value', 'valuable_id']
-    teamleader = teamleader[teamLeader_cols_to_keep]
-    teamleader = rename_cols("teamleader_", teamleader)
-    teamleader.to_excel('teamLeader.xlsx', index=False)
-
-    coords_cols_to_keep = ['value', 'valuable_id']
-    coordenador = coordenador[coords_cols_to_keep]
-    coordenador = rename_cols("coordenador_", coordenador)
-    coordenador.to_excel('coord.xlsx', index=False)
-
-    df_employees_merge = pd.merge(employees, participants, left_on='employees_email', right_on='participants_email', how='left')
-    df_employees_merge = pd.merge(df_employees_merge, teamleader, left_on='employees_id', right_on='teamleader_valuable_id', how='left')
-    df_employees_merge = pd.merge(df_employees_merge, coordenador, left_on='employees_id', right_on='coordenador_valuable_id', how='left')
-    df_employees_merge = pd.merge(df_employees_merge, heads, left_on='employees_id', right_on='heads_valuable_id', how='left')
-    df_employees_merge.to_excel('merge-employees.xlsx', index=False)
-
-    df_merged = pd.merge(answers, surveys, left_on='answers_survey_id', right_on='surveys_id', how='left')
-    df_merged = pd.merge(df_merged, topics, left_on='answers_question_id', right_on='topics_question_id', how='left')
-    df_merged = pd.merge(df_merged, participants, left_on='answers_reviewee_id', right_on='participants_id', how='left')
-    df_merged = pd.merge(df_merged, df_employees_merge, left_on='participants_id', right_on='participants_id', how='left')
-    
-    cols_to_rename = {
-        'answers_grading': 'Notas',
-        'answers_comment': 'Comentário da resposta',
-        'answers_relationship': 'Direção',
-        'answers_reviewer_name': 'Nome do Avaliador',
-        'surveys_name': 'Título da Pesquisa',
-        'surveys_start_at': 'Início da Pesquisa',
-        'surveys_end_at': 'Fim da Pesquisa', 
-        'topics_question_name': 'Competência', 
-        'participants_name_x': 'Nome do Avaliado', 
-        'participants_email_x': 'E-mail do Avaliado',
-        'participants_supervisor_name_x': 'Nome do Líder Imediato',
-        'participants_supervisor_email_x': 'E-mail do Líder Imediato',
-        'teamleader_value': 'Nome do Team Leader',
-        'coordenador_value': 'Nome do Coordenador',
-        'heads_value': 'E-mail do Head',
-    }
-
-    df_merged.rename(columns=cols_to_rename, inplace=True)
-
-    df_merged.to_excel('merge.xlsx', index=False)
-
-    return answers
+    return employees[employees_cols_to_keep]
+
+# Custom fields dos líderes: {coluna do merge: field_id}
+LEADER_FIELDS = {
+    'teamleader_value': FIELDS["tlSr"],
+    'coordenador_value': FIELDS["coord"],
+    'heads_value': FIELDS["head"],
+}
+
+# Com QR_LEADERS_FROM=hierarchy, os líderes vêm da hierarquia do Factorial
+# (manager_id) em vez dos custom fields: {coluna: (nível a partir do topo,
+# coluna de employees)}. Os níveis dependem do organograma da empresa.
+LEADERS_FROM = os.getenv("QR_LEADERS_FROM", "custom_fields")
+LEADER_LEVELS = {
+    'heads_value': (int(os.getenv("QR_HEAD_LEVEL", "1")), 'email'),
+    'coordenador_value': (int(os.getenv("QR_COORD_LEVEL", "2")), 'full_name'),
+    'teamleader_value': (int(os.getenv("QR_TEAMLEADER_LEVEL", "3")), 'full_name'),
+}
+
+
+# As escritas rodam no pool de processos de writers.executor: o pipeline
+# segue buscando e fazendo merges enquanto os arquivos são escritos
+
+async def write_report(path, output_format, df):
+    await write_pool.write_async(df, path, output_format)
+    return df
+
+async def combine_reports(path, output_format, *reports):
+    df = await asyncio.to_thread(pd.concat, reports, ignore_index=True)
+    return await write_report(path, output_format, df)
+
+def summarize_reports(*frames):
+    """
+    Resumos de um ou mais relatórios; recebe os relatórios seguidos dos
+    surveys correspondentes (report_1, ..., report_n, surveys_1, ..., surveys_n).
+    """
+    half = len(frames) // 2
+    report = frames[0] if half == 1 else pd.concat(frames[:half], ignore_index=True)
+    surveys = pd.concat(frames[half:], ignore_index=True)
+    return summary_tables(report, surveys)
+
+async def write_summary(path, output_format, tables):
+    await write_pool.write_tables_async(tables, path, output_format)
+    return tables
+
+
+def add_shared_stages(pipeline):
+    """
+    Etapas dos dados que não dependem do survey (participants, colaboradores
+    e líderes do Factorial e o merge de colaboradores), até "employees_merge".
+    """
+    pipeline.add("participants_data", participants_async_main, kind="fetch")
+    pipeline.add("employees_data", employees_main, kind="fetch")
+    if LEADERS_FROM == "hierarchy":
+        pipeline.add("leaders", functools.partial(leaders_table, levels=LEADER_LEVELS), "employees_data", kind="merge")
+    else:
+        pipeline.add("leaders", functools.partial(custom_fields, LEADER_FIELDS), kind="fetch")
+
+    pipeline.add("participants", prepare_participants, "participants_data", kind="flatten")
+    pipeline.add("employees", prepare_employees, "employees_data", kind="flatten")
+    pipeline.add("employees_merge", merge_employees, "employees", "participants", "leaders", kind="merge")
+    return pipeline
+
+def add_survey_stages(pipeline, survey_id, incremental=False, surveys_data=None):
+    """
+    Etapas de um survey, até "report:<survey_id>". Dependem de "participants"
+    e "employees_merge", que precisam já estar no pipeline (add_shared_stages
+    ou valores prontos, via Pipeline.provide). `surveys_data` é o resultado
+    de surveys.async_lookup, quando já buscado (ex.: pelo service).
+    """
+    if surveys_data is None:
+        pipeline.add(f"surveys_data:{survey_id}", functools.partial(surveys_async_lookup, survey_id), kind="fetch")
+    else:
+        pipeline.provide(f"surveys_data:{survey_id}", surveys_data)
+    # topics e answers já chegam achatados página a página (o achatamento
+    # é medido à parte, em flatten:topics:<id> e flatten:answers:<id>)
+    pipeline.add(f"topics_data:{survey_id}", functools.partial(topics_async_dataframe, survey_id), kind="fetch")
+    pipeline.add(f"answers_data:{survey_id}", functools.partial(answers_async_dataframe, survey_id, incremental), kind="fetch")
+
+    pipeline.add(f"surveys:{survey_id}", functools.partial(prepare_surveys, survey_id=survey_id), f"surveys_data:{survey_id}", kind="flatten")
+    pipeline.add(f"topics:{survey_id}", prepare_topics, f"topics_data:{survey_id}", kind="flatten")
+    pipeline.add(f"answers:{survey_id}", prepare_answers, f"answers_data:{survey_id}", kind="flatten")
+
+    pipeline.add(f"report:{survey_id}", merge_report, f"answers:{survey_id}", f"surveys:{survey_id}", f"topics:{survey_id}", "participants", "employees_merge", kind="merge")
+    return pipeline
+
+def build_pipeline(survey_ids, incremental=False, combined=False, report_path="merge-{survey_id}",
+                   output_format=OUTPUT_FORMAT, debug_dumps=DEBUG_DUMPS, summary=SUMMARY):
+    """
+    Monta o grafo de etapas do relatório. Todas as buscas começam juntas;
+    cada tratamento/merge começa assim que suas entradas ficam prontas.
+
+    Os dados que não dependem do survey (participants, colaboradores e custom
+    fields do Factorial e o merge de colaboradores) são buscados e montados
+    uma única vez; topics, answers e o merge final rodam por survey, com as
+    etapas nomeadas "<etapa>:<survey_id>". Com `combined=True`, os relatórios
+    são concatenados em um único arquivo (report_path sem o id); senão cada
+    survey gera o seu. Com `incremental=True`, as respostas vêm da
+    sincronização incremental.
+
+    Os relatórios são escritos em `output_format`. Os arquivos intermediários
+    só são escritos com `debug_dumps=True`. Com `summary=True`, cada relatório
+    ganha também as tabelas de resumo das notas (report.summary) em
+    "<relatório>-resumo", nas etapas "summary[:<survey_id>]".
+    """
+    pipeline = Pipeline()
+
+    # Dados compartilhados por todos os surveys
+    add_shared_stages(pipeline)
+
+    if debug_dumps:
+        dumps = {"leaders": 'custom-fields', "employees_merge": 'merge-employees'}
+        for stage, path in dumps.items():
+            pipeline.add(f"dump:{stage}", functools.partial(write_report, path, output_format), stage, kind="write")
+
+    # Dados de cada survey
+    for survey_id in survey_ids:
+        add_survey_stages(pipeline, survey_id, incremental)
+        if not combined:
+            path = report_path.format(survey_id=survey_id)
+            pipeline.add(f"write:{survey_id}", functools.partial(write_report, path, output_format), f"report:{survey_id}", kind="write")
+            if summary:
+                pipeline.add(f"summary:{survey_id}", summarize_reports, f"report:{survey_id}", f"surveys:{survey_id}", kind="aggregate")
+                pipeline.add(f"write_summary:{survey_id}", functools.partial(write_summary, f"{path}-resumo", output_format), f"summary:{survey_id}", kind="write")
+
+    if combined:
+        path = report_path.format(survey_id="all")
+        pipeline.add("write", functools.partial(combine_reports, path, output_format), *[f"report:{survey_id}" for survey_id in survey_ids], kind="write")
+        if summary:
+            pipeline.add("summary", summarize_reports, *[f"report:{survey_id}" for survey_id in survey_ids],
+                         *[f"surveys:{survey_id}" for survey_id in survey_ids], kind="aggregate")
+            pipeline.add("write_summary", functools.partial(write_summary, f"{path}-resumo", output_format), "summary", kind="write")
+    return pipeline
+
+async def run_pipeline(pipeline, metrics_dir=METRICS_DIR):
+    # Um único escopo de sessão: todas as etapas compartilham as conexões
+    metrics.reset()
+    # Os processos de escrita sobem (e importam pandas/openpyxl) enquanto as buscas rodam
+    write_pool.start()
+    failed = True
+    try:
+        async with http_client.session():
+            results = await pipeline.run()
+        failed = False
+        return results
+    finally:
+        await asyncio.to_thread(write_pool.shutdown, failed)
+        # Exporta também quando a execução falha, para ver onde ela parou
+        if metrics_dir:
+            metrics.export(metrics_dir)
+
+def batch(survey_ids, incremental=False, combined=False, report_path="merge-{survey_id}",
+          output_format=OUTPUT_FORMAT, debug_dumps=DEBUG_DUMPS, summary=SUMMARY):
+    """
+    Gera os relatórios de vários surveys em uma única execução.
+    Retorna {survey_id: DataFrame do relatório}.
+    """
+    pipeline = build_pipeline(survey_ids, incremental, combined, report_path, output_format, debug_dumps, summary)
+    results = asyncio.run(run_pipeline(pipeline))
+    return {survey_id: results[f"report:{survey_id}"] for survey_id in survey_ids}
+
+def main(survey_id, incremental=False, output_format=OUTPUT_FORMAT, debug_dumps=DEBUG_DUMPS, summary=SUMMARY):
+    pipeline = build_pipeline([survey_id], incremental, report_path='merge',
+                              output_format=output_format, debug_dumps=debug_dumps, summary=summary)
+    results = asyncio.run(run_pipeline(pipeline))
+    return results[f"answers:{survey_id}"]
 
 
 if __name__ == "__main__":
@@ -99,7 +222,7 @@ if __name__ == "__main__":
     df = main(survey_id)
     print(f"Execution time: {time.time() - start:.2f} seconds")
     # df.to_excel("answers.xlsx", index=False)
-    
+
 
 
 
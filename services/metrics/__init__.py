@@ -0,0 +1,7 @@
+from .metrics import Metrics, registry, endpoint
+
+__all__ = [
+    "Metrics",
+    "registry",
+    "endpoint",
+]
@@ -0,0 +1,298 @@
+import cProfile
+import json
+import os
+import re
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+# Captura por etapa: "cprofile", "tracemalloc" ou os dois separados por vírgula
+PROFILE = {mode.strip() for mode in os.getenv("QR_PROFILE", "").split(",") if mode.strip()}
+# Etapas capturadas (nomes separados por vírgula, ou * para todas)
+PROFILE_STAGES = os.getenv("QR_PROFILE_STAGES", "*")
+PROFILE_DIR = os.getenv("QR_PROFILE_DIR", os.path.join(".cache", "profiles"))
+# Linhas que mais alocaram, por etapa, no relatório do tracemalloc
+TRACEMALLOC_TOP = 25
+# Chamadas HTTP guardadas (as mais recentes), para o registro não crescer
+# sem limite em processos longos (ver service)
+MAX_REQUESTS = int(os.getenv("QR_METRICS_MAX_REQUESTS", "200000"))
+# Etapas guardadas uma a uma (as mais recentes); os totais por etapa do
+# Prometheus não dependem desse limite
+MAX_STAGES = int(os.getenv("QR_METRICS_MAX_STAGES", "2000"))
+
+# Segmentos numéricos do caminho viram :id, para agrupar /surveys/102617/answers etc.
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+# O mesmo nos nomes de etapa: flatten:answers:102617 vira flatten:answers:id
+_ID_NAME_SEGMENT = re.compile(r":\d+(?=:|$)")
+
+
+def endpoint(url: str) -> tuple:
+    """
+    (host, caminho sem ids) de uma URL.
+    """
+    parts = urlsplit(url)
+    return parts.hostname or "", _ID_SEGMENT.sub("/:id", parts.path) or "/"
+
+
+def stage_template(name: str) -> str:
+    """
+    Nome da etapa sem ids (um por survey), para agrupar nas métricas.
+    """
+    return _ID_NAME_SEGMENT.sub(":id", name)
+
+
+def _profiled(name: str) -> bool:
+    return PROFILE_STAGES == "*" or name in PROFILE_STAGES.split(",")
+
+
+def _file_name(name: str) -> str:
+    return re.sub(r"[^\w.-]", "_", name)
+
+
+def _labels(**labels) -> str:
+    values = ",".join(f'{key}="{str(value)}"' for key, value in labels.items())
+    return "{" + values + "}"
+
+
+class Metrics:
+    """
+    Registro das medições de uma execução: uma entrada por chamada HTTP e o
+    tempo acumulado de cada etapa. Pode ser usado de qualquer thread.
+
+    `requests` e `stages` guardam só as entradas mais recentes (MAX_REQUESTS
+    e MAX_STAGES), para o registro não crescer sem limite no service. Os
+    contadores do Prometheus vêm de totais acumulados à parte, que só
+    crescem até o próximo reset: por (host, endpoint, status, cache) e por
+    etapa sem o id do survey (ver stage_template).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = deque(maxlen=MAX_REQUESTS)
+            self.stages = {}
+            self.request_totals = {}
+            self.stage_totals = {}
+            self.started = time.perf_counter()
+
+    def record_request(self, method: str, url: str, status: int, latency: float, size: int = 0,
+                       attempts: int = 1, wait: float = 0.0, cached: bool = False):
+        """
+        Uma chamada HTTP já concluída: `latency` é a da última tentativa,
+        `attempts` inclui as repetições e `wait` é o tempo total esperando o
+        limitador do host. Respostas servidas do cache têm `cached=True`.
+        """
+        host, path = endpoint(url)
+        record = {
+            "method": method,
+            "host": host,
+            "endpoint": path,
+            "status": status,
+            "latency": latency,
+            "bytes": size,
+            "attempts": attempts,
+            "wait": wait,
+            "cached": cached,
+        }
+        with self._lock:
+            self.requests.append(record)
+            total = self.request_totals.setdefault((host, path, status, cached), {
+                "requests": 0, "retries": 0, "seconds": 0.0, "max_latency": 0.0, "bytes": 0, "wait": 0.0,
+            })
+            total["requests"] += 1
+            total["retries"] += max(attempts - 1, 0)
+            total["seconds"] += latency
+            total["max_latency"] = max(total["max_latency"], latency)
+            total["bytes"] += size
+            total["wait"] += wait
+
+    def add_time(self, name: str, kind: str, start: float, end: float, **extra):
+        with self._lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                if len(self.stages) >= MAX_STAGES:
+                    # Descarta a etapa mais antiga (dicts mantêm a ordem de inserção)
+                    del self.stages[next(iter(self.stages))]
+                stage = self.stages[name] = {"kind": kind, "start": start, "end": end, "seconds": 0.0, "calls": 0}
+            stage["start"] = min(stage["start"], start)
+            stage["end"] = max(stage["end"], end)
+            stage["seconds"] += end - start
+            stage["calls"] += 1
+            stage.update(extra)
+            total = self.stage_totals.setdefault((stage_template(name), kind or ""), {"seconds": 0.0, "calls": 0})
+            total["seconds"] += end - start
+            total["calls"] += 1
+
+    @contextmanager
+    def timer(self, name: str, kind: str = None):
+        """
+        Acumula o tempo do bloco em `name`. Pode ser usado várias vezes para
+        a mesma etapa (ex.: o achatamento de cada página).
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, kind, start - self.started, time.perf_counter() - self.started)
+
+    @contextmanager
+    def stage(self, name: str, kind: str = None):
+        """
+        Como timer, mas com a captura de QR_PROFILE quando a etapa estiver em
+        QR_PROFILE_STAGES: o cProfile da etapa vai para PROFILE_DIR/<etapa>.prof
+        e, com tracemalloc, as linhas que mais alocaram vão para
+        <etapa>.tracemalloc.txt.
+
+        Só um cProfile pode estar ativo por vez: etapas que rodam ao mesmo
+        tempo que outra já capturada ficam sem perfil. O tracemalloc é do
+        processo inteiro, então a memória de uma etapa inclui a das que rodam
+        em paralelo com ela.
+        """
+        profiler = None
+        memory = {}
+        if PROFILE and _profiled(name):
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            if "cprofile" in PROFILE:
+                profiler = cProfile.Profile()
+                try:
+                    profiler.enable()
+                except ValueError:
+                    print(f"[metrics] {name}: outro cProfile já está ativo, etapa sem perfil")
+                    profiler = None
+            if "tracemalloc" in PROFILE:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                memory["memory_start"] = tracemalloc.get_traced_memory()[0]
+
+        try:
+            with self.timer(name, kind):
+                yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(os.path.join(PROFILE_DIR, f"{_file_name(name)}.prof"))
+            if memory:
+                current, peak = tracemalloc.get_traced_memory()
+                memory.update(memory_end=current, memory_peak=peak)
+                self._dump_top_allocations(name)
+                with self._lock:
+                    if name in self.stages:
+                        self.stages[name].update(memory)
+
+    def timed(self, name: str, kind: str, func):
+        """
+        `func` envolvida em stage(name, kind), para rodar em outra thread.
+        """
+        def wrapper(*args, **kwargs):
+            with self.stage(name, kind):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def _dump_top_allocations(self, name: str):
+        stats = tracemalloc.take_snapshot().statistics("lineno")[:TRACEMALLOC_TOP]
+        path = os.path.join(PROFILE_DIR, f"{_file_name(name)}.tracemalloc.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(f"{stat}\n" for stat in stats)
+
+    def endpoints(self) -> list:
+        """
+        Totais por (host, endpoint), desde o último reset.
+        """
+        totals = {}
+        with self._lock:
+            request_totals = {key: dict(value) for key, value in self.request_totals.items()}
+        for (host, path, status, cached), counts in request_totals.items():
+            total = totals.setdefault((host, path), {
+                "host": host, "endpoint": path, "requests": 0, "cached": 0, "errors": 0,
+                "retries": 0, "seconds": 0.0, "max_latency": 0.0, "bytes": 0, "wait": 0.0,
+            })
+            total["requests"] += counts["requests"]
+            total["cached"] += counts["requests"] if cached else 0
+            total["errors"] += counts["requests"] if status != 200 else 0
+            total["retries"] += counts["retries"]
+            total["seconds"] += counts["seconds"]
+            total["max_latency"] = max(total["max_latency"], counts["max_latency"])
+            total["bytes"] += counts["bytes"]
+            total["wait"] += counts["wait"]
+        return list(totals.values())
+
+    def summary(self) -> dict:
+        with self._lock:
+            stages = {name: dict(stage) for name, stage in self.stages.items()}
+            requests = list(self.requests)
+        return {"stages": stages, "endpoints": self.endpoints(), "requests": requests}
+
+    def to_json(self, path: str) -> str:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+        return path
+
+    def to_prometheus(self, path: str) -> str:
+        """
+        Exporta no formato texto do Prometheus (para o textfile collector do
+        node_exporter, por exemplo).
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        return path
+
+    def prometheus_text(self) -> str:
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(f"{name}{labels} {value}" for labels, value in samples)
+
+        with self._lock:
+            counts = [(_labels(host=host, endpoint=path, status=status, cached=str(cached).lower()), total["requests"])
+                      for (host, path, status, cached), total in self.request_totals.items()]
+            stages = {key: dict(total) for key, total in self.stage_totals.items()}
+        metric("qr_http_requests_total", "counter", "Chamadas HTTP por host, endpoint e status", counts)
+
+        endpoints = self.endpoints()
+        for total in endpoints:
+            total["labels"] = _labels(host=total["host"], endpoint=total["endpoint"])
+        metric("qr_http_request_seconds_total", "counter", "Soma das latências por endpoint",
+               [(t["labels"], t["seconds"]) for t in endpoints])
+        metric("qr_http_request_seconds_max", "gauge", "Maior latência por endpoint",
+               [(t["labels"], t["max_latency"]) for t in endpoints])
+        metric("qr_http_response_bytes_total", "counter", "Bytes recebidos por endpoint",
+               [(t["labels"], t["bytes"]) for t in endpoints])
+        metric("qr_http_retries_total", "counter", "Novas tentativas por endpoint",
+               [(t["labels"], t["retries"]) for t in endpoints])
+        metric("qr_http_limiter_wait_seconds_total", "counter", "Tempo esperando o limitador do host",
+               [(t["labels"], t["wait"]) for t in endpoints])
+
+        metric("qr_stage_seconds_total", "counter", "Tempo de cada etapa (sem o id do survey)",
+               [(_labels(stage=name, kind=kind), total["seconds"]) for (name, kind), total in stages.items()])
+        metric("qr_stage_calls_total", "counter", "Execuções de cada etapa (sem o id do survey)",
+               [(_labels(stage=name, kind=kind), total["calls"]) for (name, kind), total in stages.items()])
+        kinds = {}
+        for (_, kind), total in stages.items():
+            kinds[kind] = kinds.get(kind, 0.0) + total["seconds"]
+        metric("qr_stage_kind_seconds_total", "counter",
+               "Tempo somado por tipo de etapa (fetch, flatten, merge, aggregate, write)",
+               [(_labels(kind=kind), seconds) for kind, seconds in kinds.items()])
+
+        return "\n".join(lines) + "\n"
+
+    def export(self, directory: str) -> list:
+        """
+        Escreve metrics.json e metrics.prom em `directory`.
+        """
+        os.makedirs(directory, exist_ok=True)
+        return [
+            self.to_json(os.path.join(directory, "metrics.json")),
+            self.to_prometheus(os.path.join(directory, "metrics.prom")),
+        ]
+
+
+# Registro usado pelo http_client e pelo pipeline
+registry = Metrics()
@@ -1,5 +1,9 @@
 from .participants import main as participants_main
+from .participants import async_main as participants_async_main
+from .participants import to_dataframe as participants_to_dataframe
 
 __all__ = [
-    "participants_main"
+    "participants_main",
+    "participants_async_main",
+    "participants_to_dataframe",
 ]
@@ -0,0 +1,178 @@
+import html
+import json
+import os
+import re
+import time
+
+import requests
+
+# Cookies da sessão autenticada e token CSRF do app, reaproveitados entre execuções
+SESSION_PATH = os.getenv("QR_SESSION_CACHE", os.path.join(".cache", "auth", "session.json"))
+# Tempo máximo (s) em que a sessão salva é usada sem novo login, mesmo que
+# os cookies não tenham validade própria (cookies de sessão do navegador)
+SESSION_MAX_AGE = int(os.getenv("QR_SESSION_MAX_AGE", str(12 * 60 * 60)))
+# Tamanho dos blocos lidos da página inicial até achar o token CSRF
+CHUNK_SIZE = 16 * 1024
+
+_TAG = r"<{tag}\b[^>]*>"
+_ATTR = re.compile(r"""([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""")
+
+
+def _attrs(tag: str) -> dict:
+    attrs = {}
+    for match in _ATTR.finditer(tag):
+        double, single, bare = match.group(2, 3, 4)
+        value = double if double is not None else single if single is not None else bare
+        attrs[match.group(1).lower()] = html.unescape(value)
+    return attrs
+
+
+def find_attr(text: str, tag: str, match: dict, attr: str):
+    """
+    Valor de `attr` na primeira tag `tag` cujos atributos contenham `match`
+    (ex.: input com name=authenticity_token), ou None. Só as tags `tag` são
+    lidas, sem montar a árvore do HTML inteiro.
+    """
+    for found in re.finditer(_TAG.format(tag=tag), text, re.IGNORECASE):
+        attrs = _attrs(found.group(0))
+        if all(attrs.get(key) == value for key, value in match.items()):
+            return attrs.get(attr)
+    return None
+
+
+def _read_until(response: requests.Response, pattern: re.Pattern) -> str:
+    """
+    Lê o corpo em blocos só até `pattern` aparecer e fecha a conexão.
+    """
+    text = ""
+    try:
+        for chunk in response.iter_content(CHUNK_SIZE):
+            text += chunk.decode(response.encoding or "utf-8", "replace")
+            if pattern.search(text):
+                break
+    finally:
+        response.close()
+    return text
+
+
+def get_auth_session(BASE_URL):
+    EMAIL = os.getenv("LOGIN")
+    PASSWORD = os.getenv('PASSWORD')
+    LOGIN_URL   = f"{BASE_URL}/users/sign_in"
+
+    # 1) Cria uma sessão que vai manter cookies (_qulture_session)
+    session = requests.Session()
+
+    # 2) GET na página de login → extrai authenticity_token e utf8
+    resp = session.get(LOGIN_URL)
+    resp.raise_for_status()
+    auth_token = find_attr(resp.text, "input", {"name": "authenticity_token"}, "value")
+    utf8_val   = find_attr(resp.text, "input", {"name": "utf8"}, "value")
+
+    # 3) POST de login (Rails/Devise retorna JSON com "user" em caso de sucesso)
+    login_payload = {
+        "utf8": utf8_val,
+        "authenticity_token": auth_token,
+        "user[email]": EMAIL,
+        "user[password]": PASSWORD,
+        "commit": find_attr(resp.text, "input", {"type": "submit"}, "value")
+    }
+    login_headers = {
+        "User-Agent": "Mozilla/5.0",
+        "Accept": "application/json"
+    }
+    login_resp = session.post(LOGIN_URL, data=login_payload, headers=login_headers)
+    login_resp.raise_for_status()
+    login_json = login_resp.json()
+    if "user" not in login_json:
+        raise RuntimeError(f"Falha no login: {login_json}")
+    return session
+
+
+_CSRF_META = re.compile(r"""<meta\b[^>]*name=["']csrf-token["'][^>]*>""", re.IGNORECASE)
+
+
+def get_csfr_meta(BASE_URL, session):
+    # O meta fica no <head>: o resto da página nem é baixado
+    resp = session.get(BASE_URL, stream=True)
+    resp.raise_for_status()
+    text = _read_until(resp, _CSRF_META)
+    csrf_meta = find_attr(text, "meta", {"name": "csrf-token"}, "content")
+    if csrf_meta is None:
+        raise RuntimeError("Token CSRF não encontrado na página inicial")
+    return csrf_meta
+
+
+def _expires(session: requests.Session) -> float:
+    """
+    Validade da sessão: a do cookie que expira primeiro, limitada a SESSION_MAX_AGE.
+    """
+    expires = time.time() + SESSION_MAX_AGE
+    for cookie in session.cookies:
+        if cookie.expires:
+            expires = min(expires, cookie.expires)
+    return expires
+
+
+def load_credentials(BASE_URL):
+    """
+    Retorna {"cookies", "csrf", "expires", ...} salvo para esta URL e este
+    usuário, ou None se não existir ou já tiver expirado. A checagem é só
+    local (sem requisição): se o servidor recusar a sessão antes disso, quem
+    chamou deve usar `credentials(..., force=True)`.
+    """
+    try:
+        with open(SESSION_PATH, encoding="utf-8") as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if saved.get("base_url") != BASE_URL or saved.get("login") != os.getenv("LOGIN"):
+        return None
+    if saved.get("expires", 0) <= time.time():
+        return None
+    return saved
+
+
+def save_credentials(credentials: dict):
+    os.makedirs(os.path.dirname(SESSION_PATH), exist_ok=True)
+    # Cookies de sessão valem como senha: arquivo só para o dono
+    fd = os.open(f"{SESSION_PATH}.tmp", os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(credentials, f)
+    os.replace(f"{SESSION_PATH}.tmp", SESSION_PATH)
+
+
+def invalidate():
+    try:
+        os.remove(SESSION_PATH)
+    except FileNotFoundError:
+        pass
+
+
+def login(BASE_URL) -> dict:
+    """
+    Faz o login completo, busca o token CSRF e salva os dois.
+    """
+    session = get_auth_session(BASE_URL)
+    csrf = get_csfr_meta(BASE_URL, session)
+    credentials = {
+        "base_url": BASE_URL,
+        "login": os.getenv("LOGIN"),
+        # Depois do GET da página inicial, que pode renovar o cookie de sessão
+        "cookies": session.cookies.get_dict(),
+        "csrf": csrf,
+        "expires": _expires(session),
+    }
+    save_credentials(credentials)
+    return credentials
+
+
+def credentials(BASE_URL, force: bool = False) -> dict:
+    """
+    Cookies e token CSRF da sessão salva, se ainda válida; senão (ou com
+    `force=True`) faz um novo login. `from_cache` indica de onde vieram.
+    """
+    saved = None if force else load_credentials(BASE_URL)
+    if saved is not None:
+        return dict(saved, from_cache=True)
+    return dict(login(BASE_URL), from_cache=False)
@@ -1,132 +1,84 @@
-import requests
-from bs4 import BeautifulSoup
-import dotenv
-import os
-import pandas as pd
-
-dotenv.load_dotenv
+import asyncio
+
+import http_client
+import settings
+from schemas import CONTRACTS
+from http_client.decoding import DECODE_ERRORS
+from . import auth
+
+BASE_URL = settings.QR_APP_URL
+# Respostas que indicam sessão expirada ou token CSRF inválido
+AUTH_ERRORS = (401, 403, 422)
+
+
+class SessionExpired(Exception):
+    pass
+
+
+async def fetch_contracts(session, TABLE_QURL, headers, cookies, page):
+    """
+    Busca a página `page` da ContractsTableQuery reaproveitando os cookies da
+    sessão autenticada (requests) e o token CSRF.
+    """
+    try:
+        response = await http_client.request_json(session, "POST", TABLE_QURL, headers=headers, cookies=cookies, json=contracts_payload(page), schema=CONTRACTS)
+    except DECODE_ERRORS as e:
+        # Sessão expirada: o app redireciona para a página de login (HTML)
+        raise SessionExpired(f"Resposta não é JSON na página {page}") from e
+    if response.status in AUTH_ERRORS:
+        raise SessionExpired(f"HTTP {response.status} na página {page}")
+    response.raise_for_status()
+    if not (response.data or {}).get("data"):
+        raise SessionExpired(f"Resposta sem dados na página {page}: {response.data}")
+    return response
+
+async def async_main() -> list:
+    """
+    Busca todas as páginas de contratos em paralelo; a concorrência é
+    controlada pelo limitador por host do http_client. O total de contratos
+    vem do pageInfo da primeira página, sem uma consulta de contagem separada.
+    Retorna a lista de contratos na mesma ordem das páginas.
+
+    Os cookies e o token CSRF vêm da sessão salva (ver auth); o login
+    (síncrono, em uma thread) só é refeito quando ela expirou ou quando o
+    servidor a recusa.
+    """
+    table_qurl = f"{BASE_URL}/{settings.COMPANY_ID}/graphql?op=ContractsTableQuery"
+    credentials = await asyncio.to_thread(auth.credentials, BASE_URL)
+    try:
+        return await _fetch_all(table_qurl, credentials)
+    except SessionExpired as e:
+        if not credentials["from_cache"]:
+            raise
+        print(f"Sessão salva recusada ({e}), refazendo o login")
+        credentials = await asyncio.to_thread(auth.credentials, BASE_URL, True)
+        return await _fetch_all(table_qurl, credentials)
+
+async def _fetch_all(table_qurl, credentials) -> list:
+    headers = contracts_headers(BASE_URL, credentials["csrf"])
+    cookies = credentials["cookies"]
+    # Sem os cookies na chave: depois de um novo login, a busca é retomada
+    journal = http_client.open_journal(table_qurl, variant=CONTRACTS.name)
+
+    async def fetch_page(page):
+        return await fetch_contracts(session, table_qurl, headers, cookies, page)
+
+    async with http_client.session() as session:
+        stream = http_client.paginate(fetch_page, http_client.graphql_total("contracts"), journal=journal)
+        responses = await http_client.collect_pages(stream)
+
+    return [contract for response in responses for contract in CONTRACTS.records(response.data)]
 
 def main():
-    base_url = "https://app.qulture.rocks"
-    pages_qurl = f"{base_url}/8378/graphql?op=ActiveContractsCountQuery"
-    table_qurl = f"{base_url}/8378/graphql?op=ContractsTableQuery"
-    auth_session = get_auth_session(base_url)
-    csrf_meta = get_csfr_meta(base_url, auth_session)
-    
-    pages = get_pages(base_url, pages_qurl, auth_session, csrf_meta)
-
-    all_contracts = []
-
-    for page in range(1, pages + 1):
-        contract = get_contracts(base_url, table_qurl, auth_session, csrf_meta, page)
-        all_contracts.extend(contract)
-
-    all_contracts = pd.DataFrame(all_contracts)
-
-    all_contracts['image'] = all_contracts['image'].apply(lambda x: x.get('url', ""))
-
-    def extract_supervisor_fields(supervisor):
-        if not isinstance(supervisor, dict):
-            return pd.Series({
-                'supervisor_id': "",
-                'supervisor_name': "",
-                'supervisor_email': "",
-                'supervisor_image': ""
-            })
-        return pd.Series({
-            'supervisor_id': supervisor.get('id', ""),
-            'supervisor_name': supervisor.get('name', ""),
-            'supervisor_email': supervisor.get('email', ""),
-            'supervisor_image': supervisor.get('image', {}).get('url', "")
-        })
-
-    all_contracts[['supervisor_id', 'supervisor_name', 'supervisor_email', 'supervisor_image']] = \
-        all_contracts['supervisor'].apply(extract_supervisor_fields)
-    
-    all_contracts.drop(columns=['supervisor'], inplace=True)
-
-    cols_to_keep = ['id', 'name', 'email', 'image', 'supervisor_id', 'supervisor_name', 'supervisor_email', 'supervisor_image']
-    all_contracts = all_contracts[cols_to_keep]
-
-    return all_contracts
-
-
-def get_auth_session(BASE_URL):
-    EMAIL = os.getenv("LOGIN")
-    PASSWORD = os.getenv('PASSWORD')
-    LOGIN_URL   = f"{BASE_URL}/users/sign_in"
-
-    # 1) Cria uma sessão que vai manter cookies (_qulture_session)
-    session = requests.Session()
-
-    # 2) GET na página de login → extrai authenticity_token e utf8
-    resp = session.get(LOGIN_URL)
-    resp.raise_for_status()
-    soup = BeautifulSoup(resp.text, "html.parser")
-    auth_token = soup.find("input", {"name": "authenticity_token"})["value"]
-    utf8_val   = soup.find("input", {"name": "utf8"})["value"]
-
-    # 3) POST de login (Rails/Devise retorna JSON com "user" em caso de sucesso)
-    login_payload = {
-        "utf8": utf8_val,
-        "authenticity_token": auth_token,
-        "user[email]": EMAIL,
-        "user[password]": PASSWORD,
-        "commit": soup.find("input", {"type": "submit"})["value"]
-    }
-    login_headers = {
-        "User-Agent": "Mozilla/5.0",
-        "Accept": "application/json"
-    }
-    login_resp = session.post(LOGIN_URL, data=login_payload, headers=login_headers)
-    login_resp.raise_for_status()
-    login_json = login_resp.json()
-    if "user" not in login_json:
-        raise RuntimeError(f"Falha no login: {login_json}")
-    return session
-
-def get_csfr_meta(BASE_URL, session):
-    resp = session.get(BASE_URL)
-    resp.raise_for_status()
-    soup = BeautifulSoup(resp.text, "html.parser")
-    csrf_meta = soup.find("meta", {"name": "csrf-token"})["content"]
-    return csrf_meta
-
-def get_pages(BASE_URL, PAGES_QURL,session, csrf_meta):
-    payload = {
-        "query": "query ActiveContractsCountQuery {\n  contracts(filter: {withStatus: ALL}) {\n    pageInfo {\n      totalCount\n      __typename\n    }\n    __typename\n  }\n}\n",
-        "variables": {}
-    }
-    headers = {
-    'accept': '*/*',
-    'accept-language': 'pt-BR,pt;q=0.9,en-US;q=0.8,en;q=0.7',
-    'cache-control': 'no-cache',
-    'content-type': 'application/json',
-    'origin': BASE_URL,
-    'priority': 'u=1, i',
-    'referer': f"{BASE_URL}/",
-    'sec-ch-ua': '"Chromium";v="134", "Not:A-Brand";v="24", "Google Chrome";v="134"',
-    'sec-ch-ua-mobile': '?0',
-    'sec-ch-ua-platform': '"Windows"',
-    'sec-fetch-dest': 'empty',
-    'sec-fetch-mode': 'cors',
-    'sec-fetch-site': 'same-origin',
-    'track_client_version': '3.164.1297',
-    'track_location_href': f"{BASE_URL}/^#/company/8378/contracts",
-    'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36',
-    'x-csrf-token': csrf_meta
-    }
-
-    resp = session.post(PAGES_QURL, json=payload, headers=headers)
-    resp.raise_for_status()
-    json = resp.json()
-    pages = json["data"]["contracts"]["pageInfo"]["totalCount"]//100 + 1
+    return to_dataframe(asyncio.run(async_main()))
 
-    return pages
+def to_dataframe(all_contracts):
+    # Campos ausentes (ex.: contrato sem supervisor) viram ""
+    return CONTRACTS.buffer(default="").extend(all_contracts).frame()
 
 
-def get_contracts(BASE_URL, TABLE_QURL, session, csrf_meta, page):
-    payload = {
+def contracts_payload(page):
+    return {
     "query": """
 query ContractsTableQuery($filter: ContractScope, $per: Int, $page: Int) {
 contracts(per: $per, page: $page, filter: $filter) {
@@ -213,7 +165,9 @@ __typename
     }
 }
 
-    headers = {
+
+def contracts_headers(BASE_URL, csrf_meta):
+    return {
     'accept': '/',
     'accept-language': 'pt-BR,pt;q=0.9,en-US;q=0.8,en;q=0.7',
     'cache-control': 'no-cache',
@@ -234,16 +188,10 @@ __typename
     'x-csrf-token': csrf_meta
     }
 
-    resp = session.post(TABLE_QURL, headers=headers, json=payload)
-    resp.raise_for_status()
-    json = resp.json()
-    contracts = json["data"]["contracts"]["nodes"]
-    return contracts
-
 
 if __name__ == "__main__":
     df = main()
-    df['id'] = df['id'].astype('int64')
+    df['id'] = df['id'].astype('Int64')
 
     if not df.empty:
         df.to_excel("participants.xlsx", index=False)
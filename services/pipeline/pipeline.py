@@ -0,0 +1,74 @@
+import asyncio
+import inspect
+
+from metrics import registry as metrics
+
+
+class Pipeline:
+    """
+    Agendador de etapas com dependências, executado em um único event loop.
+
+    Cada etapa recebe como argumentos posicionais os resultados das etapas das
+    quais depende (na ordem declarada) e começa assim que elas terminam.
+    Etapas assíncronas rodam no próprio loop; funções síncronas (bloqueantes
+    ou de CPU, como merges do pandas) rodam em uma thread via asyncio.to_thread.
+    O tempo de cada etapa também é registrado em metrics, com o `kind` dado
+    em add (ex.: fetch, flatten, merge, write).
+    """
+
+    def __init__(self):
+        self._stages = {}
+        # {nome: (início, fim)} em segundos desde o início do run(), para medir cada etapa
+        self.timings = {}
+
+    def add(self, name: str, func, *deps: str, kind: str = None) -> "Pipeline":
+        """
+        Registra a etapa `name`. As dependências precisam ter sido registradas
+        antes, o que garante que o grafo não tem ciclos.
+        """
+        if name in self._stages:
+            raise ValueError(f"Etapa duplicada: {name}")
+        missing = [dep for dep in deps if dep not in self._stages]
+        if missing:
+            raise ValueError(f"Etapa {name} depende de etapas não registradas: {missing}")
+        self._stages[name] = (func, deps, kind)
+        return self
+
+    def provide(self, name: str, value) -> "Pipeline":
+        """
+        Registra `name` como uma etapa já pronta, com o resultado `value`
+        (ex.: dados de referência que o serviço mantém em memória).
+        """
+        async def ready():
+            return value
+        return self.add(name, ready)
+
+    async def _run_stage(self, name: str, tasks: dict, started: float):
+        func, deps, kind = self._stages[name]
+        args = [await tasks[dep] for dep in deps]
+        loop = asyncio.get_running_loop()
+        start = loop.time() - started
+        try:
+            if inspect.iscoroutinefunction(func):
+                with metrics.stage(name, kind):
+                    return await func(*args)
+            # A medição (e o cProfile) roda dentro da thread da etapa
+            return await asyncio.to_thread(metrics.timed(name, kind, func), *args)
+        finally:
+            self.timings[name] = (start, loop.time() - started)
+
+    async def run(self) -> dict:
+        """
+        Inicia todas as etapas de uma vez e retorna {nome: resultado}.
+        Se alguma etapa falhar, as demais são canceladas e o erro é propagado.
+        """
+        tasks = {}
+        started = asyncio.get_running_loop().time()
+        for name in self._stages:
+            tasks[name] = asyncio.ensure_future(self._run_stage(name, tasks, started))
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            for task in tasks.values():
+                task.cancel()
+        return {name: task.result() for name, task in tasks.items()}
@@ -0,0 +1,11 @@
+from .report import merge_employees, merge_report, REPORT_COLUMNS
+from .summary import summarize, summary_tables, SUMMARIES
+
+__all__ = [
+    "merge_employees",
+    "merge_report",
+    "REPORT_COLUMNS",
+    "summarize",
+    "summary_tables",
+    "SUMMARIES",
+]
@@ -0,0 +1,66 @@
+import pandas as pd
+
+# Colunas do relatório final: {coluna do merge: nome no relatório}, na ordem de saída
+REPORT_COLUMNS = {
+    'answers_grading': 'Notas',
+    'answers_comment': 'Comentário da resposta',
+    'answers_relationship': 'Direção',
+    'answers_reviewer_name': 'Nome do Avaliador',
+    'surveys_name': 'Título da Pesquisa',
+    'surveys_start_at': 'Início da Pesquisa',
+    'surveys_end_at': 'Fim da Pesquisa',
+    'topics_question_name': 'Competência',
+    'participants_name': 'Nome do Avaliado',
+    'participants_email': 'E-mail do Avaliado',
+    'participants_supervisor_name': 'Nome do Líder Imediato',
+    'participants_supervisor_email': 'E-mail do Líder Imediato',
+    'teamleader_value': 'Nome do Team Leader',
+    'coordenador_value': 'Nome do Coordenador',
+    'heads_value': 'E-mail do Head',
+}
+
+# Projeção de cada fonte: chave de junção + colunas usadas no relatório
+ANSWER_COLUMNS = ['answers_survey_id', 'answers_question_id', 'answers_reviewee_id', 'answers_grading',
+                  'answers_comment', 'answers_relationship', 'answers_reviewer_name']
+SURVEY_COLUMNS = ['surveys_id', 'surveys_name', 'surveys_start_at', 'surveys_end_at']
+TOPIC_COLUMNS = ['topics_question_id', 'topics_question_name']
+PARTICIPANT_COLUMNS = ['participants_id', 'participants_name', 'participants_email',
+                       'participants_supervisor_name', 'participants_supervisor_email']
+LEADER_COLUMNS = ['teamleader_value', 'coordenador_value', 'heads_value']
+
+
+def merge_employees(employees, participants, leaders) -> pd.DataFrame:
+    """
+    Uma linha por colaborador do Factorial com o participants_id (casado pelo
+    e-mail) e os três líderes, vindos da tabela larga de custom fields
+    (valuable_id + LEADER_COLUMNS) unida com um só join.
+    """
+    leaders = leaders.set_index('valuable_id')[LEADER_COLUMNS]
+    df = pd.merge(employees, participants[['participants_id', 'participants_email']],
+                  left_on='employees_email', right_on='participants_email', how='left')
+    return df.join(leaders, on='employees_id')
+
+
+def merge_report(answers, surveys, topics, participants, employees_merge) -> pd.DataFrame:
+    """
+    Junta as respostas às demais fontes e retorna o relatório já com os nomes
+    finais das colunas.
+
+    Cada fonte é projetada nas colunas usadas antes do join, todos os joins são
+    por ids inteiros e participants entra uma única vez (os líderes vêm do
+    merge de colaboradores, indexado pelo participants_id). As colunas trazem
+    os dtypes compactos dos schemas (ids estreitos, categorias para rótulos
+    repetidos), que o merge preserva.
+    """
+    leaders = employees_merge.dropna(subset=['participants_id'])
+    leaders = leaders[['participants_id', *LEADER_COLUMNS]].drop_duplicates('participants_id', keep='last')
+    # Mesmo tipo do id em participants (o merge com colaboradores pode tê-lo alargado)
+    leaders = leaders.astype({'participants_id': participants['participants_id'].dtype})
+
+    df = answers[ANSWER_COLUMNS]
+    df = pd.merge(df, surveys[SURVEY_COLUMNS], left_on='answers_survey_id', right_on='surveys_id', how='left')
+    df = pd.merge(df, topics[TOPIC_COLUMNS], left_on='answers_question_id', right_on='topics_question_id', how='left')
+    df = pd.merge(df, participants[PARTICIPANT_COLUMNS], left_on='answers_reviewee_id', right_on='participants_id', how='left')
+    df = pd.merge(df, leaders, on='participants_id', how='left')
+
+    return df[list(REPORT_COLUMNS)].rename(columns=REPORT_COLUMNS)
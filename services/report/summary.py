@@ -0,0 +1,80 @@
+import pandas as pd
+
+# Colunas do relatório usadas nos resumos
+GRADE = 'Notas'
+SURVEY = 'Título da Pesquisa'
+
+# Resumos: {nome da tabela: colunas de agrupamento}. Todos são também por
+# survey, para que um relatório combinado não misture escalas diferentes.
+SUMMARIES = {
+    'avaliado': ['Nome do Avaliado', 'E-mail do Avaliado'],
+    'competencia': ['Competência'],
+    'direcao': ['Direção'],
+    'avaliado_competencia': ['Nome do Avaliado', 'E-mail do Avaliado', 'Competência'],
+    'avaliado_competencia_direcao': ['Nome do Avaliado', 'E-mail do Avaliado', 'Competência', 'Direção'],
+    'lider': ['Nome do Líder Imediato', 'E-mail do Líder Imediato'],
+    'team_leader': ['Nome do Team Leader'],
+    'coordenador': ['Nome do Coordenador'],
+    'head': ['E-mail do Head'],
+}
+
+
+def _integral(grades: pd.Series) -> pd.Series:
+    """
+    Se cada nota é inteira (3.0 sim, 3.5 não); ausentes são False.
+    """
+    return grades.notna() & (grades == grades.round())
+
+
+def _grade_columns(grades: pd.Series, grades_amount) -> list:
+    """
+    Notas da distribuição: 1..grades_amount, mais qualquer outra nota
+    inteira que apareça nas respostas.
+    """
+    scale = set(range(1, int(grades_amount) + 1)) if pd.notna(grades_amount) else set()
+    return sorted(scale | set(grades[_integral(grades)].astype(int).unique()))
+
+
+def summarize(report: pd.DataFrame, keys: list, grades_amount=None) -> pd.DataFrame:
+    """
+    Estatísticas das notas do relatório agrupadas por `keys`: número de
+    respostas, média, desvio padrão e a contagem de cada nota da escala
+    (1..grades_amount). Respostas sem nota numérica contam só em "Respostas".
+    Só notas inteiras entram na distribuição: uma nota fracionária (ex.: 3.5)
+    conta em "Com nota", na média e no desvio, mas em nenhuma "Nota N" (não
+    é arredondada nem truncada).
+    """
+    keys = [SURVEY, *keys]
+    grades = pd.to_numeric(report[GRADE], errors='coerce')
+    frame = report[keys].assign(**{GRADE: grades})
+    # observed=True: só as combinações que existem (as chaves são categóricas)
+    groups = frame.groupby(keys, observed=True, dropna=False, sort=True)[GRADE]
+
+    stats = pd.DataFrame({
+        'Respostas': groups.size(),
+        'Com nota': groups.count(),
+        'Média': groups.mean(),
+        'Desvio padrão': groups.std(),
+    })
+
+    columns = _grade_columns(grades, grades_amount)
+    if columns:
+        graded = frame[_integral(grades).to_numpy()]
+        distribution = (graded.groupby([*keys, graded[GRADE].astype(int)], observed=True, dropna=False)
+                        .size()
+                        .unstack(GRADE, fill_value=0)
+                        .reindex(columns=columns, fill_value=0))
+        distribution.columns = [f'Nota {grade}' for grade in distribution.columns]
+        stats = stats.join(distribution)
+        stats[distribution.columns] = stats[distribution.columns].fillna(0).astype('int32')
+
+    return stats.reset_index()
+
+
+def summary_tables(report: pd.DataFrame, surveys: pd.DataFrame) -> dict:
+    """
+    Todos os resumos de SUMMARIES ({nome: DataFrame}). A escala vem de
+    grades_amount dos surveys (o maior, se houver mais de um).
+    """
+    grades_amount = surveys['surveys_grades_amount'].max() if 'surveys_grades_amount' in surveys else None
+    return {name: summarize(report, keys, grades_amount) for name, keys in SUMMARIES.items()}
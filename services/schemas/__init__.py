@@ -0,0 +1,27 @@
+from .schemas import (
+    Schema,
+    SCHEMAS,
+    ANSWERS,
+    TOPICS,
+    SURVEYS,
+    CONTRACTS,
+    EMPLOYEES,
+    CUSTOM_FIELD_VALUES,
+)
+from .dtypes import STRING, ids, labels, text, compact
+
+__all__ = [
+    "Schema",
+    "SCHEMAS",
+    "ANSWERS",
+    "TOPICS",
+    "SURVEYS",
+    "CONTRACTS",
+    "EMPLOYEES",
+    "CUSTOM_FIELD_VALUES",
+    "STRING",
+    "ids",
+    "labels",
+    "text",
+    "compact",
+]
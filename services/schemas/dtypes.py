@@ -0,0 +1,49 @@
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+# Texto livre em Arrow quando o pyarrow estiver instalado (opcional, como o
+# msgspec/orjson no http_client); senão, o StringDtype do próprio pandas
+STRING = "string[pyarrow]" if importlib.util.find_spec("pyarrow") else "string"
+
+_INT32 = np.iinfo(np.int32)
+
+
+def ids(values) -> pd.Series:
+    """
+    Ids inteiros no menor tipo que os comporta (Int32, senão Int64), com
+    suporte a ausentes. Aceita números ou strings numéricas (ids do GraphQL);
+    o que não for número vira <NA>.
+    """
+    numbers = pd.to_numeric(pd.Series(values, dtype=object), errors="coerce")
+    low, high = numbers.min(), numbers.max()
+    fits = pd.isna(low) or (low >= _INT32.min and high <= _INT32.max)
+    return numbers.astype("Int32" if fits else "Int64")
+
+
+def labels(values) -> pd.Series:
+    """
+    Rótulos que se repetem (nomes, direção, título do survey): categóricos,
+    então cada valor distinto é guardado uma única vez.
+    """
+    return pd.Series(values, dtype="category")
+
+
+def text(values) -> pd.Series:
+    """
+    Texto livre (comentários): strings sem o overhead de objetos Python.
+    """
+    return pd.Series(values, dtype=STRING)
+
+
+def compact(df: pd.DataFrame, dtypes: dict) -> pd.DataFrame:
+    """
+    Aplica os conversores de `dtypes` ({coluna: ids/labels/text}) às colunas
+    que existirem no DataFrame, para frames que não são montados por um
+    ColumnBuffer.
+    """
+    for column, convert in dtypes.items():
+        if column in df.columns:
+            df[column] = convert(df[column])
+    return df
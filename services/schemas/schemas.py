@@ -0,0 +1,225 @@
+from dataclasses import dataclass, field
+from typing import Any
+
+from flatten import ColumnBuffer
+from .dtypes import ids, labels, text
+
+
+def _insert(tree: dict, path: list, leaf):
+    node = tree
+    for key in path[:-1]:
+        node = node.setdefault(key, {})
+    node.setdefault(path[-1], leaf)
+
+
+@dataclass(frozen=True, eq=False)
+class Schema:
+    """
+    Formato declarado de uma página da API.
+
+    `root` é o caminho da lista de registros na página; `fields` mapeia cada
+    coluna ao caminho do campo em cada registro (como em flatten). Com
+    `items`, cada registro gera uma linha por elemento dessa lista, e
+    `parent_fields` é lido do registro que a contém. `extra` lista outros
+    caminhos da página que precisam ser decodificados (ex.: o total usado na
+    paginação) e `types` dá o tipo Python esperado de algumas colunas.
+    `dtypes` dá o conversor de cada coluna no DataFrame (ver dtypes.py).
+    """
+    name: str
+    root: str
+    fields: dict
+    items: str = None
+    parent_fields: dict = None
+    extra: tuple = ()
+    types: dict = field(default_factory=dict)
+    dtypes: dict = field(default_factory=dict)
+
+    def buffer(self, default=None) -> ColumnBuffer:
+        return ColumnBuffer(self.fields, self.items, self.parent_fields, default, self.dtypes)
+
+    def records(self, page) -> list:
+        """
+        A lista de registros da página (vazia se a página não a tiver).
+        """
+        node = page
+        for key in self.root.split("."):
+            if not isinstance(node, dict):
+                return []
+            node = node.get(key)
+        return node or []
+
+    def spec(self) -> dict:
+        """
+        Árvore com só os campos usados: dicts para objetos, [nó] para listas
+        e o tipo esperado (ou Any) nas folhas.
+        """
+        record = {}
+        child = {}
+        for column, path in self.fields.items():
+            _insert(child if self.items else record, path.split("."), self.types.get(column, Any))
+        if self.items:
+            _insert(record, self.items.split("."), [child])
+            for column, path in (self.parent_fields or {}).items():
+                _insert(record, path.split("."), self.types.get(column, Any))
+
+        page = {}
+        _insert(page, self.root.split("."), [record])
+        for path in self.extra:
+            _insert(page, path.split("."), Any)
+        return page
+
+
+ANSWERS = Schema(
+    name="answers",
+    root="answers",
+    fields={
+        'id': 'id',
+        'grading': 'grading',
+        'question_id': 'question_id',
+        'comment': 'comment',
+        'participant_id': 'participant_id',
+        'survey_id': 'participant.survey_id',
+        'survey_participation_id': 'participant.survey_participation_id',
+        'reviewee_id': 'participant.reviewee_id',
+        'relationship': 'participant.relationship',
+        'reviewer_id': 'participant.reviewer.id',
+        'reviewer_name': 'participant.reviewer.user.name',
+    },
+    types={
+        'id': int,
+        'question_id': int,
+        'participant_id': int,
+        'survey_id': int,
+        'reviewee_id': int,
+        'reviewer_id': int,
+        'relationship': str,
+        'reviewer_name': str,
+    },
+    dtypes={
+        'id': ids,
+        'question_id': ids,
+        'comment': text,
+        'participant_id': ids,
+        'survey_id': ids,
+        'survey_participation_id': ids,
+        'reviewee_id': ids,
+        'relationship': labels,
+        'reviewer_id': ids,
+        'reviewer_name': labels,
+    },
+)
+
+TOPICS = Schema(
+    name="topics",
+    root="topics",
+    items="questions",
+    fields={
+        'question_id': 'id',
+        'question_name': 'name',
+    },
+    parent_fields={
+        'survey_name': 'name',
+    },
+    types={
+        'question_id': int,
+        'question_name': str,
+        'survey_name': str,
+    },
+    dtypes={
+        'question_id': ids,
+        'question_name': labels,
+        'survey_name': labels,
+    },
+)
+
+SURVEYS = Schema(
+    name="surveys",
+    root="surveys",
+    fields={
+        'id': 'id',
+        'name': 'name',
+        'stage': 'stage',
+        'settings': 'settings',
+        'participants_count': 'participants_count',
+        'draft': 'draft',
+    },
+    types={
+        'id': int,
+        'name': str,
+    },
+    dtypes={
+        'id': ids,
+        'name': labels,
+        'stage': labels,
+    },
+)
+
+CONTRACTS = Schema(
+    name="contracts",
+    root="data.contracts.nodes",
+    fields={
+        'id': 'id',
+        'name': 'name',
+        'email': 'email',
+        'image': 'image.url',
+        'supervisor_id': 'supervisor.id',
+        'supervisor_name': 'supervisor.name',
+        'supervisor_email': 'supervisor.email',
+        'supervisor_image': 'supervisor.image.url',
+    },
+    extra=("data.contracts.pageInfo.totalCount",),
+    # Nome e e-mail se repetem em cada resposta depois do merge
+    dtypes={
+        'id': ids,
+        'name': labels,
+        'email': labels,
+        'image': text,
+        'supervisor_id': ids,
+        'supervisor_name': labels,
+        'supervisor_email': labels,
+        'supervisor_image': text,
+    },
+)
+
+EMPLOYEES = Schema(
+    name="employees",
+    root="data",
+    fields={
+        'id': 'id',
+        'full_name': 'full_name',
+        'email': 'email',
+        'manager_id': 'manager_id',
+    },
+    extra=("meta.total",),
+    types={
+        'id': int,
+        'manager_id': int,
+    },
+    # E-mail como categoria, igual ao dos contratos, com que é casado no merge
+    dtypes={
+        'id': ids,
+        'full_name': text,
+        'email': labels,
+        'manager_id': ids,
+    },
+)
+
+CUSTOM_FIELD_VALUES = Schema(
+    name="custom_field_values",
+    root="data",
+    fields={
+        'value': 'value',
+        'valuable_id': 'valuable_id',
+    },
+    extra=("meta.total",),
+    types={
+        'valuable_id': int,
+    },
+    # Os valores usados são nomes/e-mails de líderes, repetidos por liderado
+    dtypes={
+        'value': labels,
+        'valuable_id': ids,
+    },
+)
+
+SCHEMAS = {schema.name: schema for schema in (ANSWERS, TOPICS, SURVEYS, CONTRACTS, EMPLOYEES, CUSTOM_FIELD_VALUES)}
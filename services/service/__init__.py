@@ -0,0 +1,8 @@
+from .service import ReferenceData, Reports, create_app, serve
+
+__all__ = [
+    "ReferenceData",
+    "Reports",
+    "create_app",
+    "serve",
+]
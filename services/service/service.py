@@ -0,0 +1,326 @@
+"""
+Modo serviço: um processo que fica no ar com os dados de referência em
+memória e serve os relatórios por HTTP local.
+
+Participants, colaboradores e líderes do Factorial (e o merge de
+colaboradores) são carregados na subida e atualizados cada um no seu
+intervalo; um relatório só busca o que é do survey (surveys, topics e
+answers) e fica em memória por QR_REPORT_TTL, então pedidos repetidos
+respondem na hora.
+
+Endpoints (só em 127.0.0.1 por padrão, sem autenticação):
+    GET  /health
+    GET  /reports/{survey_id}?format=json|csv|xlsx|parquet&incremental=1&refresh=1
+    GET  /summaries/{survey_id}?format=json|xlsx
+    GET  /summaries/{survey_id}/{tabela}?format=json|csv|xlsx|parquet
+    POST /refresh/{participants|employees|leaders}
+    GET  /metrics
+"""
+import asyncio
+import contextlib
+import os
+import tempfile
+import time
+from collections import OrderedDict
+
+import pandas as pd
+from aiohttp import web
+
+import http_client
+import main
+import writers
+from surveys import surveys_async_lookup
+from factorial.hierarchy import leaders_table
+from metrics import registry as metrics
+from pipeline import Pipeline
+from report import merge_employees
+
+HOST = os.getenv("QR_SERVICE_HOST", "127.0.0.1")
+PORT = int(os.getenv("QR_SERVICE_PORT", "8765"))
+# Intervalo (s) de atualização de cada conjunto de dados de referência
+REFRESH = {
+    "participants": int(os.getenv("QR_REFRESH_PARTICIPANTS", "3600")),
+    "employees": int(os.getenv("QR_REFRESH_EMPLOYEES", "3600")),
+    "leaders": int(os.getenv("QR_REFRESH_LEADERS", "21600")),
+}
+# Nova tentativa (s) depois de uma atualização que falhou
+RETRY_AFTER_ERROR = 60
+# Tempo (s) em que um relatório montado é servido da memória
+REPORT_TTL = int(os.getenv("QR_REPORT_TTL", "300"))
+# Relatórios mantidos em memória (os usados há mais tempo saem primeiro)
+MAX_REPORTS = int(os.getenv("QR_SERVICE_MAX_REPORTS", "20"))
+
+CONTENT_TYPES = {
+    "json": "application/json",
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class SurveyNotFound(LookupError):
+    pass
+
+
+class ReferenceData:
+    """
+    Dados compartilhados por todos os relatórios, com os mesmos nomes das
+    etapas do pipeline ("participants", "employees", "leaders",
+    "employees_merge"). Uma atualização que falha mantém os dados
+    anteriores; `version` muda a cada novo employees_merge.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.status = {}
+        self.version = 0
+        self.ready = asyncio.Event()
+        self.datasets = ["participants", "employees"]
+        # Na hierarquia, os líderes saem dos colaboradores (ver _load)
+        if main.LEADERS_FROM != "hierarchy":
+            self.datasets.append("leaders")
+        self._locks = {dataset: asyncio.Lock() for dataset in self.datasets}
+
+    async def _load(self, dataset: str) -> dict:
+        if dataset == "participants":
+            data = await main.participants_async_main()
+            return {"participants": await asyncio.to_thread(main.prepare_participants, data)}
+        if dataset == "employees":
+            data = await main.employees_main()
+            values = {"employees": await asyncio.to_thread(main.prepare_employees, data)}
+            if main.LEADERS_FROM == "hierarchy":
+                values["leaders"] = await asyncio.to_thread(leaders_table, data, main.LEADER_LEVELS)
+            return values
+        return {"leaders": await main.custom_fields(main.LEADER_FIELDS)}
+
+    async def refresh(self, dataset: str) -> bool:
+        async with self._locks[dataset]:
+            start = time.monotonic()
+            try:
+                values = await self._load(dataset)
+            except Exception as e:
+                print(f"[service] Falha ao atualizar {dataset}: {e!r}")
+                self.status[dataset] = dict(self.status.get(dataset, {}), error=repr(e), failed_at=time.time())
+                return False
+            self.values.update(values)
+            self.status[dataset] = {"updated_at": time.time(), "seconds": time.monotonic() - start, "error": None}
+
+        if all(name in self.values for name in ("participants", "employees", "leaders")):
+            self.values["employees_merge"] = await asyncio.to_thread(
+                merge_employees, self.values["employees"], self.values["participants"], self.values["leaders"])
+            self.version += 1
+            self.ready.set()
+        return True
+
+    async def _schedule(self, dataset: str, ok: bool):
+        while True:
+            await asyncio.sleep(REFRESH[dataset] if ok else RETRY_AFTER_ERROR)
+            ok = await self.refresh(dataset)
+
+    async def run(self):
+        """
+        Carga inicial de todos os conjuntos em paralelo e, depois, a
+        atualização de cada um no seu intervalo.
+        """
+        results = await asyncio.gather(*(self.refresh(dataset) for dataset in self.datasets))
+        await asyncio.gather(*(self._schedule(dataset, ok) for dataset, ok in zip(self.datasets, results)))
+
+
+class Reports:
+    """
+    Relatórios e resumos montados sob demanda em cima de ReferenceData.
+    Pedidos simultâneos do mesmo survey esperam a mesma montagem.
+    """
+
+    def __init__(self, reference: ReferenceData):
+        self.reference = reference
+        self._cache = OrderedDict()
+        self._building = {}
+
+    def _fresh(self, entry: dict) -> bool:
+        return time.time() - entry["built_at"] < REPORT_TTL and entry["version"] == self.reference.version
+
+    async def get(self, survey_id: int, incremental: bool = False, refresh: bool = False) -> dict:
+        key = (survey_id, incremental)
+        entry = self._cache.get(key)
+        if entry is not None and not refresh and self._fresh(entry):
+            self._cache.move_to_end(key)
+            return entry
+
+        task = self._building.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._build(survey_id, incremental))
+            self._building[key] = task
+            task.add_done_callback(lambda _: self._building.pop(key, None))
+        # shield: um cliente que desconecta não cancela a montagem para os outros
+        return await asyncio.shield(task)
+
+    async def _build(self, survey_id: int, incremental: bool) -> dict:
+        # Confere o survey antes de buscar topics e answers; o resultado entra
+        # pronto no pipeline, como a etapa surveys_data
+        surveys_data = await surveys_async_lookup(survey_id)
+        if not surveys_data:
+            raise SurveyNotFound(survey_id)
+        await self.reference.ready.wait()
+        version = self.reference.version
+        values = self.reference.values
+
+        pipeline = Pipeline()
+        pipeline.provide("participants", values["participants"])
+        pipeline.provide("employees_merge", values["employees_merge"])
+        main.add_survey_stages(pipeline, survey_id, incremental, surveys_data)
+        pipeline.add("summary", main.summarize_reports, f"report:{survey_id}", f"surveys:{survey_id}", kind="aggregate")
+        results = await pipeline.run()
+
+        entry = {
+            "built_at": time.time(),
+            "version": version,
+            "report": results[f"report:{survey_id}"],
+            "summary": results["summary"],
+            # Corpos já serializados, por (tabela, formato)
+            "bodies": {},
+        }
+        self._cache[(survey_id, incremental)] = entry
+        while len(self._cache) > MAX_REPORTS:
+            self._cache.popitem(last=False)
+        return entry
+
+
+def serialize(df: pd.DataFrame, fmt: str) -> bytes:
+    if fmt == "json":
+        return df.to_json(orient="records", force_ascii=False, date_format="iso").encode("utf-8")
+    if fmt == "csv":
+        return df.to_csv(index=False).encode("utf-8")
+    with tempfile.TemporaryDirectory() as directory:
+        path = writers.write(df, os.path.join(directory, "report"), fmt)
+        with open(path, "rb") as f:
+            return f.read()
+
+
+def serialize_tables(tables: dict, fmt: str) -> bytes:
+    if fmt == "json":
+        body = ",".join(f'"{name}":{df.to_json(orient="records", force_ascii=False, date_format="iso")}'
+                        for name, df in tables.items())
+        return ("{" + body + "}").encode("utf-8")
+    with tempfile.TemporaryDirectory() as directory:
+        paths = writers.write_tables(tables, os.path.join(directory, "resumo"), fmt)
+        with open(paths[0], "rb") as f:
+            return f.read()
+
+
+async def _body(entry: dict, name: str, fmt: str, build) -> web.Response:
+    # Serializa uma vez por relatório montado, fora do event loop
+    key = (name, fmt)
+    if key not in entry["bodies"]:
+        entry["bodies"][key] = await asyncio.to_thread(build)
+    return web.Response(body=entry["bodies"][key], content_type=CONTENT_TYPES[fmt])
+
+
+def _format(request, allowed) -> str:
+    fmt = request.query.get("format", "json")
+    if fmt not in allowed:
+        raise web.HTTPBadRequest(text=f"Formato não suportado: {fmt} (use {', '.join(allowed)})")
+    return fmt
+
+
+def _flag(request, name: str) -> bool:
+    return request.query.get(name, "0") in ("1", "true", "yes")
+
+
+async def _entry(request) -> dict:
+    try:
+        survey_id = int(request.match_info["survey_id"])
+    except ValueError:
+        raise web.HTTPBadRequest(text="survey_id inválido")
+    try:
+        return await request.app["reports"].get(survey_id, _flag(request, "incremental"), _flag(request, "refresh"))
+    except SurveyNotFound:
+        raise web.HTTPNotFound(text=f"Survey {survey_id} não encontrado")
+
+
+async def health(request):
+    reference = request.app["reference"]
+    failing = [dataset for dataset, status in reference.status.items() if status.get("error")]
+    hosts = {host: limiter.stats() for host, limiter in http_client.limiters().items()}
+    # Host com todos os slots presos e nada rodando: nenhuma busca sai mais
+    stalled = [host for host, stats in hosts.items() if stats["stalled"]]
+    if stalled:
+        state = "stalled"
+    elif not reference.ready.is_set():
+        state = "loading"
+    else:
+        state = "degraded" if failing or any(stats["stuck"] for stats in hosts.values()) else "ok"
+    return web.json_response(status=503 if state == "stalled" else 200, data={
+        "status": state,
+        "version": reference.version,
+        "datasets": reference.status,
+        "hosts": hosts,
+        "reports": [{"survey_id": survey_id, "incremental": incremental, "built_at": entry["built_at"]}
+                    for (survey_id, incremental), entry in request.app["reports"]._cache.items()],
+    })
+
+
+async def report(request):
+    fmt = _format(request, CONTENT_TYPES)
+    entry = await _entry(request)
+    return await _body(entry, "report", fmt, lambda: serialize(entry["report"], fmt))
+
+
+async def summaries(request):
+    fmt = _format(request, ("json", "xlsx"))
+    entry = await _entry(request)
+    return await _body(entry, "summary", fmt, lambda: serialize_tables(entry["summary"], fmt))
+
+
+async def summary(request):
+    fmt = _format(request, CONTENT_TYPES)
+    entry = await _entry(request)
+    table = request.match_info["table"]
+    if table not in entry["summary"]:
+        raise web.HTTPNotFound(text=f"Resumo desconhecido: {table} (disponíveis: {', '.join(entry['summary'])})")
+    return await _body(entry, f"summary:{table}", fmt, lambda: serialize(entry["summary"][table], fmt))
+
+
+async def refresh(request):
+    reference = request.app["reference"]
+    dataset = request.match_info["dataset"]
+    if dataset not in reference.datasets:
+        raise web.HTTPNotFound(text=f"Conjunto desconhecido: {dataset} (disponíveis: {', '.join(reference.datasets)})")
+    ok = await reference.refresh(dataset)
+    return web.json_response(reference.status[dataset], status=200 if ok else 502)
+
+
+async def prometheus(request):
+    return web.Response(text=metrics.prometheus_text(), content_type="text/plain")
+
+
+async def _lifecycle(app):
+    # Uma sessão HTTP aberta durante toda a vida do serviço (conexões reaproveitadas)
+    async with http_client.session():
+        task = asyncio.ensure_future(app["reference"].run())
+        yield
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+def create_app() -> web.Application:
+    app = web.Application()
+    app["reference"] = ReferenceData()
+    app["reports"] = Reports(app["reference"])
+    app.cleanup_ctx.append(_lifecycle)
+    app.router.add_get("/health", health)
+    app.router.add_get("/reports/{survey_id}", report)
+    app.router.add_get("/summaries/{survey_id}", summaries)
+    app.router.add_get("/summaries/{survey_id}/{table}", summary)
+    app.router.add_post("/refresh/{dataset}", refresh)
+    app.router.add_get("/metrics", prometheus)
+    return app
+
+
+def serve(host: str = HOST, port: int = PORT):
+    web.run_app(create_app(), host=host, port=port)
+
+
+if __name__ == "__main__":
+    serve()
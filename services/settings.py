@@ -0,0 +1,7 @@
+import os
+
+# Endereços das APIs (podem apontar para o servidor simulado dos benchmarks)
+QR_API_URL = os.getenv("QR_API_URL", "https://api.qulture.rocks/rest")
+QR_APP_URL = os.getenv("QR_APP_URL", "https://app.qulture.rocks")
+FACTORIAL_API_URL = os.getenv("FACTORIAL_API_URL", "https://api.factorialhr.com/api/2024-10-01/resources")
+COMPANY_ID = os.getenv("QR_COMPANY_ID", "8378")
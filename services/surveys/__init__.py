@@ -1,5 +1,15 @@
 from .surveys import main as surveys_main
+from .surveys import async_main as surveys_async_main
+from .surveys import async_lookup as surveys_async_lookup
+from .surveys import to_dataframe as surveys_to_dataframe
+from .catalog import get_survey as surveys_get_survey
+from .catalog import refresh_catalog as surveys_refresh_catalog
 
 __all__ = [
-    "surveys_main"
+    "surveys_main",
+    "surveys_async_main",
+    "surveys_async_lookup",
+    "surveys_to_dataframe",
+    "surveys_get_survey",
+    "surveys_refresh_catalog",
 ]
@@ -0,0 +1,66 @@
+import json
+import os
+import time
+
+import http_client
+from .surveys import async_main
+
+# Índice local do catálogo de surveys, chaveado pelo id do survey
+CATALOG_PATH = os.getenv("QR_SURVEYS_CATALOG", os.path.join(".cache", "surveys", "catalog.json"))
+# Tempo (s) em que o índice é usado sem atualização
+CATALOG_TTL = 60 * 60
+
+
+def load_catalog() -> dict:
+    """
+    Retorna {"updated_at": timestamp, "surveys": {id: survey}} (vazio se não existir).
+    """
+    try:
+        with open(CATALOG_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"updated_at": 0, "surveys": {}}
+
+
+def save_catalog(catalog: dict):
+    os.makedirs(os.path.dirname(CATALOG_PATH), exist_ok=True)
+    with open(f"{CATALOG_PATH}.tmp", "w", encoding="utf-8") as f:
+        json.dump(catalog, f)
+    os.replace(f"{CATALOG_PATH}.tmp", CATALOG_PATH)
+
+
+def is_fresh(catalog: dict) -> bool:
+    return time.time() - catalog["updated_at"] < CATALOG_TTL
+
+
+async def refresh_catalog(force: bool = False) -> dict:
+    """
+    Atualiza o índice local e o retorna.
+
+    As páginas do catálogo passam pelo cache HTTP, então páginas que não
+    mudaram são revalidadas (304) em vez de baixadas de novo. Surveys novos ou
+    alterados substituem as entradas do índice. Se uma página falhar, o
+    índice não é alterado (http_client.IncompletePages) e a próxima
+    atualização busca só as páginas que faltaram.
+    """
+    catalog = load_catalog()
+    if not force and is_fresh(catalog):
+        return catalog
+
+    async with http_client.session():
+        data = await async_main()
+
+    catalog["surveys"].update({str(survey["id"]): survey for survey in data})
+    catalog["updated_at"] = time.time()
+    save_catalog(catalog)
+    return catalog
+
+
+async def get_survey(survey_id):
+    """
+    Busca o survey no índice local, que é atualizado só quando está velho:
+    no máximo um download do catálogo por CATALOG_TTL, por mais ids
+    desconhecidos que sejam consultados.
+    """
+    catalog = await refresh_catalog()
+    return catalog["surveys"].get(str(survey_id))
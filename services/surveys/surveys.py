@@ -1,53 +1,91 @@
-import requests
 import os
 import pandas as pd
 
 import asyncio
 import aiohttp
 
-async def fetch(url, headers, page, session):
-    headers["page"] = str(page)
-    async with session.get(url, headers=headers) as response:
-        if response.status == 200:
-            return await response.json()
-        else:
-            print(f"Error fetching page {page}: {response.status}")
-            return None
-    
-async def fetch_all(url, headers, pages, session):
-    tasks = []
-    for page in range(1, pages + 1):
-        tasks.append(fetch(url, headers, page, session))
-    return await asyncio.gather(*tasks)
-
-async def get_pages(base_url, headers, session):
-    async with session.get(f"{base_url}surveys", headers=headers) as response:
-        headers = dict(response.headers)
-        pages = int(headers.get('total', '0')) // 100 + 1
-        return pages
-    
-async def async_main():
-    url = "https://api.qulture.rocks/rest/companies/8378/surveys"
-    headers = {
+import http_client
+import settings
+from schemas import SURVEYS, compact
+
+async def fetch(url, headers, page, session, params=None):
+    params = dict(params or {}, page=str(page))
+    response = await http_client.get_json(session, url, headers, params, schema=SURVEYS)
+    if response.status != 200:
+        print(f"Error fetching page {page}: {response.status}")
+    return response
+
+BASE_URL = f"{settings.QR_API_URL}/companies/{settings.COMPANY_ID}/"
+
+def request_headers():
+    return {
         "accept": "application/json",
         "Authorization": f"Bearer {os.getenv('QR_API_KEY')}",
-        "per_page": "100",
         "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36",
     }
-    
-    async with aiohttp.ClientSession() as session:
-        pages = await get_pages(url, headers, session)
-        responses = await fetch_all(url, headers, pages, session)
-        data = [item for response in responses if response for item in response['surveys']]
+
+async def async_main():
+    """
+    Busca o catálogo completo de surveys da empresa.
+    """
+    url = f"{BASE_URL}surveys"
+    headers = request_headers()
+    # Paginação via params (como em topics e answers), o que também compõe a chave do cache
+    params = {
+        "per_page": str(http_client.PER_PAGE),
+    }
+    journal = http_client.open_journal(url, params, SURVEYS.name)
+
+    async def fetch_page(page):
+        return await fetch(url, headers, page, session, params)
+
+    async with http_client.session() as session:
+        stream = http_client.paginate(fetch_page, http_client.header_total, journal=journal)
+        responses = await http_client.collect_pages(stream)
+        data = [item for response in responses for item in SURVEYS.records(response.data)]
 
     return data
 
-def main(survey_id):
-    data = asyncio.run(async_main())
+async def async_lookup(survey_id):
+    """
+    Busca um único survey direto em /surveys/{id}, sem baixar o catálogo.
+    Retorna uma lista no mesmo formato de async_main (vazia se não existir:
+    um 404 é definitivo). Só se o endpoint estiver fora do ar (erro de
+    conexão ou 5xx, depois dos retries) recorre ao índice local do catálogo;
+    outros erros são levantados (http_client.HTTPError).
+    """
+    url = f"{BASE_URL}surveys/{survey_id}"
+    async with http_client.session() as session:
+        try:
+            response = await http_client.get_json(session, url, request_headers())
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Error fetching survey {survey_id}: {e!r}, usando o catálogo")
+        else:
+            if response.status == 200:
+                return [response.data.get("survey", response.data)]
+            if response.status == 404:
+                return []
+            if response.status < 500:
+                response.raise_for_status()
+            print(f"Error fetching survey {survey_id}: {response.status}, usando o catálogo")
+
+        from .catalog import get_survey
+        survey = await get_survey(survey_id)
+    return [survey] if survey else []
+
+def to_dataframe(data, survey_id):
+    surveys_cols_to_keep = ['id', 'name', 'stage', 'settings', 'participants_count', 'draft']
+    if not data:
+        # Survey inexistente (async_lookup retorna []): frame vazio com as mesmas colunas
+        columns = [column for column in surveys_cols_to_keep if column != 'settings']
+        df = pd.DataFrame(columns=columns + ['start_at', 'end_at', 'grades_amount'])
+        df['start_at'] = pd.to_datetime(df['start_at'])
+        df['end_at'] = pd.to_datetime(df['end_at'])
+        return compact(df, SURVEYS.dtypes)
+
     df = pd.DataFrame(data)
 
     df = df[df["id"] == survey_id]
-    surveys_cols_to_keep = ['id', 'name', 'stage', 'settings', 'participants_count', 'draft']
     df = df[surveys_cols_to_keep]
 
     df['start_at'] = df['settings'].apply(lambda x: x.get('answer_period').get('start_at'))
@@ -61,7 +99,11 @@ def main(survey_id):
 
     df['start_at'] = df['start_at'].dt.tz_localize(None)
     df['end_at'] = df['end_at'].dt.tz_localize(None)
-    return df
+    return compact(df, SURVEYS.dtypes)
+
+def main(survey_id):
+    data = asyncio.run(async_lookup(survey_id))
+    return to_dataframe(data, survey_id)
 
 if __name__ == "__main__":
     survey_id = 102617
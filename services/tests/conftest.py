@@ -0,0 +1,15 @@
+import os
+import sys
+import tempfile
+
+# Os módulos de services/ são importados pelo nome (como em main.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Caches e diários em um diretório temporário, lidos pelos módulos na importação
+_TMP = tempfile.mkdtemp(prefix="qr-tests-")
+os.environ.setdefault("QR_HTTP_CACHE", "0")
+os.environ.setdefault("QR_CACHE_DIR", os.path.join(_TMP, "http"))
+os.environ.setdefault("QR_JOURNAL_DIR", os.path.join(_TMP, "journal"))
+os.environ.setdefault("QR_ANSWERS_STORE", os.path.join(_TMP, "answers"))
+os.environ.setdefault("QR_SURVEYS_CATALOG", os.path.join(_TMP, "surveys", "catalog.json"))
+os.environ.setdefault("QR_SESSION_CACHE", os.path.join(_TMP, "auth", "session.json"))
@@ -0,0 +1,21 @@
+import contextlib
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+
+@contextlib.asynccontextmanager
+async def serve(*routes, port: int = None):
+    """
+    Sobe um app aiohttp local com `routes` e retorna o TestServer
+    (server.make_url(path) dá a URL completa). Uma `port` fixa mantém a
+    mesma URL entre execuções (ex.: para retomar um diário).
+    """
+    app = web.Application()
+    app.add_routes(list(routes))
+    server = TestServer(app, host="127.0.0.1", port=port)
+    await server.start_server()
+    try:
+        yield server
+    finally:
+        await server.close()
@@ -0,0 +1,137 @@
+import asyncio
+import hashlib
+import json
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import unused_port
+
+import http_client
+import settings
+from answers import answers_async_main, answers_sync
+from answers import sync as sync_module
+
+from server import serve
+
+SURVEY_ID = 7
+
+
+def _answer(answer_id: int, comment: str = None) -> dict:
+    return {"id": answer_id, "grading": answer_id % 5 + 1, "question_id": 1, "comment": comment,
+            "participant_id": 1, "participant": {"survey_id": SURVEY_ID}}
+
+
+class AnswersAPI:
+    """
+    /answers paginado, com ETag por página e 304 para If-None-Match. As
+    páginas em `failing` respondem 404; `total_on_304=False` tira o total
+    dos 304.
+    """
+
+    def __init__(self, answers: list):
+        # Mesma URL (a chave do diário) em todas as buscas do teste
+        self.port = unused_port()
+        self.answers = answers
+        self.failing = set()
+        self.total_on_304 = True
+        self.statuses = []
+
+    async def handle(self, request):
+        per_page = int(request.query["per_page"])
+        page = int(request.query["page"])
+        if page in self.failing:
+            return web.json_response({"error": "Not Found"}, status=404)
+        body = json.dumps({"answers": self.answers[(page - 1) * per_page:page * per_page]})
+        etag = '"' + hashlib.sha256(body.encode()).hexdigest()[:16] + '"'
+        headers = {"total": str(len(self.answers)), "ETag": etag}
+        status = 304 if request.headers.get("If-None-Match") == etag else 200
+        self.statuses.append(status)
+        if status == 304:
+            if not self.total_on_304:
+                del headers["total"]
+            return web.Response(status=304, headers=headers)
+        return web.Response(body=body, content_type="application/json", headers=headers)
+
+
+@pytest.fixture
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(sync_module, "STORE_DIR", str(tmp_path / "answers"))
+    return tmp_path
+
+
+def _run(api: AnswersAPI, monkeypatch, fetch):
+    async def run():
+        path = f"/companies/{settings.COMPANY_ID}/surveys/{SURVEY_ID}/answers"
+        async with serve(web.get(path, api.handle), port=api.port) as server:
+            monkeypatch.setattr(settings, "QR_API_URL", str(server.make_url("")).rstrip("/"))
+            return await fetch()
+    return asyncio.run(run())
+
+
+def _sync_and_full(api: AnswersAPI, monkeypatch):
+    async def fetch():
+        api.statuses.clear()
+        synced = await answers_sync(SURVEY_ID)
+        statuses = list(api.statuses)
+        full = await answers_async_main(SURVEY_ID)
+        return synced, full, statuses
+    return _run(api, monkeypatch, fetch)
+
+
+def test_unchanged_pages_are_revalidated_not_downloaded(store_dir, monkeypatch):
+    api = AnswersAPI([_answer(i) for i in range(1, 251)])
+    synced, full, statuses = _sync_and_full(api, monkeypatch)
+    assert synced == full
+    assert statuses == [200, 200, 200]
+
+    synced, full, statuses = _sync_and_full(api, monkeypatch)
+    assert synced == full
+    assert statuses == [304, 304, 304]
+
+
+def test_edit_with_the_same_total_matches_a_full_fetch(store_dir, monkeypatch):
+    api = AnswersAPI([_answer(i) for i in range(1, 251)])
+    _sync_and_full(api, monkeypatch)
+
+    api.answers[10] = _answer(11, "editada")
+    synced, full, statuses = _sync_and_full(api, monkeypatch)
+    assert synced == full
+    assert synced[0]["answers"][10]["comment"] == "editada"
+    assert sorted(statuses) == [200, 304, 304]
+
+
+def test_delete_plus_add_with_the_same_total_matches_a_full_fetch(store_dir, monkeypatch):
+    api = AnswersAPI([_answer(i) for i in range(1, 251)])
+    _sync_and_full(api, monkeypatch)
+
+    del api.answers[0]
+    api.answers.append(_answer(999))
+    synced, full, _ = _sync_and_full(api, monkeypatch)
+    assert synced == full
+    assert [answer["id"] for page in synced for answer in page["answers"]][-1] == 999
+
+
+def test_total_comes_from_page_1_when_its_304_has_no_total(store_dir, monkeypatch):
+    api = AnswersAPI([_answer(i) for i in range(1, 251)])
+    _sync_and_full(api, monkeypatch)
+
+    api.total_on_304 = False
+    synced, full, statuses = _sync_and_full(api, monkeypatch)
+    assert synced == full
+    # A página 1 é baixada de novo para ler o total; as demais seguem em 304
+    assert statuses == [304, 200, 304, 304]
+
+
+def test_sync_revalidates_pages_left_in_the_journal(store_dir, monkeypatch):
+    api = AnswersAPI([_answer(i) for i in range(1, 251)])
+    _sync_and_full(api, monkeypatch)
+
+    # Uma busca completa interrompida deixa as páginas 1 e 2 no diário
+    api.failing = {3}
+    with pytest.raises(http_client.IncompletePages):
+        _run(api, monkeypatch, lambda: answers_async_main(SURVEY_ID))
+    api.failing = set()
+
+    api.answers[150] = _answer(151, "editada")
+    synced = _run(api, monkeypatch, lambda: answers_sync(SURVEY_ID))
+    assert synced[1]["answers"][50]["comment"] == "editada"
@@ -0,0 +1,82 @@
+import os
+import stat
+
+import pytest
+
+from participants import auth
+
+LOGIN_FORM = """
+<form action="/users/sign_in" method="post">
+  <input type="hidden" name="utf8" value="&#x2713;">
+  <input value='abc+/=' type=hidden name='authenticity_token'>
+  <INPUT NAME=commit TYPE=submit VALUE="Entrar">
+</form>
+"""
+
+
+@pytest.mark.parametrize("match, attr, value", [
+    ({"name": "utf8"}, "value", "✓"),
+    # Atributos em outra ordem e com aspas simples
+    ({"name": "authenticity_token"}, "value", "abc+/="),
+    # Sem aspas e com tag e atributos em maiúsculas
+    ({"type": "submit"}, "value", "Entrar"),
+    ({"name": "missing"}, "value", None),
+])
+def test_find_attr(match, attr, value):
+    assert auth.find_attr(LOGIN_FORM, "input", match, attr) == value
+
+
+class ChunkedResponse:
+    """
+    Corpo entregue em blocos, como requests.Response com stream=True.
+    """
+
+    def __init__(self, chunks: list):
+        self.chunks = chunks
+        self.encoding = "utf-8"
+        self.read = 0
+        self.closed = False
+
+    def iter_content(self, size):
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk.encode("utf-8")
+
+    def raise_for_status(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def test_csrf_meta_split_across_chunks():
+    page = '<html><head><meta name="csrf-token" content="tok/+=="><title>App</title></head><body>'
+    split = page.index("csrf-") + 3
+    response = ChunkedResponse([page[:split], page[split:], "<div>" * 1000, "</body></html>"])
+
+    text = auth._read_until(response, auth._CSRF_META)
+    # Para no bloco em que o meta termina e fecha a conexão
+    assert response.read == 2
+    assert response.closed
+    assert auth.find_attr(text, "meta", {"name": "csrf-token"}, "content") == "tok/+=="
+
+
+def test_missing_csrf_meta_raises():
+    class Session:
+        def get(self, url, stream=False):
+            return ChunkedResponse(["<html><head>", "</head><body></body></html>"])
+
+    with pytest.raises(RuntimeError):
+        auth.get_csfr_meta("https://app.example.com", Session())
+
+
+@pytest.mark.skipif(os.name == "nt", reason="permissões POSIX")
+def test_credentials_cache_is_private(tmp_path, monkeypatch):
+    monkeypatch.setattr(auth, "SESSION_PATH", str(tmp_path / "auth" / "session.json"))
+    monkeypatch.setenv("LOGIN", "user@example.com")
+    credentials = {"base_url": "https://app.example.com", "login": "user@example.com",
+                   "cookies": {"_session": "secret"}, "csrf": "tok", "expires": 2 ** 40}
+    auth.save_credentials(credentials)
+
+    assert stat.S_IMODE(os.stat(auth.SESSION_PATH).st_mode) == 0o600
+    assert auth.load_credentials("https://app.example.com") == credentials
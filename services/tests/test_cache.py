@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+import json
+import os
+
+import pytest
+from aiohttp import web
+
+import http_client
+import http_client.http_client as http_module
+from http_client import ResponseCache
+from http_client.cache import ttl_for
+
+from server import serve
+
+
+class ItemAPI:
+    """
+    Um recurso JSON com ETag; If-None-Match igual responde 304.
+    """
+
+    def __init__(self):
+        self.body = {"id": 1, "name": "Avaliação"}
+        self.conditional = []
+
+    def etag(self) -> str:
+        return '"' + hashlib.sha256(json.dumps(self.body).encode()).hexdigest()[:16] + '"'
+
+    async def handle(self, request):
+        self.conditional.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == self.etag():
+            return web.Response(status=304, headers={"ETag": self.etag()})
+        return web.json_response(self.body, headers={"ETag": self.etag()})
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path))
+    monkeypatch.setattr(http_module, "CACHE_ENABLED", True)
+    monkeypatch.setattr(http_module, "_cache", cache)
+    return cache
+
+
+def _get(api: ItemAPI, path: str, times: int = 1, before_each=None) -> list:
+    """
+    `times` GETs de `path` com get_json; `before_each(url)` roda antes de cada um.
+    """
+    async def run():
+        async with serve(web.get(path, api.handle)) as server, http_client.session() as session:
+            url = str(server.make_url(path))
+            responses = []
+            for _ in range(times):
+                if before_each is not None:
+                    before_each(url)
+                responses.append(await http_client.get_json(session, url))
+            return responses
+    return asyncio.run(run())
+
+
+def _expire(cache: ResponseCache):
+    def expire(url):
+        key = cache.key(url)
+        entry = cache.get(key)
+        if entry is not None:
+            entry["stored_at"] -= 2 * 60 * 60
+            cache.put(key, entry)
+    return expire
+
+
+def test_fresh_entry_is_served_without_a_request(cache):
+    api = ItemAPI()
+    first, second = _get(api, "/surveys/1", times=2)
+    assert api.conditional == [None]
+    assert not first.from_cache
+    assert second.from_cache
+    assert second.data == first.data
+
+
+def test_expired_entry_is_revalidated_and_a_304_serves_the_cached_body(cache):
+    api = ItemAPI()
+    first, second = _get(api, "/surveys/1", times=2, before_each=_expire(cache))
+    assert api.conditional == [None, api.etag()]
+    assert second.status == 200
+    assert second.from_cache
+    assert second.data == first.data
+
+
+def test_expired_entry_with_a_new_body_is_replaced(cache):
+    api = ItemAPI()
+    expire = _expire(cache)
+
+    def change_then_expire(url):
+        if api.conditional:
+            api.body = {"id": 1, "name": "Renomeada"}
+        expire(url)
+
+    _, second = _get(api, "/surveys/1", times=2, before_each=change_then_expire)
+    assert api.conditional[1] is not None
+    assert not second.from_cache
+    assert second.data["name"] == "Renomeada"
+    assert cache.get(cache.key(second.url))["data"]["name"] == "Renomeada"
+
+
+def test_urls_without_ttl_are_never_stored(cache, tmp_path):
+    api = ItemAPI()
+    first, second = _get(api, "/other/1", times=2)
+    assert ttl_for(first.url) == 0
+    assert api.conditional == [None, None]
+    assert not second.from_cache
+    assert os.listdir(tmp_path) == []
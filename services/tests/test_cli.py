@@ -0,0 +1,20 @@
+import pytest
+
+import cli
+
+
+def test_output_without_survey_id_is_rejected_for_several_reports(capsys):
+    with pytest.raises(SystemExit) as error:
+        cli.parse_args(["report", "1", "2", "--output", "relatorio"])
+    assert error.value.code == 2
+    assert "{survey_id}" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("argv", [
+    ["report", "1", "2", "--output", "relatorio-{survey_id}"],
+    ["report", "1", "2", "--output", "relatorio", "--combined"],
+    ["report", "1", "--output", "relatorio"],
+    ["report", "1", "2"],
+])
+def test_report_outputs_that_do_not_collide(argv):
+    assert cli.parse_args(argv).survey_ids
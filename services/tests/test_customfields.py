@@ -0,0 +1,63 @@
+import asyncio
+
+import pandas as pd
+
+from factorial import factorial_customfields
+from factorial.factorial_customfields import custom_fields
+from report import merge_employees
+
+FIELDS = {'teamleader_value': 1, 'coordenador_value': 2, 'heads_value': 3}
+
+VALUES = {
+    1: pd.DataFrame({'value': ['TL 1', 'TL 2'], 'valuable_id': [10, 11]}),
+    2: pd.DataFrame({'value': ['Coord 2', 'Coord 3'], 'valuable_id': [11, 12]}),
+    3: pd.DataFrame({'value': ['head1@x'], 'valuable_id': [10]}),
+}
+
+
+def _custom_fields(monkeypatch, values: dict) -> pd.DataFrame:
+    async def field_values(field_id):
+        return values[field_id]
+    monkeypatch.setattr(factorial_customfields, "field_values", field_values)
+    return asyncio.run(custom_fields(FIELDS))
+
+
+def test_wide_table_is_keyed_by_valuable_id(monkeypatch):
+    wide = _custom_fields(monkeypatch, VALUES)
+
+    assert list(wide.columns) == ['valuable_id', *FIELDS]
+    assert sorted(wide['valuable_id']) == [10, 11, 12]
+    row = wide.set_index('valuable_id').loc[11]
+    assert row.tolist()[:2] == ['TL 2', 'Coord 2']
+    assert pd.isna(row['heads_value'])
+
+
+def test_last_value_per_employee_wins(monkeypatch):
+    values = {**VALUES, 3: pd.DataFrame({'value': ['antigo@x', 'novo@x'], 'valuable_id': [10, 10]})}
+    wide = _custom_fields(monkeypatch, values)
+    assert len(wide) == 3
+    assert wide.set_index('valuable_id').loc[10, 'heads_value'] == 'novo@x'
+
+
+def test_field_without_values_gives_an_empty_column(monkeypatch):
+    values = {**VALUES, 3: pd.DataFrame({'value': [], 'valuable_id': []})}
+    wide = _custom_fields(monkeypatch, values)
+    assert list(wide.columns) == ['valuable_id', *FIELDS]
+    assert wide['heads_value'].isna().all()
+
+
+def test_employees_merge_matches_one_join_per_field(monkeypatch):
+    wide = _custom_fields(monkeypatch, VALUES)
+    employees = pd.DataFrame({'employees_id': [10, 11, 12, 13], 'employees_email': ['a@x', 'b@x', 'c@x', 'd@x']})
+    participants = pd.DataFrame({'participants_id': [1, 2, 3], 'participants_email': ['a@x', 'b@x', 'c@x']})
+    df = merge_employees(employees, participants, wide)
+
+    # Antes: um merge por custom field, cada um com seu <prefixo>valuable_id
+    baseline = pd.merge(employees, participants, left_on='employees_email', right_on='participants_email', how='left')
+    for column, field_id in FIELDS.items():
+        prefix = column[:-len('value')]
+        field = VALUES[field_id].add_prefix(prefix)
+        baseline = pd.merge(baseline, field, left_on='employees_id', right_on=f'{prefix}valuable_id', how='left')
+
+    assert len(df) == len(baseline) == len(employees)
+    pd.testing.assert_frame_equal(df[list(FIELDS)], baseline[list(FIELDS)])
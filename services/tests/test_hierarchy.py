@@ -0,0 +1,41 @@
+import pandas as pd
+
+from factorial.hierarchy import Hierarchy, direct_manager, leaders_table
+
+
+def _employees(ids, managers):
+    return pd.DataFrame({
+        'id': pd.array(ids, dtype='Int32'),
+        'manager_id': pd.array(managers, dtype='Int32'),
+        'email': [f'{i}@x' for i in range(len(ids))],
+    })
+
+
+def test_hierarchy_levels_and_subtrees():
+    # 1 -> (2 -> (4, 5), 3)
+    df = _employees([1, 2, 3, 4, 5], [None, 1, 1, 2, 2])
+    hierarchy = Hierarchy.from_frame(df)
+    assert hierarchy.depths().tolist() == [0, 1, 1, 2, 2]
+    assert hierarchy.chain(5) == [1, 2, 5]
+    assert sorted(hierarchy.reports(1)) == [2, 3, 4, 5]
+    assert hierarchy.reports(2, direct=True) == [4, 5]
+    assert hierarchy.is_under(2).tolist() == [False, False, False, True, True]
+    assert hierarchy.leader_at(1, df['email']).tolist()[1:] == ['1@x', '2@x', '1@x', '1@x']
+
+
+def test_direct_manager_survives_cycles_like_the_self_merge():
+    df = _employees([1, 2, 3], [2, 1, None])
+    assert direct_manager(df['id'], df['manager_id'], df['email']).tolist()[:2] == ['1@x', '0@x']
+
+
+def test_cycle_is_broken_instead_of_raising():
+    df = _employees([1, 2, 3], [2, 1, 2])
+    hierarchy = Hierarchy.from_frame(df)
+    assert (hierarchy.parent >= 0).sum() == 2
+    assert hierarchy.chain(3)[-1] == 3
+
+
+def test_duplicate_ids_keep_the_first_row():
+    df = _employees([1, 2, 2], [None, 1, 1])
+    table = leaders_table(df, {'head': (0, 'email')})
+    assert table['head'].tolist() == ['0@x', '0@x', '0@x']
@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+import http_client
+from http_client.decoding import DECODE_ERRORS
+from http_client.limiter import limiter_for
+
+from server import serve
+
+
+async def _slow(request):
+    await asyncio.sleep(30)
+    return web.json_response({})
+
+
+async def _html(request):
+    # Como o app quando a sessão expira: 200 com a página de login
+    return web.Response(text="<html>login</html>", content_type="text/html")
+
+
+def test_cancelled_requests_release_their_slots():
+    async def run():
+        async with serve(web.get("/slow", _slow)) as server, http_client.session() as session:
+            url = str(server.make_url("/slow"))
+            tasks = [asyncio.ensure_future(http_client.request_json(session, "GET", url)) for _ in range(5)]
+            await asyncio.sleep(0.2)
+            limiter = limiter_for(server.host)
+            assert limiter.in_flight == 5
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            return limiter.in_flight
+
+    assert asyncio.run(run()) == 0
+
+
+def test_non_json_200_releases_its_slot():
+    async def run():
+        async with serve(web.get("/login", _html)) as server, http_client.session() as session:
+            with pytest.raises(DECODE_ERRORS):
+                await http_client.request_json(session, "GET", str(server.make_url("/login")))
+            return limiter_for(server.host).in_flight
+
+    assert asyncio.run(run()) == 0
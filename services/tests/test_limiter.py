@@ -0,0 +1,53 @@
+import asyncio
+
+from http_client.limiter import HostLimiter
+
+
+def test_burst_of_429s_halves_the_limit_once():
+    async def run():
+        limiter = HostLimiter(initial=8, rate=0)
+        for _ in range(8):
+            await limiter.acquire()
+        await asyncio.sleep(0.05)
+        # Todas enviadas antes do primeiro corte: uma janela só
+        for _ in range(8):
+            limiter.release(429, latency=0.05)
+        return limiter.limit, limiter.in_flight
+
+    assert asyncio.run(run()) == (4, 0)
+
+
+def test_error_after_the_cut_halves_again():
+    async def run():
+        limiter = HostLimiter(initial=8, rate=0)
+        await limiter.acquire()
+        limiter.release(503, latency=0.01)
+        await asyncio.sleep(0.05)
+        await limiter.acquire()
+        limiter.release(503, latency=0.01)
+        return limiter.limit
+
+    assert asyncio.run(run()) == 2
+
+
+def test_stats_flags_slots_held_by_finished_tasks():
+    async def run():
+        limiter = HostLimiter(initial=2, rate=0)
+        # Tarefas que terminam sem devolver o slot (o vazamento que trava o host)
+        await asyncio.gather(limiter.acquire(), limiter.acquire())
+        return limiter.stats()
+
+    stats = asyncio.run(run())
+    assert stats["stuck"] == 2
+    assert stats["stalled"]
+
+
+def test_stats_with_requests_running_is_not_stalled():
+    async def run():
+        limiter = HostLimiter(initial=1, rate=0)
+        await limiter.acquire()
+        return limiter.stats()
+
+    stats = asyncio.run(run())
+    assert stats["stuck"] == 0
+    assert not stats["stalled"]
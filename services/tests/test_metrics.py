@@ -0,0 +1,36 @@
+from metrics import Metrics
+from metrics import metrics as metrics_module
+
+
+def _value(text: str, prefix: str) -> float:
+    return sum(float(line.rsplit(" ", 1)[1]) for line in text.splitlines() if line.startswith(prefix))
+
+
+def test_counters_keep_growing_past_the_request_buffer(monkeypatch):
+    monkeypatch.setattr(metrics_module, "MAX_REQUESTS", 3)
+    registry = Metrics()
+    seen = []
+    for survey_id in range(10):
+        registry.record_request("GET", f"https://api.example.com/surveys/{survey_id}/answers", 200, 0.5, 100)
+        seen.append(_value(registry.prometheus_text(), "qr_http_requests_total{"))
+
+    assert len(registry.requests) == 3
+    assert seen == list(range(1, 11))
+    text = registry.prometheus_text()
+    assert _value(text, "qr_http_response_bytes_total{") == 1000
+    assert registry.endpoints()[0]["requests"] == 10
+
+
+def test_stage_labels_do_not_grow_with_surveys(monkeypatch):
+    monkeypatch.setattr(metrics_module, "MAX_STAGES", 4)
+    registry = Metrics()
+    for survey_id in range(100, 110):
+        registry.add_time(f"flatten:answers:{survey_id}", "flatten", 0.0, 1.0)
+        registry.add_time(f"report:{survey_id}", "aggregate", 1.0, 3.0)
+
+    assert len(registry.stages) == 4
+    lines = [line for line in registry.prometheus_text().splitlines() if line.startswith("qr_stage_seconds_total{")]
+    assert lines == [
+        'qr_stage_seconds_total{stage="flatten:answers:id",kind="flatten"} 10.0',
+        'qr_stage_seconds_total{stage="report:id",kind="aggregate"} 20.0',
+    ]
@@ -0,0 +1,171 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import unused_port
+
+import http_client
+from http_client import IncompletePages, PageJournal, page_count
+
+from server import serve
+
+
+class ItemsAPI:
+    """
+    Itens paginados com o total no header; as páginas em `failing`
+    respondem 404 (sem retry no http_client).
+    """
+
+    def __init__(self, total: int, per_page: int = 10):
+        # Mesma porta (e URL, a chave do diário) em todas as buscas do teste
+        self.port = unused_port()
+        self.total = total
+        self.per_page = per_page
+        self.failing = set()
+        self.requested = []
+
+    async def handle(self, request):
+        page = int(request.query["page"])
+        self.requested.append(page)
+        if page in self.failing:
+            return web.json_response({"error": "Not Found"}, status=404)
+        start = (page - 1) * self.per_page
+        items = list(range(start, min(start + self.per_page, self.total)))
+        return web.json_response({"items": items}, headers={"total": str(self.total)})
+
+
+def _fetch_all(api: ItemsAPI, journal_dir):
+    """
+    Busca todas as páginas com o diário em `journal_dir`; retorna os itens
+    na ordem (ou a IncompletePages levantada) e as páginas pedidas.
+    """
+    async def run():
+        async with serve(web.get("/items", api.handle), port=api.port) as server, http_client.session() as session:
+            url = str(server.make_url("/items"))
+            journal = PageJournal(url, directory=str(journal_dir))
+
+            async def fetch(page):
+                return await http_client.get_json(session, url, params={"page": page}, ttl=0)
+
+            api.requested.clear()
+            try:
+                stream = http_client.paginate(fetch, http_client.header_total, per_page=api.per_page, journal=journal)
+                responses = await http_client.collect_pages(stream)
+            except IncompletePages as e:
+                return e, sorted(api.requested)
+            return [item for response in responses for item in response.data["items"]], sorted(api.requested)
+    return asyncio.run(run())
+
+
+def test_missing_pages_are_reported_exactly(tmp_path):
+    api = ItemsAPI(total=95)
+    api.failing = {3, 7}
+    error, _ = _fetch_all(api, tmp_path)
+    assert isinstance(error, IncompletePages)
+    assert error.missing == [3, 7]
+    assert error.pages == 10
+
+
+def test_failed_pages_are_resumed_from_the_journal(tmp_path):
+    api = ItemsAPI(total=95)
+    api.failing = {3, 7}
+    _fetch_all(api, tmp_path)
+
+    api.failing = set()
+    items, requested = _fetch_all(api, tmp_path)
+    # Só a página 1 (que confere o total) e as que faltaram
+    assert requested == [1, 3, 7]
+    assert items == list(range(95))
+    # Busca completa: o diário é apagado (fica só o arquivo de trava)
+    assert not any(path.is_dir() for path in tmp_path.iterdir())
+
+
+def test_journal_is_discarded_when_the_total_changes(tmp_path):
+    api = ItemsAPI(total=95)
+    api.failing = {3}
+    _fetch_all(api, tmp_path)
+
+    api.failing = set()
+    api.total = 105
+    items, requested = _fetch_all(api, tmp_path)
+    assert requested == list(range(1, 12))
+    assert items == list(range(105))
+
+
+def test_first_page_failure_is_reported(tmp_path):
+    api = ItemsAPI(total=95)
+    api.failing = {1}
+    error, requested = _fetch_all(api, tmp_path)
+    assert error.missing == [1]
+    assert requested == [1]
+
+
+def test_journal_in_use_is_not_shared(tmp_path):
+    url = "http://example.com/items"
+    page = http_client.Response(200, url, {"total": "95"}, {"items": [10]})
+    first = PageJournal(url, directory=str(tmp_path))
+    assert first.start(95) == set()
+    first.put(2, page)
+
+    # Mesma URL enquanto a primeira busca está aberta: segue sem diário
+    second = PageJournal(url, directory=str(tmp_path))
+    assert second.start(95) == set()
+    second.put(3, page)
+    second.clear()
+    second.close()
+    assert first.pages() == {2}
+
+    first.close()
+    third = PageJournal(url, directory=str(tmp_path))
+    assert third.start(95) == {2}
+    third.close()
+
+
+def test_concurrent_fetches_of_the_same_url(tmp_path):
+    api = ItemsAPI(total=95)
+
+    async def handle(request):
+        # A busca "slow" perde a página 3
+        if request.headers.get("x-run") == "slow" and request.query["page"] == "3":
+            return web.json_response({"error": "Not Found"}, status=404)
+        return await api.handle(request)
+
+    async def run():
+        async with serve(web.get("/items", handle), port=api.port) as server, http_client.session() as session:
+            url = str(server.make_url("/items"))
+
+            fast_done = asyncio.Event()
+
+            async def fetch_all(run):
+                journal = PageJournal(url, directory=str(tmp_path))
+
+                async def fetch(page):
+                    # A busca "slow" segura o diário até a outra terminar
+                    if run == "slow" and page > 1:
+                        await fast_done.wait()
+                    return await http_client.get_json(session, url, headers={"x-run": run}, params={"page": page}, ttl=0)
+
+                stream = http_client.paginate(fetch, http_client.header_total, per_page=api.per_page, journal=journal)
+                responses = await http_client.collect_pages(stream)
+                return [item for response in responses for item in response.data["items"]]
+
+            slow = asyncio.create_task(fetch_all("slow"))
+            await asyncio.sleep(0.05)
+            fast = await fetch_all("fast")
+            fast_done.set()
+            with pytest.raises(IncompletePages) as error:
+                await slow
+            return fast, error.value
+    fast, error = asyncio.run(run())
+    assert fast == list(range(95))
+    assert error.missing == [3]
+
+    # O diário da busca que falhou ficou intacto: só a 1 e a 3 são pedidas
+    items, requested = _fetch_all(api, tmp_path)
+    assert requested == [1, 3]
+    assert items == list(range(95))
+
+
+@pytest.mark.parametrize("total, pages", [(0, 0), (1, 1), (99, 1), (100, 1), (101, 2), (200, 2), (1000, 10)])
+def test_page_count(total, pages):
+    assert page_count(total, 100) == pages
@@ -0,0 +1,116 @@
+import pandas as pd
+
+from report import REPORT_COLUMNS, merge_employees, merge_report
+from report.report import LEADER_COLUMNS
+
+
+def _sources():
+    answers = pd.DataFrame({
+        'answers_id': [1, 2, 3, 4, 5],
+        'answers_survey_id': [7, 7, 7, 7, 7],
+        'answers_question_id': [100, 101, 100, 101, 100],
+        'answers_reviewee_id': [1, 1, 2, 3, 3],
+        'answers_grading': [5, 4, 3, 2, 1],
+        'answers_comment': ['ótimo', None, 'ok', None, 'melhorar'],
+        'answers_relationship': ['self', 'manager', 'peer', 'self', 'peer'],
+        'answers_reviewer_name': ['Ana', 'Bia', 'Caio', 'Davi', 'Eva'],
+        'answers_question_type': ['scale'] * 5,
+    })
+    surveys = pd.DataFrame({
+        'surveys_id': [7], 'surveys_name': ['Ciclo 2025'], 'surveys_start_at': ['2025-01-01'],
+        'surveys_end_at': ['2025-02-01'], 'surveys_stage': ['closed'],
+    })
+    topics = pd.DataFrame({
+        'topics_question_id': [100, 101], 'topics_question_name': ['Comunicação', 'Entrega'],
+        'topics_topic_name': ['Comportamento', 'Resultado'],
+    })
+    participants = pd.DataFrame({
+        'participants_id': [1, 2, 3],
+        'participants_name': ['Ana', 'Bia', 'Caio'],
+        'participants_email': ['ana@x', 'bia@x', 'caio@x'],
+        'participants_supervisor_name': ['Líder', 'Líder', 'Ana'],
+        'participants_supervisor_email': ['lider@x', 'lider@x', 'ana@x'],
+        'participants_department': ['A', 'A', 'B'],
+    })
+    employees = pd.DataFrame({
+        'employees_id': [10, 11, 12],
+        'employees_email': ['ana@x', 'bia@x', 'caio@x'],
+        'employees_full_name': ['Ana', 'Bia', 'Caio'],
+    })
+    leaders = pd.DataFrame({
+        'valuable_id': [10, 11],
+        'teamleader_value': ['TL 1', 'TL 2'],
+        'coordenador_value': ['Coord 1', 'Coord 2'],
+        'heads_value': ['head1@x', 'head2@x'],
+    })
+    return answers, surveys, topics, participants, employees, leaders
+
+
+def _baseline(answers, surveys, topics, participants, employees, leaders):
+    """
+    Os merges de antes da projeção: um custom field por join e participants
+    unido duas vezes (colunas _x/_y).
+    """
+    df = pd.merge(employees, participants, left_on='employees_email', right_on='participants_email', how='left')
+    for column in LEADER_COLUMNS:
+        prefix = column[:-len('value')]
+        field = leaders[['valuable_id', column]].rename(columns={'valuable_id': f'{prefix}valuable_id'})
+        df = pd.merge(df, field, left_on='employees_id', right_on=f'{prefix}valuable_id', how='left')
+
+    merged = pd.merge(answers, surveys, left_on='answers_survey_id', right_on='surveys_id', how='left')
+    merged = pd.merge(merged, topics, left_on='answers_question_id', right_on='topics_question_id', how='left')
+    merged = pd.merge(merged, participants, left_on='answers_reviewee_id', right_on='participants_id', how='left')
+    merged = pd.merge(merged, df, on='participants_id', how='left')
+    # Como no rename de antes: as colunas de participants vinham com _x
+    columns = {f'{column}_x' if f'{column}_x' in merged else column: name for column, name in REPORT_COLUMNS.items()}
+    return merged[list(columns)].rename(columns=columns)
+
+
+def test_report_matches_the_baseline_merge():
+    answers, surveys, topics, participants, employees, leaders = _sources()
+    report = merge_report(answers, surveys, topics, participants, merge_employees(employees, participants, leaders))
+
+    assert list(report.columns) == list(REPORT_COLUMNS.values())
+    assert len(report) == len(answers)
+    pd.testing.assert_frame_equal(report, _baseline(answers, surveys, topics, participants, employees, leaders),
+                                  check_dtype=False)
+
+
+def test_employees_merge_is_projected():
+    _, _, _, participants, employees, leaders = _sources()
+    df = merge_employees(employees, participants, leaders)
+
+    assert list(df.columns) == [*employees.columns, 'participants_id', 'participants_email', *LEADER_COLUMNS]
+    assert df['participants_id'].tolist() == [1, 2, 3]
+    # Colaborador sem custom field: líderes vazios
+    assert df[LEADER_COLUMNS].iloc[2].isna().all()
+
+
+def test_leaders_are_deduplicated_by_participant():
+    answers, surveys, topics, participants, employees, leaders = _sources()
+    # Dois cadastros no Factorial com o e-mail da Ana: fica o último
+    employees = pd.concat([employees, pd.DataFrame({
+        'employees_id': [13], 'employees_email': ['ana@x'], 'employees_full_name': ['Ana (2)'],
+    })], ignore_index=True)
+    leaders = pd.concat([leaders, pd.DataFrame({
+        'valuable_id': [13], 'teamleader_value': ['TL 3'], 'coordenador_value': ['Coord 3'], 'heads_value': ['head3@x'],
+    })], ignore_index=True)
+
+    report = merge_report(answers, surveys, topics, participants, merge_employees(employees, participants, leaders))
+    assert len(report) == len(answers)
+    assert report.loc[report['Nome do Avaliado'] == 'Ana', 'Nome do Team Leader'].tolist() == ['TL 3', 'TL 3']
+
+
+def test_employees_without_participant_do_not_match_unknown_reviewees():
+    answers, surveys, topics, participants, employees, leaders = _sources()
+    answers.loc[4, 'answers_reviewee_id'] = 99
+    employees = pd.concat([employees, pd.DataFrame({
+        'employees_id': [14], 'employees_email': ['sem-avaliacao@x'], 'employees_full_name': ['Zé'],
+    })], ignore_index=True)
+    leaders = pd.concat([leaders, pd.DataFrame({
+        'valuable_id': [14], 'teamleader_value': ['TL Zé'], 'coordenador_value': ['Coord Zé'], 'heads_value': ['ze@x'],
+    })], ignore_index=True)
+
+    report = merge_report(answers, surveys, topics, participants, merge_employees(employees, participants, leaders))
+    assert len(report) == len(answers)
+    assert report.iloc[4][['Nome do Avaliado', 'Nome do Team Leader']].isna().all()
@@ -0,0 +1,18 @@
+import pandas as pd
+
+from report.summary import GRADE, SURVEY, summarize
+
+
+def test_fractional_grades_stay_out_of_the_distribution():
+    report = pd.DataFrame({
+        SURVEY: ['S'] * 5,
+        'Competência': ['A'] * 5,
+        GRADE: [3, 3.5, 4, None, 'sem nota'],
+    })
+    row = summarize(report, ['Competência'], grades_amount=5).iloc[0]
+    assert row['Respostas'] == 5
+    assert row['Com nota'] == 3
+    assert row['Média'] == 3.5
+    assert row['Nota 3'] == 1
+    assert row['Nota 4'] == 1
+    assert [row[f'Nota {grade}'] for grade in (1, 2, 5)] == [0, 0, 0]
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+import http_client.http_client as http_module
+import settings
+from surveys import catalog, surveys_async_lookup, surveys_to_dataframe
+from surveys import surveys as surveys_module
+
+from server import serve
+
+
+def test_unknown_survey_gives_an_empty_frame_with_the_columns():
+    df = surveys_to_dataframe([], 999)
+    assert df.empty
+    assert list(df.columns) == ['id', 'name', 'stage', 'participants_count', 'draft',
+                                'start_at', 'end_at', 'grades_amount']
+
+
+def test_survey_is_filtered_by_id():
+    survey = {
+        'id': 1, 'name': 'Avaliação', 'stage': 'closed', 'participants_count': 3, 'draft': False,
+        'settings': {'answer_period': {'start_at': '2025-01-01T00:00:00Z', 'end_at': '2025-02-01T00:00:00Z'},
+                     'grades_amount': 5},
+    }
+    df = surveys_to_dataframe([survey, dict(survey, id=2)], 1)
+    assert df['id'].tolist() == [1]
+    assert df['grades_amount'].tolist() == [5]
+
+
+class SurveysAPI:
+    def __init__(self, status: int):
+        self.status = status
+        self.catalog_requests = 0
+
+    async def survey(self, request):
+        return web.json_response({"error": "x"}, status=self.status)
+
+    async def catalog(self, request):
+        self.catalog_requests += 1
+        return web.json_response({"surveys": [{"id": 5, "name": "Cinco"}]}, headers={"total": "1"})
+
+
+@pytest.fixture
+def api_setup(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog, "CATALOG_PATH", str(tmp_path / "catalog.json"))
+    # 5xx sem espera entre os retries
+    monkeypatch.setattr(http_module, "BACKOFF_BASE", 0)
+
+    def lookup(api, *survey_ids):
+        async def run():
+            rest = f"/companies/{settings.COMPANY_ID}/surveys"
+            async with serve(web.get(rest, api.catalog), web.get(rest + "/{survey_id}", api.survey)) as server:
+                base = str(server.make_url(f"/companies/{settings.COMPANY_ID}/"))
+                monkeypatch.setattr(surveys_module, "BASE_URL", base)
+                return [await surveys_async_lookup(survey_id) for survey_id in survey_ids]
+        return asyncio.run(run())
+    return lookup
+
+
+def test_404_is_authoritative_and_skips_the_catalog(api_setup):
+    api = SurveysAPI(404)
+    assert api_setup(api, 999) == [[]]
+    assert api.catalog_requests == 0
+
+
+def test_5xx_falls_back_to_the_catalog_once_per_window(api_setup):
+    api = SurveysAPI(503)
+    results = api_setup(api, 5, 998, 999)
+    assert results == [[{"id": 5, "name": "Cinco"}], [], []]
+    # Ids desconhecidos não baixam o catálogo de novo enquanto ele está fresco
+    assert api.catalog_requests == 1
@@ -0,0 +1,73 @@
+import asyncio
+
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+import writers
+from writers import executor
+from writers import writers as writers_module
+
+
+def _frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "id": range(rows),
+        "nome": [f"pessoa {i}" for i in range(rows)],
+        "nota": [i / 2 if i % 3 else None for i in range(rows)],
+    })
+
+
+def _sheets(path: str) -> dict:
+    """
+    {planilha: linhas sem o cabeçalho}, conferindo o cabeçalho de cada uma.
+    """
+    workbook = load_workbook(path, read_only=True)
+    sheets = {}
+    for sheet in workbook.worksheets:
+        rows = list(sheet.iter_rows(values_only=True))
+        assert rows[0] == ("id", "nome", "nota")
+        # Células vazias no fim da linha não são lidas
+        sheets[sheet.title] = [row + (None,) * (3 - len(row)) for row in rows[1:]]
+    workbook.close()
+    return sheets
+
+
+@pytest.fixture
+def small_sheets(monkeypatch):
+    # Os processos de escrita (spawn) leem o limite do ambiente ao importar
+    monkeypatch.setenv("QR_EXCEL_MAX_ROWS", "4")
+    monkeypatch.setattr(writers_module, "EXCEL_MAX_ROWS", 4)
+    executor.shutdown()
+    executor.start(1)
+    yield
+    executor.shutdown()
+
+
+def test_excel_overflow_through_the_process_pool(tmp_path, small_sheets):
+    df = _frame(10)
+    path = asyncio.run(executor.write_async(df, str(tmp_path / "report")))
+
+    sheets = _sheets(path)
+    assert list(sheets) == ["Sheet1", "Sheet2", "Sheet3"]
+    assert [len(rows) for rows in sheets.values()] == [4, 4, 2]
+    assert [row[0] for rows in sheets.values() for row in rows] == list(range(10))
+    # NaN vira célula vazia
+    assert [row[2] for row in sheets["Sheet1"]] == [None, 0.5, 1.0, None]
+
+
+def test_excel_tables_overflow_through_the_process_pool(tmp_path, small_sheets):
+    frames = {"respostas": _frame(6), "resumo": _frame(2)}
+    [path] = asyncio.run(executor.write_tables_async(frames, str(tmp_path / "report")))
+
+    sheets = _sheets(path)
+    assert {name: len(rows) for name, rows in sheets.items()} == {"respostas": 4, "respostas2": 2, "resumo": 2}
+
+
+@pytest.mark.parametrize("fmt, read", [("csv", pd.read_csv), ("parquet", pd.read_parquet)])
+def test_round_trip(tmp_path, fmt, read):
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    df = _frame(10)
+    path = writers.write(df, str(tmp_path / "report.xlsx"), fmt)
+    assert path.endswith(f".{fmt}")
+    pd.testing.assert_frame_equal(read(path), df)
@@ -1,5 +1,11 @@
 from .topics import main as topics_main
+from .topics import async_main as topics_async_main
+from .topics import async_dataframe as topics_async_dataframe
+from .topics import to_dataframe as topics_to_dataframe
 
 __all__ = [
     "topics_main",
-]
\ No newline at end of file
+    "topics_async_main",
+    "topics_async_dataframe",
+    "topics_to_dataframe",
+]
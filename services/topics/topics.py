@@ -3,88 +3,109 @@ import pandas as pd
 import asyncio
 import aiohttp
 
-async def fetch(url: str, headers: dict, page: int, session: aiohttp.ClientSession, params: dict = None):
+import http_client
+from metrics import registry as metrics
+import settings
+from flatten import ColumnBuffer
+from schemas import TOPICS
+
+async def fetch(url: str, headers: dict, page: int, session: aiohttp.ClientSession, params: dict = None) -> http_client.Response:
     """
     Busca a página `page` do endpoint `url`.
-    Retorna o JSON ou None em caso de erro.
+    Retorna a resposta (com o JSON em `data` quando o status é 200).
     """
-    # Evita mutação de headers compartilhado
-    request_headers = headers.copy()
     # Passa página via params em vez de headers
     request_params = params.copy() if params else {}
     request_params['page'] = str(page)
 
-    async with session.get(url, headers=request_headers, params=request_params) as response:
-        if response.status == 200:
-            return await response.json()
-        else:
-            print(f"Error fetching page {page}: {response.status}")
-            return None
+    response = await http_client.get_json(session, url, headers, request_params, schema=TOPICS)
+    if response.status != 200:
+        print(f"Error fetching page {page}: {response.status}")
+    return response
 
-async def fetch_all(url: str, headers: dict, pages: int, session: aiohttp.ClientSession, params: dict = None):
-    """
-    Dispara requisições para todas as páginas de 1 a `pages` e retorna lista de JSONs.
-    """
-    tasks = [fetch(url, headers, page, session, params) for page in range(1, pages + 1)]
-    return await asyncio.gather(*tasks)
+def topics_url(survey_id: int) -> str:
+    return f"{settings.QR_API_URL}/companies/{settings.COMPANY_ID}/surveys/{survey_id}/topics"
 
-async def get_pages(base_url: str, headers: dict, session: aiohttp.ClientSession, params: dict = None) -> int:
-    """
-    Obtém número total de páginas a partir do header 'total'.
-    """
-    async with session.get(base_url, headers=headers, params=params) as response:
-        total = int(response.headers.get('total', '0'))
-        # Cada página tem até 100 itens
-        return total // 100 + (1 if total % 100 else 0)
-
-async def async_main(survey_id: int):
-    """
-    Executa o fluxo completo para um único survey_id.
-    Retorna uma lista de JSONs por página.
-    """
-    url = f"https://api.qulture.rocks/rest/companies/8378/surveys/{survey_id}/topics"
-    params = {
+def topics_params() -> dict:
+    return {
         "include": "questions,question_topic",
-        "per_page": "100",
+        "per_page": str(http_client.PER_PAGE),
     }
-    headers = {
+
+def request_headers() -> dict:
+    return {
         "accept": "application/json",
         "Authorization": f"Bearer {os.getenv('QR_API_KEY')}",
         "user-agent": "Mozilla/5.0",
     }
 
-    async with aiohttp.ClientSession() as session:
-        pages = await get_pages(url, headers, session, params)
-        data_pages = await fetch_all(url, headers, pages, session, params)
-    return data_pages
+async def async_main(survey_id: int):
+    """
+    Executa o fluxo completo para um único survey_id.
+    Retorna uma lista de JSONs por página (ver answers.async_main sobre
+    páginas faltando).
+    """
+    url = topics_url(survey_id)
+    params = topics_params()
+    headers = request_headers()
+    journal = http_client.open_journal(url, params, TOPICS.name)
+
+    async def fetch_page(page):
+        return await fetch(url, headers, page, session, params)
 
+    async with http_client.session() as session:
+        stream = http_client.paginate(fetch_page, http_client.header_total, journal=journal)
+        responses = await http_client.collect_pages(stream)
+    return [response.data for response in responses]
 
-def main(survey_id: int) -> pd.DataFrame:
+
+async def async_dataframe(survey_id: int) -> pd.DataFrame:
     """
-    Função principal síncrona que retorna um DataFrame de perguntas para o survey_id.
+    Busca os tópicos e explode as perguntas página a página, conforme as
+    páginas chegam, sem guardar o JSON de todas as páginas.
     """
-    data = asyncio.run(async_main(survey_id))
+    url = topics_url(survey_id)
+    params = topics_params()
+    headers = request_headers()
+    journal = http_client.open_journal(url, params, TOPICS.name)
+    buffer = TOPICS.buffer()
 
-    # Achata apenas a primeira página de tópicos (caso precise de todas, iterar sobre data)
-    all_topics = []
-    for page_json in data:
-        if page_json and 'topics' in page_json:
-            all_topics.extend(page_json['topics'])
+    async def fetch_page(page):
+        return await fetch(url, headers, page, session, params)
+
+    async with http_client.session() as session:
+        # O total vem do header da página 1, que já entra no DataFrame
+        async for page, response in http_client.paginate(fetch_page, http_client.header_total, journal=journal):
+            with metrics.timer(f"flatten:topics:{survey_id}", "flatten"):
+                buffer.extend(TOPICS.records(response.data), key=page)
 
-    # Converte em DataFrame e seleciona colunas
-    df = pd.DataFrame(all_topics)[['id', 'name', 'questions']]
+    with metrics.timer(f"flatten:topics:{survey_id}", "flatten"):
+        return _buffer_to_dataframe(buffer, survey_id)
 
+
+def _buffer_to_dataframe(buffer: ColumnBuffer, survey_id: int) -> pd.DataFrame:
+    df = buffer.frame()
+    df.insert(2, 'survey_id', survey_id)
+    return df
+
+
+def to_dataframe(data: list, survey_id: int) -> pd.DataFrame:
+    """
+    Converte as páginas retornadas por async_main em um DataFrame de perguntas.
+    """
     # Explode perguntas em linhas individuais
-    new_rows = []
-    for _, row in df.iterrows():
-        for q in row['questions']:
-            new_rows.append({
-                'question_id': q['id'],
-                'question_name': q['name'],
-                'survey_id': survey_id,
-                'survey_name': row['name'],
-            })
-    return pd.DataFrame(new_rows)
+    buffer = TOPICS.buffer()
+    for page_json in data:
+        if page_json:
+            buffer.extend(TOPICS.records(page_json))
+    return _buffer_to_dataframe(buffer, survey_id)
+
+
+def main(survey_id: int) -> pd.DataFrame:
+    """
+    Função principal síncrona que retorna um DataFrame de perguntas para o survey_id.
+    """
+    return asyncio.run(async_dataframe(survey_id))
 
 if __name__ == "__main__":
     # Exemplo de uso com um único ID
@@ -0,0 +1,7 @@
+from .writers import write, write_tables, FORMATS
+
+__all__ = [
+    "write",
+    "write_tables",
+    "FORMATS",
+]
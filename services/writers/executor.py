@@ -0,0 +1,62 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .writers import write, write_tables
+
+# Processos que escrevem arquivos em paralelo com o resto do pipeline
+# (QR_WRITE_WORKERS=0 escreve em uma thread do próprio processo)
+WORKERS = int(os.getenv("QR_WRITE_WORKERS", str(max(1, min(4, (os.cpu_count() or 2) - 1)))))
+
+_pool = None
+
+
+def _warm_up():
+    # Importa as dependências da escrita enquanto o pipeline ainda busca dados
+    import openpyxl  # noqa: F401
+    import pandas  # noqa: F401
+
+
+def start(workers: int = WORKERS):
+    """
+    Cria o pool de escrita (se ainda não existir) e já sobe os processos.
+    Usa spawn em todas as plataformas: fork de um processo com threads (as
+    do asyncio.to_thread) pode travar.
+    """
+    global _pool
+    if _pool is None and workers > 0:
+        _pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        for _ in range(workers):
+            _pool.submit(_warm_up)
+    return _pool
+
+
+def shutdown(cancel: bool = False):
+    """
+    Espera as escritas pendentes (ou as cancela, com `cancel=True`) e
+    encerra os processos.
+    """
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=cancel)
+        _pool = None
+
+
+async def _run(func, *args):
+    pool = start()
+    if pool is None:
+        return await asyncio.to_thread(func, *args)
+    return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+
+
+async def write_async(df, path: str, fmt: str = None) -> str:
+    """
+    write() em um processo do pool: o DataFrame é serializado para o
+    processo e o event loop segue livre enquanto o arquivo é escrito.
+    """
+    return await _run(write, df, path, fmt)
+
+
+async def write_tables_async(frames: dict, path: str, fmt: str = None) -> list:
+    return await _run(write_tables, frames, path, fmt)
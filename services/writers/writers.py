@@ -0,0 +1,97 @@
+import os
+import pandas as pd
+
+# Linhas por planilha do Excel (1.048.576 menos o cabeçalho). Lido também do
+# ambiente, que os processos de escrita (executor.py) herdam
+EXCEL_MAX_ROWS = int(os.getenv("QR_EXCEL_MAX_ROWS", "1048575"))
+# Linhas convertidas por vez ao escrever o Excel (limita o pico de memória)
+CHUNK_ROWS = 50_000
+
+
+def _excel_values(chunk: pd.DataFrame):
+    """
+    Gera as linhas do bloco com NaN/NaT/NA trocados por None (célula vazia).
+    """
+    chunk = chunk.astype(object).where(chunk.notna(), None)
+    return chunk.itertuples(index=False, name=None)
+
+
+def write_excel(df: pd.DataFrame, path: str, max_rows: int = None):
+    """
+    Escreve o DataFrame com o openpyxl em modo write-only (streaming), que não
+    mantém as células em memória. Quando há mais linhas do que cabem em uma
+    planilha, continua em novas planilhas ("Sheet1", "Sheet2", ...), cada uma
+    com o cabeçalho.
+    """
+    write_excel_sheets({"Sheet": df}, path, max_rows)
+
+
+def write_excel_sheets(frames: dict, path: str, max_rows: int = None):
+    """
+    Como write_excel, mas com um DataFrame por planilha ({nome: df}). Um df
+    que não caiba em uma planilha continua em "<nome>2", "<nome>3", ...; com
+    o nome "Sheet" as planilhas são Sheet1, Sheet2, ... como no write_excel.
+    """
+    from openpyxl import Workbook
+
+    max_rows = max_rows or EXCEL_MAX_ROWS
+    workbook = Workbook(write_only=True)
+    for name, df in frames.items():
+        header = [str(column) for column in df.columns]
+        sheets = max(1, -(-len(df) // max_rows))
+        for number in range(sheets):
+            suffix = str(number + 1) if number or name == "Sheet" else ""
+            # O Excel limita o nome da planilha a 31 caracteres
+            sheet = workbook.create_sheet(f"{name[:31 - len(suffix)]}{suffix}")
+            sheet.append(header)
+            sheet_rows = df.iloc[number * max_rows:(number + 1) * max_rows]
+            for start in range(0, len(sheet_rows), CHUNK_ROWS):
+                for row in _excel_values(sheet_rows.iloc[start:start + CHUNK_ROWS]):
+                    sheet.append(row)
+    workbook.save(path)
+
+
+def write_csv(df: pd.DataFrame, path: str):
+    df.to_csv(path, index=False)
+
+
+def write_parquet(df: pd.DataFrame, path: str):
+    # Requer pyarrow (ou fastparquet) instalado
+    df.to_parquet(path, index=False)
+
+
+FORMATS = {
+    "xlsx": write_excel,
+    "csv": write_csv,
+    "parquet": write_parquet,
+}
+
+
+def write(df: pd.DataFrame, path: str, fmt: str = None) -> str:
+    """
+    Escreve o DataFrame em `path` no formato `fmt` (xlsx, csv ou parquet).
+    Sem `fmt`, usa a extensão do arquivo (xlsx se não houver). A extensão do
+    arquivo escrito é sempre a do formato. Retorna o caminho escrito.
+    """
+    root, ext = os.path.splitext(path)
+    fmt = fmt or ext.lstrip(".") or "xlsx"
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato não suportado: {fmt} (use {', '.join(FORMATS)})")
+    path = f"{root}.{fmt}"
+    FORMATS[fmt](df, path)
+    return path
+
+
+def write_tables(frames: dict, path: str, fmt: str = None) -> list:
+    """
+    Escreve várias tabelas ({nome: df}): no xlsx, uma planilha por tabela no
+    mesmo arquivo; em csv e parquet, um arquivo "<path>-<nome>" por tabela.
+    Retorna os caminhos escritos.
+    """
+    root, ext = os.path.splitext(path)
+    fmt = fmt or ext.lstrip(".") or "xlsx"
+    if fmt == "xlsx":
+        path = f"{root}.xlsx"
+        write_excel_sheets(frames, path)
+        return [path]
+    return [write(df, f"{root}-{name}", fmt) for name, df in frames.items()]